@@ -0,0 +1,75 @@
+import threading
+import time
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import QueuePool
+
+_lock = threading.Lock()
+_stats = {
+    "checkouts": 0,
+    "checkins": 0,
+    "connects": 0,
+    "closes": 0,
+    "invalidations": 0,
+    "timeouts": 0,
+    "wait_total_ms": 0.0,
+    "wait_max_ms": 0.0,
+}
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool qui mesure le temps d'attente d'une connexion disponible."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            # Seule l'attente d'une connexion libre; les erreurs de connexion ne sont pas comptées
+            with _lock:
+                _stats["timeouts"] += 1
+            raise
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000
+            with _lock:
+                _stats["wait_total_ms"] += elapsed
+                if elapsed > _stats["wait_max_ms"]:
+                    _stats["wait_max_ms"] = elapsed
+
+
+def _increment(key: str) -> None:
+    with _lock:
+        _stats[key] += 1
+
+
+def install_pool_metrics(engine) -> None:
+    event.listen(engine, "checkout", lambda *args: _increment("checkouts"))
+    event.listen(engine, "checkin", lambda *args: _increment("checkins"))
+    event.listen(engine, "connect", lambda *args: _increment("connects"))
+    event.listen(engine, "close", lambda *args: _increment("closes"))
+    event.listen(engine, "invalidate", lambda *args: _increment("invalidations"))
+
+
+def get_pool_metrics(engine) -> dict:
+    pool = engine.pool
+    with _lock:
+        stats = dict(_stats)
+    checkouts = stats["checkouts"]
+    metrics = {
+        "pool_class": type(pool).__name__,
+        "status": pool.status(),
+        **stats,
+        "wait_avg_ms": round(stats["wait_total_ms"] / checkouts, 3) if checkouts else 0.0,
+    }
+    if isinstance(pool, QueuePool):
+        metrics.update(
+            {
+                "size": pool.size(),
+                "checked_in": pool.checkedin(),
+                "checked_out": pool.checkedout(),
+                "overflow": pool.overflow(),
+            }
+        )
+    metrics["wait_total_ms"] = round(stats["wait_total_ms"], 3)
+    metrics["wait_max_ms"] = round(stats["wait_max_ms"], 3)
+    return metrics
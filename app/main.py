@@ -1,3 +1,4 @@
+from contextlib import asynccontextmanager
 from pathlib import Path
 
 from fastapi import FastAPI, HTTPException, Request
@@ -6,14 +7,13 @@ from fastapi.responses import FileResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 
-# Base SQLAlchemy + création des tables
-from app.database import Base, engine
-from app.models.localite import Localite  # noqa: F401
-from app.models.tache import Tache  # noqa: F401
-from app.models.user_connection_log import UserConnectionLog  # noqa: F401
+from app.database import async_engine, engine
+from app.slow_query_log import SLOW_QUERY_LOG, install_slow_query_log
+from app.sql_instrumentation import SQL_INSTRUMENTATION, install_sql_instrumentation
 
 # Middleware session
 from app.middleware.session import SessionMiddleware
+from app.middleware.sql_instrumentation import SqlInstrumentationMiddleware
 
 # Routers
 from app.routes.home import router as home_router
@@ -33,22 +33,16 @@ from app.routes.admin.dashboard_router import router as dashboard_router
 from app.routes.admin.dashboard_api_router import router as dashboard_api_router
 from app.routes.admin.export_excel_router import router as export_excel_router
 from app.routes.admin.admin_router import router as admin_router
-from app.services.roles_service import ensure_default_roles
-from app.services.annees_scolaires_service import ensure_annees_scolaires_seed
-from app.services.localites_service import (
-    ensure_filleule_ville_mapping,
-    ensure_localites_seed,
+from app.services.migration_service import startup_migrations
+from app.services.user_cache_service import detect_legacy_role_column
+from app.services.connection_log_service import (
+    start_connection_log_writer,
+    stop_connection_log_writer,
 )
-from app.services.schema_service import (
-    ensure_filleule_photo_column,
-    ensure_filleule_parent_sante_columns,
-    ensure_filleule_etablissement_column,
-    ensure_parrain_photo_column,
-    ensure_etablissement_type_enum,
-    ensure_scolarite_annee_scolaire_column,
-    ensure_document_annee_scolaire_column,
-    ensure_filleule_correspondant_column,
-    ensure_user_password_reset_columns,
+from app.services.export_jobs_service import shutdown_export_jobs
+from app.services.session_service import (
+    start_session_version_refresher,
+    stop_session_version_refresher,
 )
 
 
@@ -56,12 +50,32 @@ from app.services.schema_service import (
 #     INITIALISATION DE L'APPLICATION FASTAPI
 # --------------------------------------------------
 
-app = FastAPI(title="FAE Afoulki")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await start_connection_log_writer()
+    await start_session_version_refresher()
+    yield
+    await stop_session_version_refresher()
+    await stop_connection_log_writer()
+    shutdown_export_jobs()
+    await async_engine.dispose()
+
+
+app = FastAPI(title="FAE Afoulki", lifespan=lifespan)
 templates = Jinja2Templates(directory="app/templates")
 
 # Ajouter middleware session
 app.add_middleware(SessionMiddleware)
 
+# Instrumentation SQL par requête (Server-Timing, détection N+1) : SQL_INSTRUMENTATION=true
+# Journal des requêtes lentes avec plan EXPLAIN : SLOW_QUERY_LOG=true
+if SQL_INSTRUMENTATION:
+    install_sql_instrumentation(engine, async_engine)
+if SLOW_QUERY_LOG:
+    install_slow_query_log(engine, async_engine)
+if SQL_INSTRUMENTATION or SLOW_QUERY_LOG:
+    app.add_middleware(SqlInstrumentationMiddleware, collect_stats=SQL_INSTRUMENTATION)
+
 @app.exception_handler(HTTPException)
 async def custom_http_exception_handler(request: Request, exc: HTTPException):
     if exc.status_code == 403:
@@ -74,21 +88,9 @@ async def custom_http_exception_handler(request: Request, exc: HTTPException):
             )
     return await http_exception_handler(request, exc)
 
-# Créer les tables SQLAlchemy si non existantes
-Base.metadata.create_all(bind=engine)
-ensure_default_roles()
-ensure_filleule_photo_column()
-ensure_filleule_parent_sante_columns()
-ensure_filleule_etablissement_column()
-ensure_parrain_photo_column()
-ensure_etablissement_type_enum()
-ensure_annees_scolaires_seed()
-ensure_localites_seed()
-ensure_filleule_ville_mapping()
-ensure_scolarite_annee_scolaire_column()
-ensure_document_annee_scolaire_column()
-ensure_filleule_correspondant_column()
-ensure_user_password_reset_columns()
+# Créer les tables et appliquer les migrations en attente (registre schema_migrations, APP_INIT_MODE)
+startup_migrations()
+detect_legacy_role_column()
 
 
 # --------------------------------------------------
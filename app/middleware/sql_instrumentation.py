@@ -0,0 +1,58 @@
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.sql_instrumentation import end_request_stats, start_request_stats
+
+
+class SqlInstrumentationMiddleware:
+    """Compte les requêtes SQL d'une requête HTTP et les expose dans Server-Timing.
+
+    Le temps "template" inclut les requêtes déclenchées pendant le rendu
+    (chargements paresseux), qui sont aussi comptées dans "db". Avec
+    collect_stats=False, seule la route courante est exposée (journal des
+    requêtes lentes).
+    """
+
+    def __init__(self, app: ASGIApp, collect_stats: bool = True):
+        self.app = app
+        self.collect_stats = collect_stats
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        if not self.collect_stats:
+            _, tokens = start_request_stats(scope, collect=False)
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                end_request_stats(tokens)
+            return
+
+        start = time.perf_counter()
+        stats, tokens = start_request_stats(scope)
+
+        async def send_with_timing(message: Message):
+            if message["type"] == "http.response.start":
+                total_ms = (time.perf_counter() - start) * 1000
+                value = (
+                    f'db;dur={stats.db_ms:.1f};desc="{stats.queries} SQL", '
+                    f"template;dur={stats.template_ms:.1f}, total;dur={total_ms:.1f}"
+                )
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", value.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            end_request_stats(tokens)
+            route = getattr(scope.get("route"), "path", None) or scope["path"]
+            for statement, count in stats.repeated_statements():
+                print(
+                    f"[sql] N+1 probable sur {scope['method']} {route} : "
+                    f"{count} exécutions de {' '.join(statement.split())[:200]}"
+                )
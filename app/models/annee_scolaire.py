@@ -9,6 +9,8 @@ class AnneeScolaire(Base):
 
     id_annee_scolaire = Column(Integer, primary_key=True, index=True)
     periode = Column(String(9), nullable=False)
+    # Année de début de la période, calculée à l'écriture (scolarites_service)
+    start_year = Column(Integer)
 
     scolarites = relationship("Scolarite", back_populates="annee_scolaire_ref")
     documents = relationship("Document", back_populates="annee_scolaire_ref")
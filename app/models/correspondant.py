@@ -1,9 +1,12 @@
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import Column, Index, Integer, String
 from sqlalchemy.orm import relationship
 from app.database import Base
 
 class Correspondant(Base):
     __tablename__ = "Correspondants"
+    __table_args__ = (
+        Index("ix_correspondants_nom_complet_norm", "nom_complet_norm"),
+    )
 
     id_correspondant = Column(Integer, primary_key=True, index=True)
 
@@ -12,5 +15,8 @@ class Correspondant(Base):
     telephone = Column(String(50))
     email = Column(String(255))
     lien = Column(String(255))
+    # « prénom nom » normalisé (scolarites_service.referent_key), tenu à jour à l'écriture :
+    # résolution des référents saisis en texte libre
+    nom_complet_norm = Column(String(511))
 
     filleules = relationship("Filleule", back_populates="correspondant")
@@ -1,10 +1,13 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship
 from app.database import Base
 import datetime
 
 class Document(Base):
     __tablename__ = "Documents"
+    __table_args__ = (
+        Index("ix_documents_id_filleule", "id_filleule"),
+    )
 
     id_document = Column(Integer, primary_key=True, index=True)
     id_filleule = Column(Integer, ForeignKey("Filleules.id_filleule"))
@@ -1,10 +1,18 @@
-from sqlalchemy import Column, Integer, String, Date, DateTime, ForeignKey
+from sqlalchemy import Column, Computed, Integer, String, Date, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from app.database import Base
 import datetime
 
 class Filleule(Base):
     __tablename__ = "Filleules"
+    __table_args__ = (
+        Index("ix_filleules_ville_norm", "ville_norm"),
+        Index("ix_filleules_village_norm", "village_norm"),
+        Index("ix_filleules_annee_rentree_norm", "annee_rentree_norm"),
+        Index("ix_filleules_couverture_sante_norm", "couverture_sante_norm"),
+        Index("ix_filleules_nom_prenom", "nom", "prenom", "id_filleule"),
+        Index("ix_filleules_prenom_nom", "prenom", "nom", "id_filleule"),
+    )
 
     id_filleule = Column(Integer, primary_key=True, index=True)
     nom = Column(String(255), nullable=False)
@@ -25,6 +33,15 @@ class Filleule(Base):
     photo = Column(String(255))
     date_creation = Column(DateTime, default=datetime.datetime.utcnow)
 
+    # Formes normalisées (minuscules, sans espaces autour, NULL si vide) calculées
+    # par la base à chaque écriture : les filtres les comparent via un index.
+    ville_norm = Column(String(255), Computed("NULLIF(LOWER(TRIM(ville)), '')", persisted=True))
+    village_norm = Column(String(255), Computed("NULLIF(LOWER(TRIM(village)), '')", persisted=True))
+    annee_rentree_norm = Column(String(20), Computed("NULLIF(LOWER(TRIM(annee_rentree)), '')", persisted=True))
+    couverture_sante_norm = Column(
+        String(255), Computed("NULLIF(LOWER(TRIM(couverture_sante)), '')", persisted=True)
+    )
+
     parrainages = relationship("Parrainage", back_populates="filleule")
     scolarites = relationship("Scolarite", back_populates="filleule")
     correspondant = relationship("Correspondant", back_populates="filleules")
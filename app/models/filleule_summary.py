@@ -0,0 +1,23 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text, func
+
+from app.database import Base
+
+
+class FilleuleSummary(Base):
+    """Résumé d'affichage d'une filleule, recalculé à l'écriture (filleule_summary_service)."""
+
+    __tablename__ = "filleule_summary"
+
+    id_filleule = Column(
+        Integer, ForeignKey("Filleules.id_filleule", ondelete="CASCADE"), primary_key=True
+    )
+    nom = Column(String(255))
+    prenom = Column(String(255))
+    correspondant = Column(String(511))
+    # Dernière scolarité (latest_scolarite_view)
+    etablissement = Column(String(255))
+    periode = Column(String(20))
+    niveau = Column(String(100))
+    # Parrains distincts « Prénom Nom », séparés par des virgules
+    parrains = Column(Text)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), nullable=False)
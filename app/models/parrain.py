@@ -1,9 +1,12 @@
-from sqlalchemy import Column, Integer, String, Text
+from sqlalchemy import Column, Index, Integer, String, Text
 from sqlalchemy.orm import relationship
 from app.database import Base
 
 class Parrain(Base):
     __tablename__ = "Parrains"
+    __table_args__ = (
+        Index("ix_parrains_nom_prenom", "nom", "prenom", "id_parrain"),
+    )
 
     id_parrain = Column(Integer, primary_key=True, index=True)
     nom = Column(String(255), nullable=False)
@@ -1,9 +1,13 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Date
+from sqlalchemy import Column, Integer, String, ForeignKey, Date, Index
 from sqlalchemy.orm import relationship
 from app.database import Base
 
 class Parrainage(Base):
     __tablename__ = "Parrainages"
+    __table_args__ = (
+        Index("ix_parrainages_id_filleule", "id_filleule"),
+        Index("ix_parrainages_id_parrain", "id_parrain"),
+    )
 
     id_parrainage = Column(Integer, primary_key=True, index=True)
     id_filleule = Column(Integer, ForeignKey("Filleules.id_filleule"))
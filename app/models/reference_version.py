@@ -0,0 +1,13 @@
+from sqlalchemy import Column, DateTime, Integer, String, func
+
+from app.database import Base
+
+
+class ReferenceVersion(Base):
+    """Version d'une table de référence, incrémentée à chaque écriture (reference_data_service)."""
+
+    __tablename__ = "reference_versions"
+
+    table_name = Column(String(64), primary_key=True)
+    version = Column(Integer, nullable=False, default=0, server_default="0")
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), nullable=False)
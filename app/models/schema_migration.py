@@ -0,0 +1,11 @@
+from sqlalchemy import Column, DateTime, String, func
+
+from app.database import Base
+
+
+class SchemaMigration(Base):
+    __tablename__ = "schema_migrations"
+
+    step_id = Column(String(128), primary_key=True)
+    checksum = Column(String(64), nullable=False)
+    applied_at = Column(DateTime, server_default=func.now(), nullable=False)
@@ -1,9 +1,13 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey
+from sqlalchemy import Column, Computed, Integer, String, Text, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from app.database import Base
 
 class Scolarite(Base):
     __tablename__ = "Scolarite"
+    __table_args__ = (
+        Index("ix_scolarite_id_filleule", "id_filleule"),
+        Index("ix_scolarite_filiere_norm", "filiere_norm", "id_filleule"),
+    )
 
     id_scolarite = Column(Integer, primary_key=True, index=True)
     id_filleule = Column(Integer, ForeignKey("Filleules.id_filleule"))
@@ -16,10 +20,16 @@ class Scolarite(Base):
     section = Column(String(100))
     sous_groupe = Column(String(20))
     responsable_concours = Column(String(255))
+    # Texte libre historique (id ou « Prénom Nom »); id_referent_* en est la résolution
     referent_a = Column(String(255))
     referent_b = Column(String(255))
+    id_referent_a = Column(Integer, ForeignKey("Correspondants.id_correspondant", ondelete="SET NULL"))
+    id_referent_b = Column(Integer, ForeignKey("Correspondants.id_correspondant", ondelete="SET NULL"))
     resultats = Column(Text)
     diplome_obtenu = Column(String(255))
+    # Année de début du texte libre annee_scolaire (lignes historiques sans id_annee_scolaire)
+    start_year = Column(Integer)
+    filiere_norm = Column(String(255), Computed("NULLIF(LOWER(TRIM(filiere)), '')", persisted=True))
 
     filleule = relationship("Filleule", back_populates="scolarites")
     etablissement = relationship("Etablissement", back_populates="scolarites")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Text, ForeignKey, Date, Enum
+from sqlalchemy import Column, Integer, Text, ForeignKey, Date, Enum, Index
 from sqlalchemy.orm import relationship
 from app.database import Base
 
@@ -6,6 +6,9 @@ SUIVI_ETATS = ("En cours", "Problème", "Fini")
 
 class SuiviSocial(Base):
     __tablename__ = "SuiviSocial"
+    __table_args__ = (
+        Index("ix_suivisocial_id_filleule", "id_filleule"),
+    )
 
     id_suivi = Column(Integer, primary_key=True, index=True)
     id_filleule = Column(Integer, ForeignKey("Filleules.id_filleule"))
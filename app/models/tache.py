@@ -1,6 +1,6 @@
 import datetime
 
-from sqlalchemy import Column, Date, DateTime, Enum, ForeignKey, Integer, String, Text
+from sqlalchemy import Column, Date, DateTime, Enum, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.orm import relationship
 
 from app.database import Base
@@ -35,6 +35,10 @@ class TaskAssignee(Base):
 
 class Tache(Base):
     __tablename__ = "Taches"
+    __table_args__ = (
+        Index("ix_taches_statut_date_debut", "statut", "date_debut", "id_tache"),
+        Index("ix_taches_date_debut", "date_debut", "id_tache"),
+    )
 
     id_tache = Column(Integer, primary_key=True, index=True)
     titre = Column(String(255), nullable=False)
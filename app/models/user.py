@@ -11,6 +11,7 @@ class User(Base):
     fullname = Column(String(255), nullable=True)
     reset_token_hash = Column(String(255), nullable=True)
     reset_token_expires = Column(DateTime, nullable=True)
+    session_version = Column(Integer, nullable=False, default=0, server_default="0")
 
     roles = relationship("Role", secondary="user_roles", back_populates="users")
     tasks = relationship("Tache", secondary="task_assignees", back_populates="assignees")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, func
+from sqlalchemy import Column, Date, DateTime, ForeignKey, Index, Integer, String, func
 from sqlalchemy.orm import relationship
 
 from app.database import Base
@@ -6,11 +6,28 @@ from app.database import Base
 
 class UserConnectionLog(Base):
     __tablename__ = "user_connection_logs"
+    __table_args__ = (Index("ix_user_connection_logs_user_created", "user_id", "created_at"),)
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), index=True, nullable=False)
     ip_address = Column(String(64), nullable=True)
     path = Column(String(512), nullable=False)
-    created_at = Column(DateTime, server_default=func.now(), nullable=False)
+    created_at = Column(DateTime, server_default=func.now(), nullable=False, index=True)
+
+    user = relationship("User")
+
+
+class UserConnectionDaily(Base):
+    """Agrégat journalier par utilisateur, maintenu à chaque écriture du journal."""
+
+    __tablename__ = "user_connection_daily"
+    __table_args__ = (Index("ix_user_connection_daily_day_user", "day", "user_id"),)
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    hits = Column(Integer, nullable=False, default=0)
+    distinct_paths = Column(Integer, nullable=False, default=0)
+    first_seen = Column(DateTime, nullable=False)
+    last_seen = Column(DateTime, nullable=False)
 
     user = relationship("User")
@@ -1,17 +1,23 @@
+from datetime import date, datetime, timedelta
+from urllib.parse import urlencode
+
 from fastapi import APIRouter, Depends, HTTPException, Request
-from fastapi.responses import RedirectResponse
+from fastapi.responses import JSONResponse, RedirectResponse
 from fastapi.templating import Jinja2Templates
-from sqlalchemy import func
-from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
 
 from app.authz import USER_ADMIN_ROLES, has_any_role
 from app.database import get_db
 from app.models.user import User
-from app.models.user_connection_log import UserConnectionLog
+from app.models.user_connection_log import UserConnectionDaily, UserConnectionLog
 
 router = APIRouter(prefix="/connexions", tags=["Admin - Connexions"])
 templates = Jinja2Templates(directory="app/templates")
 
+PAGE_SIZE = 50
+DEFAULT_RANGE_DAYS = 30
+
 
 def require_admin(request: Request):
     if not request.state.user:
@@ -21,37 +27,126 @@ def require_admin(request: Request):
     return None
 
 
+def _parse_date(value: str | None) -> date | None:
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        return None
+
+
+def _parse_cursor(value: str | None) -> tuple[date, int] | None:
+    if not value or "_" not in value:
+        return None
+    day_raw, user_raw = value.split("_", 1)
+    day = _parse_date(day_raw)
+    if not day or not user_raw.isdigit():
+        return None
+    return day, int(user_raw)
+
+
 @router.get("/")
-def admin_connexions_list(request: Request, db: Session = Depends(get_db)):
+def admin_connexions_list(
+    request: Request,
+    date_from: str | None = None,
+    date_to: str | None = None,
+    q: str | None = None,
+    after: str | None = None,
+    db: Session = Depends(get_db),
+):
     redirect = require_admin(request)
     if redirect:
         return redirect
 
-    logs = (
-        db.query(UserConnectionLog)
-        .join(User)
-        .options(selectinload(UserConnectionLog.user))
-        .order_by(
-            User.fullname.is_(None),
-            func.lower(User.fullname),
-            User.id,
-            UserConnectionLog.created_at.desc(),
+    end_day = _parse_date(date_to) or date.today()
+    start_day = _parse_date(date_from) or end_day - timedelta(days=DEFAULT_RANGE_DAYS)
+    search = (q or "").strip()
+
+    query = (
+        db.query(UserConnectionDaily, User.fullname, User.email)
+        .join(User, User.id == UserConnectionDaily.user_id)
+        .filter(UserConnectionDaily.day >= start_day, UserConnectionDaily.day <= end_day)
+    )
+    if search:
+        pattern = f"%{search}%"
+        query = query.filter(or_(User.fullname.ilike(pattern), User.email.ilike(pattern)))
+
+    cursor = _parse_cursor(after)
+    if cursor:
+        cursor_day, cursor_user = cursor
+        query = query.filter(
+            or_(
+                UserConnectionDaily.day < cursor_day,
+                and_(UserConnectionDaily.day == cursor_day, UserConnectionDaily.user_id > cursor_user),
+            )
         )
+
+    rows = (
+        query.order_by(UserConnectionDaily.day.desc(), UserConnectionDaily.user_id)
+        .limit(PAGE_SIZE + 1)
         .all()
     )
+    has_next = len(rows) > PAGE_SIZE
+    rows = rows[:PAGE_SIZE]
 
     grouped = []
-    for log in logs:
-        user = log.user
-        label = user.fullname or user.email
-        if not grouped or grouped[-1]["user_id"] != user.id:
-            grouped.append({"user_id": user.id, "user_label": label, "dates": []})
-        date_key = log.created_at.date() if log.created_at else None
-        if not grouped[-1]["dates"] or grouped[-1]["dates"][-1]["date"] != date_key:
-            grouped[-1]["dates"].append({"date": date_key, "entries": []})
-        grouped[-1]["dates"][-1]["entries"].append(log)
+    for rollup, fullname, email in rows:
+        if not grouped or grouped[-1]["date"] != rollup.day:
+            grouped.append({"date": rollup.day, "entries": []})
+        grouped[-1]["entries"].append({"rollup": rollup, "user_label": fullname or email})
+
+    filters = {
+        "date_from": start_day.isoformat(),
+        "date_to": end_day.isoformat(),
+        "q": search,
+    }
+    next_url = None
+    if has_next:
+        last = rows[-1][0]
+        next_url = "?" + urlencode({**filters, "after": f"{last.day.isoformat()}_{last.user_id}"})
 
     return templates.TemplateResponse(
         "admin/connexions/list.html",
-        {"request": request, "groups": grouped},
+        {
+            "request": request,
+            "groups": grouped,
+            "filters": filters,
+            "next_url": next_url,
+            "first_url": "?" + urlencode(filters) if cursor else None,
+        },
+    )
+
+
+@router.get("/entries")
+def admin_connexions_entries(request: Request, user_id: int, day: str, db: Session = Depends(get_db)):
+    redirect = require_admin(request)
+    if redirect:
+        raise HTTPException(401, "Non authentifié")
+
+    parsed_day = _parse_date(day)
+    if not parsed_day:
+        raise HTTPException(400, "Date invalide")
+    start = datetime.combine(parsed_day, datetime.min.time())
+
+    logs = (
+        db.query(UserConnectionLog.created_at, UserConnectionLog.ip_address, UserConnectionLog.path)
+        .filter(
+            UserConnectionLog.user_id == user_id,
+            UserConnectionLog.created_at >= start,
+            UserConnectionLog.created_at < start + timedelta(days=1),
+        )
+        .order_by(UserConnectionLog.created_at.desc())
+        .all()
+    )
+
+    return JSONResponse(
+        [
+            {
+                "time": created_at.strftime("%H:%M") if created_at else "-",
+                "ip_address": ip_address or "-",
+                "path": path,
+            }
+            for created_at, ip_address, path in logs
+        ]
     )
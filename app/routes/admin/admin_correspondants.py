@@ -5,9 +5,12 @@ from sqlalchemy.orm import Session
 
 from app.database import get_db
 from app.models.correspondant import Correspondant
+from app.services.navigation_service import neighbors
 
 router = APIRouter(prefix="/correspondants", tags=["Admin - Référents"])
 templates = Jinja2Templates(directory="app/templates")
+# Ordre de la liste (précédent/suivant des fiches)
+NAV_ORDER = (Correspondant.id_correspondant,)
 
 
 def normalize_optional(value: str | None) -> str | None:
@@ -85,7 +88,11 @@ def admin_correspondant_detail(id_correspondant: int, request: Request, db: Sess
 
     return templates.TemplateResponse(
         "admin/correspondants/detail.html",
-        {"request": request, "c": c},
+        {
+            "request": request,
+            "c": c,
+            "neighbors": neighbors(db.query(Correspondant.id_correspondant), NAV_ORDER, id_correspondant),
+        },
     )
 
 
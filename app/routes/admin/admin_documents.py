@@ -5,18 +5,20 @@ from uuid import uuid4
 from fastapi import APIRouter, Request, Depends, Form, HTTPException, UploadFile, File
 from fastapi.responses import RedirectResponse
 from fastapi.templating import Jinja2Templates
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 
 from app.database import BASE_DIR, get_db
 from app.models.document import Document
-from app.models.annee_scolaire import AnneeScolaire
 from app.models.filleule import Filleule
-from app.models.typedocument import TypeDocument
+from app.services.navigation_service import neighbors
+from app.services.reference_data_service import annees_scolaires_ref, types_documents_ref
 
 DOCUMENTS_DIR = BASE_DIR / "Documents" / "Filleules"
 
 router = APIRouter(prefix="/documents", tags=["Admin - Documents"])
 templates = Jinja2Templates(directory="app/templates")
+# Ordre de la liste (précédent/suivant des fiches)
+NAV_ORDER = (Document.id_document,)
 
 
 def resolve_document_path(path_value: str | None) -> Path | None:
@@ -41,7 +43,11 @@ def admin_documents_list(request: Request, db: Session = Depends(get_db)):
     if not check_session(request):
         return RedirectResponse("/auth/login")
 
-    docs = db.query(Document).all()
+    docs = (
+        db.query(Document)
+        .options(joinedload(Document.filleule), joinedload(Document.type_document))
+        .all()
+    )
 
     return templates.TemplateResponse(
         "admin/documents/list.html",
@@ -56,8 +62,8 @@ def admin_documents_new(request: Request, db: Session = Depends(get_db)):
         return RedirectResponse("/auth/login")
 
     filleules = db.query(Filleule).all()
-    types = db.query(TypeDocument).all()
-    annees = db.query(AnneeScolaire).order_by(AnneeScolaire.periode).all()
+    types = types_documents_ref.rows()
+    annees = annees_scolaires_ref.rows()
 
     return templates.TemplateResponse(
         "admin/documents/form.html",
@@ -114,7 +120,11 @@ def admin_documents_detail(id_document: int, request: Request, db: Session = Dep
 
     return templates.TemplateResponse(
         "admin/documents/detail.html",
-        {"request": request, "d": d},
+        {
+            "request": request,
+            "d": d,
+            "neighbors": neighbors(db.query(Document.id_document), NAV_ORDER, id_document),
+        },
     )
 
 
@@ -129,8 +139,8 @@ def admin_documents_edit(id_document: int, request: Request, db: Session = Depen
         raise HTTPException(404, "Document non trouvé")
 
     filleules = db.query(Filleule).all()
-    types = db.query(TypeDocument).all()
-    annees = db.query(AnneeScolaire).order_by(AnneeScolaire.periode).all()
+    types = types_documents_ref.rows()
+    annees = annees_scolaires_ref.rows()
 
     return templates.TemplateResponse(
         "admin/documents/form.html",
@@ -1,16 +1,18 @@
-import io
-
 from fastapi import APIRouter, Request, Depends, Form, HTTPException
-from fastapi.responses import RedirectResponse, StreamingResponse
+from fastapi.responses import RedirectResponse
 from fastapi.templating import Jinja2Templates
+from sqlalchemy import func
 from sqlalchemy.orm import Session
-from openpyxl import Workbook
 
 from app.database import get_db
 from app.models.etablissement import ETABLISSEMENT_TYPES, Etablissement
+from app.services.excel_export_service import EXPORT_YIELD_PER, xlsx_response
+from app.services.navigation_service import neighbors
 
 router = APIRouter(prefix="/etablissements", tags=["Admin - Etablissements"])
 templates = Jinja2Templates(directory="app/templates")
+# Ordre de la liste (précédent/suivant des fiches) : ville, NULL en premier comme ORDER BY ville
+NAV_ORDER = (func.coalesce(Etablissement.ville, ""), Etablissement.id_etablissement)
 
 
 # --- Vérification session ---
@@ -40,33 +42,30 @@ def admin_etablissements_export_excel(request: Request, db: Session = Depends(ge
         return RedirectResponse("/auth/login")
 
     etablissements = (
-        db.query(Etablissement)
+        db.query(
+            Etablissement.id_etablissement,
+            Etablissement.nom,
+            Etablissement.ville,
+            Etablissement.type,
+            Etablissement.adresse,
+        )
         .order_by(Etablissement.ville, Etablissement.nom)
-        .all()
+        .yield_per(EXPORT_YIELD_PER)
     )
-
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Etablissements"
-    ws.append(["ID", "Nom", "Ville", "Type", "Adresse"])
-    for etab in etablissements:
-        ws.append([
-            etab.id_etablissement,
-            etab.nom,
-            etab.ville or "",
-            etab.type or "",
-            etab.adresse or "",
-        ])
-
-    output = io.BytesIO()
-    wb.save(output)
-    output.seek(0)
-
-    headers = {"Content-Disposition": "attachment; filename=etablissements.xlsx"}
-    return StreamingResponse(
-        output,
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        headers=headers,
+    return xlsx_response(
+        "etablissements.xlsx",
+        "Etablissements",
+        ["ID", "Nom", "Ville", "Type", "Adresse"],
+        (
+            [
+                etab.id_etablissement,
+                etab.nom,
+                etab.ville or "",
+                etab.type or "",
+                etab.adresse or "",
+            ]
+            for etab in etablissements
+        ),
     )
 
 
@@ -127,7 +126,11 @@ def admin_etablissement_detail(id_etablissement: int, request: Request, db: Sess
 
     return templates.TemplateResponse(
         "admin/etablissements/detail.html",
-        {"request": request, "etablissement": etab},
+        {
+            "request": request,
+            "etablissement": etab,
+            "neighbors": neighbors(db.query(Etablissement.id_etablissement), NAV_ORDER, id_etablissement),
+        },
     )
 
 
@@ -1,27 +1,26 @@
 from datetime import date
-import io
 import os
 import shutil
 from pathlib import Path
 from uuid import uuid4
 
 from fastapi import APIRouter, Request, Depends, Form, HTTPException, UploadFile, File
-from fastapi.responses import RedirectResponse, StreamingResponse
+from fastapi.responses import RedirectResponse
 from fastapi.templating import Jinja2Templates
-from sqlalchemy import func
-from sqlalchemy.orm import Session, joinedload
-from openpyxl import Workbook
+from sqlalchemy.orm import Session
 
 from app.database import BASE_DIR, get_db
-from app.models.correspondant import Correspondant
 from app.models.document import Document
-from app.models.etablissement import Etablissement
 from app.models.filleule import Filleule
 from app.models.parrainage import Parrainage
 from app.models.scolarite import Scolarite
 from app.models.suivisocial import SuiviSocial
 from app.models.localite import Localite
+from app.services.excel_export_service import EXPORT_YIELD_PER, xlsx_response
+from app.services.filleule_list_service import filleule_neighbors
+from app.services.list_rows_service import FilleuleListRow
 from app.services.localites_service import build_localites_map, resolve_localite_name
+from app.services.reference_data_service import correspondants_ref, etablissements_ref, localites_ref
 
 router = APIRouter(prefix="/filleules", tags=["Admin - Filleules"])
 templates = Jinja2Templates(directory="app/templates")
@@ -81,9 +80,8 @@ def get_extra_villes(db: Session, localites: list[Localite]) -> list[str]:
     localite_names = {localite.nom for localite in localites}
     rows = (
         db.query(Filleule.ville)
-        .filter(Filleule.ville.isnot(None))
-        .filter(func.trim(Filleule.ville) != "")
-        .filter(func.lower(func.trim(Filleule.ville)) != "none")
+        .filter(Filleule.ville_norm.isnot(None))
+        .filter(Filleule.ville_norm != "none")
         .distinct()
         .order_by(Filleule.ville)
         .all()
@@ -109,7 +107,7 @@ def admin_filleules_list(request: Request, db: Session = Depends(get_db)):
     if not check_session(request):
         return RedirectResponse("/auth/login")
 
-    filleules = db.query(Filleule).options(joinedload(Filleule.correspondant)).all()
+    filleules = FilleuleListRow.fetch(FilleuleListRow.query(db))
 
     return templates.TemplateResponse(
         "admin/filleules/list.html",
@@ -125,40 +123,26 @@ def admin_filleules_export_excel(request: Request, db: Session = Depends(get_db)
     if not check_session(request):
         return RedirectResponse("/auth/login")
 
-    filleules = (
-        db.query(Filleule)
-        .options(joinedload(Filleule.correspondant))
-        .order_by(Filleule.nom.asc(), Filleule.prenom.asc())
-        .all()
+    filleules = FilleuleListRow.stream(
+        FilleuleListRow.query(db).order_by(Filleule.nom.asc(), Filleule.prenom.asc()),
+        EXPORT_YIELD_PER,
     )
-
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Filleules"
-    ws.append(["ID", "Nom", "Prénom", "WhatsApp", "Entrée au FAE", "ID Référent", "Référent"])
-    for f in filleules:
-        referent = ""
-        if f.correspondant:
-            referent = f"{f.correspondant.prenom} {f.correspondant.nom}"
-        ws.append([
-            f.id_filleule,
-            f.nom,
-            f.prenom,
-            f.whatsapp or "",
-            f.annee_rentree or "",
-            f.id_correspondant or "",
-            referent,
-        ])
-
-    output = io.BytesIO()
-    wb.save(output)
-    output.seek(0)
-
-    headers = {"Content-Disposition": "attachment; filename=filleules.xlsx"}
-    return StreamingResponse(
-        output,
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        headers=headers,
+    return xlsx_response(
+        "filleules.xlsx",
+        "Filleules",
+        ["ID", "Nom", "Prénom", "WhatsApp", "Entrée au FAE", "ID Référent", "Référent"],
+        (
+            [
+                f.id_filleule,
+                f.nom,
+                f.prenom,
+                f.whatsapp or "",
+                f.annee_rentree or "",
+                f.id_correspondant or "",
+                f.referent or "",
+            ]
+            for f in filleules
+        ),
     )
 
 
@@ -168,9 +152,9 @@ def admin_filleule_new(request: Request, db: Session = Depends(get_db)):
     if not check_session(request):
         return RedirectResponse("/auth/login")
 
-    etablissements = db.query(Etablissement).order_by(Etablissement.nom).all()
-    correspondants = db.query(Correspondant).order_by(Correspondant.nom, Correspondant.prenom).all()
-    localites = db.query(Localite).order_by(Localite.nom).all()
+    etablissements = etablissements_ref.rows()
+    correspondants = correspondants_ref.rows()
+    localites = localites_ref.rows()
     extra_villes = get_extra_villes(db, localites)
 
     return templates.TemplateResponse(
@@ -209,16 +193,13 @@ def admin_filleule_create(
     photo: UploadFile | None = File(None),
     db: Session = Depends(get_db),
 ):
-    localites = db.query(Localite).order_by(Localite.nom).all()
-    localites_map = build_localites_map(localites)
-    resolved_ville = resolve_localite_name(ville, localites_map)
     photo_path = None
     obj = Filleule(
         nom=nom,
         prenom=prenom,
         date_naissance=date.fromisoformat(date_naissance) if date_naissance else None,
         village=normalize_optional(village),
-        ville=normalize_optional(resolved_ville or ville),
+        ville=normalize_optional(ville),
         email=normalize_optional(email),
         telephone=normalize_optional(telephone),
         whatsapp=normalize_optional(whatsapp),
@@ -254,26 +235,15 @@ def admin_filleule_detail(filleule_id: int, request: Request, db: Session = Depe
     if not obj:
         raise HTTPException(404, "Filleule non trouvée")
 
-    previous_obj = (
-        db.query(Filleule)
-        .filter(Filleule.id_filleule < filleule_id)
-        .order_by(Filleule.id_filleule.desc())
-        .first()
-    )
-    next_obj = (
-        db.query(Filleule)
-        .filter(Filleule.id_filleule > filleule_id)
-        .order_by(Filleule.id_filleule.asc())
-        .first()
-    )
+    # Ordre des ids, ou filtres et tri de /filleules/html transmis dans l'URL
+    neighbors = filleule_neighbors(db, request.query_params, filleule_id, default_sort=None)
 
     return templates.TemplateResponse(
         "admin/filleules/detail.html",
         {
             "request": request,
             "filleule": obj,
-            "previous_filleule_id": previous_obj.id_filleule if previous_obj else None,
-            "next_filleule_id": next_obj.id_filleule if next_obj else None,
+            "neighbors": neighbors,
         },
     )
 
@@ -288,22 +258,12 @@ def admin_filleule_edit(filleule_id: int, request: Request, db: Session = Depend
     if not obj:
         raise HTTPException(404, "Filleule non trouvée")
 
-    previous_obj = (
-        db.query(Filleule)
-        .filter(Filleule.id_filleule < filleule_id)
-        .order_by(Filleule.id_filleule.desc())
-        .first()
-    )
-    next_obj = (
-        db.query(Filleule)
-        .filter(Filleule.id_filleule > filleule_id)
-        .order_by(Filleule.id_filleule.asc())
-        .first()
-    )
+    # Ordre des ids, ou filtres et tri de /filleules/html transmis dans l'URL
+    neighbors = filleule_neighbors(db, request.query_params, filleule_id, default_sort=None)
 
-    etablissements = db.query(Etablissement).order_by(Etablissement.nom).all()
-    correspondants = db.query(Correspondant).order_by(Correspondant.nom, Correspondant.prenom).all()
-    localites = db.query(Localite).order_by(Localite.nom).all()
+    etablissements = etablissements_ref.rows()
+    correspondants = correspondants_ref.rows()
+    localites = localites_ref.rows()
     localites_map = build_localites_map(localites)
     selected_ville = resolve_localite_name(obj.ville, localites_map) or obj.ville
     extra_villes = get_extra_villes(db, localites)
@@ -319,8 +279,7 @@ def admin_filleule_edit(filleule_id: int, request: Request, db: Session = Depend
             "localites": localites,
             "extra_villes": extra_villes,
             "selected_ville": selected_ville,
-            "previous_filleule_id": previous_obj.id_filleule if previous_obj else None,
-            "next_filleule_id": next_obj.id_filleule if next_obj else None,
+            "neighbors": neighbors,
         },
     )
 
@@ -352,16 +311,13 @@ def admin_filleule_update(
     if not obj:
         raise HTTPException(404, "Filleule non trouvée")
 
-    localites = db.query(Localite).order_by(Localite.nom).all()
-    localites_map = build_localites_map(localites)
-    resolved_ville = resolve_localite_name(ville, localites_map)
-
     obj.nom = nom
     obj.prenom = prenom
     obj.date_naissance = date.fromisoformat(date_naissance) if date_naissance else None
     if village is not None:
         obj.village = normalize_optional(village)
-    obj.ville = normalize_optional(resolved_ville or ville)
+    # Le nom canonique de la localité est appliqué à l'écriture (normalize_filleule_ville)
+    obj.ville = normalize_optional(ville)
     obj.email = normalize_optional(email)
     obj.telephone = normalize_optional(telephone)
     obj.whatsapp = normalize_optional(whatsapp)
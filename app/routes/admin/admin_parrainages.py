@@ -1,19 +1,21 @@
-import io
-
 from fastapi import APIRouter, Request, Depends, Form, HTTPException
-from fastapi.responses import RedirectResponse, StreamingResponse
+from fastapi.responses import RedirectResponse
 from fastapi.templating import Jinja2Templates
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm import Session
 from datetime import date
-from openpyxl import Workbook
 
 from app.database import get_db
 from app.models.parrainage import Parrainage
 from app.models.parrain import Parrain
 from app.models.filleule import Filleule
+from app.services.excel_export_service import EXPORT_YIELD_PER, xlsx_response
+from app.services.list_rows_service import ParrainageListRow
+from app.services.navigation_service import neighbors
 
 router = APIRouter(prefix="/parrainages", tags=["Admin - Parrainages"])
 templates = Jinja2Templates(directory="app/templates")
+# Ordre de la liste (précédent/suivant des fiches)
+NAV_ORDER = (Parrainage.id_parrainage,)
 
 
 # --- Vérification session ---
@@ -45,7 +47,7 @@ def admin_parrainages_list(request: Request, db: Session = Depends(get_db)):
     if not check_session(request):
         return RedirectResponse("/auth/login")
 
-    parrainages = db.query(Parrainage).all()
+    parrainages = ParrainageListRow.fetch(ParrainageListRow.query(db))
     return templates.TemplateResponse(
         "admin/parrainages/list.html",
         {"request": request, "parrainages": parrainages},
@@ -57,47 +59,34 @@ def admin_parrainages_export_excel(request: Request, db: Session = Depends(get_d
     if not check_session(request):
         return RedirectResponse("/auth/login")
 
-    parrainages = (
-        db.query(Parrainage)
-        .options(joinedload(Parrainage.parrain), joinedload(Parrainage.filleule))
-        .order_by(Parrainage.id_parrainage.asc())
-        .all()
+    parrainages = ParrainageListRow.stream(
+        ParrainageListRow.query(db).order_by(Parrainage.id_parrainage.asc()),
+        EXPORT_YIELD_PER,
     )
-
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Parrainages"
-    ws.append([
-        "Parrain nom",
-        "Parrain prénom",
-        "Filleule nom",
-        "Filleule prénom",
-        "Début",
-        "Fin",
-        "Statut",
-    ])
-    for p in parrainages:
-        parrain = p.parrain
-        filleule = p.filleule
-        ws.append([
-            parrain.nom if parrain else "",
-            parrain.prenom if parrain else "",
-            filleule.nom if filleule else "",
-            filleule.prenom if filleule else "",
-            p.date_debut.isoformat() if p.date_debut else "",
-            p.date_fin.isoformat() if p.date_fin else "",
-            p.statut or "",
-        ])
-
-    output = io.BytesIO()
-    wb.save(output)
-    output.seek(0)
-
-    headers = {"Content-Disposition": "attachment; filename=parrainages.xlsx"}
-    return StreamingResponse(
-        output,
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        headers=headers,
+    return xlsx_response(
+        "parrainages.xlsx",
+        "Parrainages",
+        [
+            "Parrain nom",
+            "Parrain prénom",
+            "Filleule nom",
+            "Filleule prénom",
+            "Début",
+            "Fin",
+            "Statut",
+        ],
+        (
+            [
+                p.parrain_nom or "",
+                p.parrain_prenom or "",
+                p.filleule_nom or "",
+                p.filleule_prenom or "",
+                p.date_debut.isoformat() if p.date_debut else "",
+                p.date_fin.isoformat() if p.date_fin else "",
+                p.statut or "",
+            ]
+            for p in parrainages
+        ),
     )
 
 
@@ -162,7 +151,11 @@ def admin_parrainage_detail(id_parrainage: int, request: Request, db: Session =
 
     return templates.TemplateResponse(
         "admin/parrainages/detail.html",
-        {"request": request, "parrainage": obj},
+        {
+            "request": request,
+            "parrainage": obj,
+            "neighbors": neighbors(db.query(Parrainage.id_parrainage), NAV_ORDER, id_parrainage),
+        },
     )
 
 
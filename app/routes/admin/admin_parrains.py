@@ -1,22 +1,24 @@
-import io
 import os
 import shutil
 from pathlib import Path
 from uuid import uuid4
 
 from fastapi import APIRouter, Request, Depends, Form, HTTPException, UploadFile, File
-from fastapi.responses import RedirectResponse, StreamingResponse
+from fastapi.responses import RedirectResponse
 from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
-from openpyxl import Workbook
 
 from app.database import BASE_DIR, get_db
 from app.models.parrain import Parrain
 from app.models.parrainage import Parrainage
+from app.services.excel_export_service import EXPORT_YIELD_PER, xlsx_response
+from app.services.navigation_service import neighbors
 
 router = APIRouter(prefix="/parrains", tags=["Admin - Parrains"])
 templates = Jinja2Templates(directory="app/templates")
 DOCUMENTS_DIR = BASE_DIR / "Documents" / "Parrains"
+# Ordre de la liste (précédent/suivant des fiches), servi par ix_parrains_nom_prenom
+NAV_ORDER = (Parrain.nom, Parrain.prenom, Parrain.id_parrain)
 
 
 def parrain_dir_path(parrain_id: int) -> Path:
@@ -82,30 +84,25 @@ def admin_parrains_export_excel(request: Request, db: Session = Depends(get_db))
     if not check_session(request):
         return RedirectResponse("/auth/login")
 
-    parrains = db.query(Parrain).order_by(Parrain.nom.asc(), Parrain.prenom.asc()).all()
-
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Parrains"
-    ws.append(["Nom", "Prénom", "Téléphone", "Email", "Adresse"])
-    for p in parrains:
-        ws.append([
-            p.nom,
-            p.prenom,
-            p.telephone or "",
-            p.email or "",
-            p.adresse or "",
-        ])
-
-    output = io.BytesIO()
-    wb.save(output)
-    output.seek(0)
-
-    headers = {"Content-Disposition": "attachment; filename=parrains.xlsx"}
-    return StreamingResponse(
-        output,
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        headers=headers,
+    parrains = (
+        db.query(Parrain.nom, Parrain.prenom, Parrain.telephone, Parrain.email, Parrain.adresse)
+        .order_by(Parrain.nom.asc(), Parrain.prenom.asc())
+        .yield_per(EXPORT_YIELD_PER)
+    )
+    return xlsx_response(
+        "parrains.xlsx",
+        "Parrains",
+        ["Nom", "Prénom", "Téléphone", "Email", "Adresse"],
+        (
+            [
+                p.nom,
+                p.prenom,
+                p.telephone or "",
+                p.email or "",
+                p.adresse or "",
+            ]
+            for p in parrains
+        ),
     )
 
 
@@ -163,7 +160,11 @@ def admin_parrain_detail(parrain_id: int, request: Request, db: Session = Depend
 
     return templates.TemplateResponse(
         "admin/parrains/detail.html",
-        {"request": request, "parrain": parrain},
+        {
+            "request": request,
+            "parrain": parrain,
+            "neighbors": neighbors(db.query(Parrain.id_parrain), NAV_ORDER, parrain_id),
+        },
     )
 
 
@@ -179,7 +180,12 @@ def admin_parrain_edit(parrain_id: int, request: Request, db: Session = Depends(
 
     return templates.TemplateResponse(
         "admin/parrains/form.html",
-        {"request": request, "action": "Modifier", "parrain": parrain},
+        {
+            "request": request,
+            "action": "Modifier",
+            "parrain": parrain,
+            "neighbors": neighbors(db.query(Parrain.id_parrain), NAV_ORDER, parrain_id),
+        },
     )
 
 
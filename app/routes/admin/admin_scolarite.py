@@ -1,18 +1,23 @@
 from typing import Optional
-import io
 
 from fastapi import APIRouter, Request, Depends, Form, HTTPException
-from fastapi.responses import RedirectResponse, StreamingResponse
+from fastapi.responses import RedirectResponse
 from fastapi.templating import Jinja2Templates
-from sqlalchemy.orm import Session, joinedload
-from openpyxl import Workbook
+from sqlalchemy.orm import Session
 
 from app.database import get_db
 from app.models.scolarite import Scolarite
 from app.models.filleule import Filleule
-from app.models.correspondant import Correspondant
-from app.models.etablissement import Etablissement
 from app.models.annee_scolaire import AnneeScolaire
+from app.services.excel_export_service import EXPORT_YIELD_PER, xlsx_response
+from app.services.list_rows_service import ScolariteListRow
+from app.services.navigation_service import neighbors
+from app.services.reference_data_service import (
+    annees_scolaires_ref,
+    correspondants_by_prenom_ref,
+    etablissements_ref,
+)
+from app.services.scolarites_service import correspondant_index
 
 router = APIRouter(prefix="/scolarite", tags=["Admin - Scolarité"])
 templates = Jinja2Templates(directory="app/templates")
@@ -25,46 +30,16 @@ def check_session(request: Request):
     return True
 
 
-def resolve_correspondant_id(value: Optional[str], correspondants: list[Correspondant]) -> Optional[int]:
-    if not value:
-        return None
-    value_str = str(value).strip()
-    if value_str.isdigit():
-        return int(value_str)
-    target = value_str.lower()
-    for correspondant in correspondants:
-        full_name = f"{correspondant.prenom} {correspondant.nom}".strip().lower()
-        if target == full_name:
-            return correspondant.id_correspondant
-    return None
-
-
-def resolve_correspondant_label(value: Optional[str], correspondants: list[Correspondant]) -> Optional[str]:
-    if not value:
-        return None
-    value_str = str(value).strip()
-    if value_str.isdigit():
-        for correspondant in correspondants:
-            if correspondant.id_correspondant == int(value_str):
-                return f"{correspondant.prenom} {correspondant.nom}".strip()
-        return value_str
-    return value_str
-
-
 # --- LISTE ---
 @router.get("/")
 def admin_scolarite_list(request: Request, db: Session = Depends(get_db)):
     if not check_session(request):
         return RedirectResponse("/auth/login")
 
-    liste = db.query(Scolarite).all()
-    correspondants = (
-        db.query(Correspondant)
-        .order_by(Correspondant.prenom, Correspondant.nom)
-        .all()
-    )
+    liste = ScolariteListRow.fetch(ScolariteListRow.query(db))
+    referents = correspondant_index()
     referent_labels = {
-        s.id_scolarite: resolve_correspondant_label(s.referent_a, correspondants)
+        s.id_scolarite: referents.label(s.referent_a, s.id_referent_a)
         for s in liste
     }
 
@@ -83,50 +58,25 @@ def admin_scolarite_export_excel(request: Request, db: Session = Depends(get_db)
     if not check_session(request):
         return RedirectResponse("/auth/login")
 
-    scolarites = (
-        db.query(Scolarite)
-        .options(
-            joinedload(Scolarite.filleule),
-            joinedload(Scolarite.etablissement),
-            joinedload(Scolarite.annee_scolaire_ref),
-        )
-        .order_by(Scolarite.id_scolarite.asc())
-        .all()
-    )
-    correspondants = (
-        db.query(Correspondant)
-        .order_by(Correspondant.prenom, Correspondant.nom)
-        .all()
+    scolarites = ScolariteListRow.stream(
+        ScolariteListRow.query(db).order_by(Scolarite.id_scolarite.asc()),
+        EXPORT_YIELD_PER,
     )
-
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Scolarite"
-    ws.append(["Filleule", "Référent A", "Établissement", "Année scolaire", "Niveau"])
-    for s in scolarites:
-        filleule = ""
-        if s.filleule:
-            filleule = f"{s.filleule.prenom} {s.filleule.nom}".strip()
-        referent = resolve_correspondant_label(s.referent_a, correspondants) or ""
-        etablissement = s.etablissement.nom if s.etablissement else ""
-        annee = s.annee_scolaire_ref.periode if s.annee_scolaire_ref else s.annee_scolaire
-        ws.append([
-            filleule,
-            referent,
-            etablissement,
-            annee or "",
-            s.niveau or "",
-        ])
-
-    output = io.BytesIO()
-    wb.save(output)
-    output.seek(0)
-
-    headers = {"Content-Disposition": "attachment; filename=scolarite.xlsx"}
-    return StreamingResponse(
-        output,
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        headers=headers,
+    referents = correspondant_index()
+    return xlsx_response(
+        "scolarite.xlsx",
+        "Scolarite",
+        ["Filleule", "Référent A", "Établissement", "Année scolaire", "Niveau"],
+        (
+            [
+                f"{s.filleule_prenom or ''} {s.filleule_nom or ''}".strip(),
+                referents.label(s.referent_a, s.id_referent_a) or "",
+                s.etablissement_nom or "",
+                s.periode or "",
+                s.niveau or "",
+            ]
+            for s in scolarites
+        ),
     )
 
 
@@ -142,14 +92,10 @@ def admin_scolarite_new(
         return RedirectResponse("/auth/login")
 
     filleules = db.query(Filleule).order_by(Filleule.nom, Filleule.prenom).all()
-    etablissements = db.query(Etablissement).order_by(Etablissement.nom).all()
-    annees = db.query(AnneeScolaire).order_by(AnneeScolaire.periode).all()
-    correspondants = (
-        db.query(Correspondant)
-        .order_by(Correspondant.prenom, Correspondant.nom)
-        .all()
-    )
-    selected_referent_a_id = resolve_correspondant_id(referent_a, correspondants)
+    etablissements = etablissements_ref.rows()
+    annees = annees_scolaires_ref.rows()
+    correspondants = correspondants_by_prenom_ref.rows()
+    selected_referent_a_id = correspondant_index().resolve_id(referent_a)
 
     return templates.TemplateResponse(
         "admin/scolarite/form.html",
@@ -222,19 +168,16 @@ def admin_scolarite_detail(id_scolarite: int, request: Request, db: Session = De
     if not s:
         raise HTTPException(404, "Enregistrement scolarité non trouvé")
 
-    correspondants = (
-        db.query(Correspondant)
-        .order_by(Correspondant.prenom, Correspondant.nom)
-        .all()
-    )
+    referents = correspondant_index()
 
     return templates.TemplateResponse(
         "admin/scolarite/detail.html",
         {
             "request": request,
             "scolarite": s,
-            "referent_a_label": resolve_correspondant_label(s.referent_a, correspondants),
-            "referent_b_label": resolve_correspondant_label(s.referent_b, correspondants),
+            "referent_a_label": referents.label(s.referent_a, s.id_referent_a),
+            "referent_b_label": referents.label(s.referent_b, s.id_referent_b),
+            "neighbors": neighbors(db.query(Scolarite.id_scolarite), (Scolarite.id_scolarite,), id_scolarite),
         },
     )
 
@@ -250,30 +193,19 @@ def admin_scolarite_edit(id_scolarite: int, request: Request, db: Session = Depe
         raise HTTPException(404, "Enregistrement scolarité non trouvé")
 
     filleules = db.query(Filleule).order_by(Filleule.nom, Filleule.prenom).all()
-    etablissements = db.query(Etablissement).order_by(Etablissement.nom).all()
-    annees = db.query(AnneeScolaire).order_by(AnneeScolaire.periode).all()
-    correspondants = (
-        db.query(Correspondant)
-        .order_by(Correspondant.prenom, Correspondant.nom)
-        .all()
-    )
-    selected_referent_a_id = resolve_correspondant_id(s.referent_a, correspondants)
-    selected_referent_b_id = resolve_correspondant_id(s.referent_b, correspondants)
+    etablissements = etablissements_ref.rows()
+    annees = annees_scolaires_ref.rows()
+    correspondants = correspondants_by_prenom_ref.rows()
+    referents = correspondant_index()
+    selected_referent_a_id = s.id_referent_a or referents.resolve_id(s.referent_a)
+    selected_referent_b_id = s.id_referent_b or referents.resolve_id(s.referent_b)
     selected_annee_id = s.id_annee_scolaire
     if not selected_annee_id and s.annee_scolaire:
         periode = s.annee_scolaire
-        matched = (
-            db.query(AnneeScolaire)
-            .filter(AnneeScolaire.periode == periode)
-            .first()
-        )
+        matched = next((a for a in annees if a.periode == periode), None)
         if not matched and "-" in periode:
             normalized = periode.replace("-", "/")
-            matched = (
-                db.query(AnneeScolaire)
-                .filter(AnneeScolaire.periode == normalized)
-                .first()
-            )
+            matched = next((a for a in annees if a.periode == normalized), None)
         if matched:
             selected_annee_id = matched.id_annee_scolaire
 
@@ -0,0 +1,50 @@
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import RedirectResponse
+from fastapi.templating import Jinja2Templates
+
+from app.authz import USER_ADMIN_ROLES, has_any_role
+from app.slow_query_log import (
+    SLOW_QUERY_LOG,
+    SLOW_QUERY_LOG_PATH,
+    SLOW_QUERY_THRESHOLD_MS,
+    clear_slow_queries,
+    get_slow_query_groups,
+)
+
+router = APIRouter(prefix="/slow-queries", tags=["Admin - Requêtes lentes"])
+templates = Jinja2Templates(directory="app/templates")
+
+
+def require_admin(request: Request):
+    if not request.state.user:
+        return RedirectResponse("/auth/login")
+    if not has_any_role(request, USER_ADMIN_ROLES):
+        raise HTTPException(403, "Acces interdit")
+    return None
+
+
+@router.get("/")
+def admin_slow_queries_list(request: Request):
+    redirect = require_admin(request)
+    if redirect:
+        return redirect
+
+    return templates.TemplateResponse(
+        "admin/slow_queries/list.html",
+        {
+            "request": request,
+            "groups": get_slow_query_groups(),
+            "enabled": SLOW_QUERY_LOG,
+            "threshold_ms": SLOW_QUERY_THRESHOLD_MS,
+            "log_path": SLOW_QUERY_LOG_PATH,
+        },
+    )
+
+
+@router.post("/clear")
+def admin_slow_queries_clear(request: Request):
+    redirect = require_admin(request)
+    if redirect:
+        return redirect
+    clear_slow_queries()
+    return RedirectResponse("/admin/slow-queries/", status_code=303)
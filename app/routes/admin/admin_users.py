@@ -9,6 +9,8 @@ from app.database import get_db
 from app.models.role import Role
 from app.models.user import User
 from app.security import hash_password
+from app.services.session_service import mark_sessions_revoked, revoke_user_sessions
+from app.services.user_cache_service import invalidate_user
 
 router = APIRouter(prefix="/users", tags=["Admin - Utilisateurs"])
 templates = Jinja2Templates(directory="app/templates")
@@ -104,6 +106,7 @@ def admin_user_create(
     user.roles = role_objects
     db.add(user)
     db.commit()
+    invalidate_user(user.id)
 
     return RedirectResponse("/admin/users", status_code=302)
 
@@ -180,17 +183,25 @@ def admin_user_update(
     if is_admin_user(user) and not is_admin:
         raise HTTPException(403, "Acces interdit")
 
+    previous_role_names = {role.name for role in user.roles}
+    password_changed = bool(password and password.strip())
+
     user.email = email
     user.fullname = fullname
-    if password and password.strip():
+    if password_changed:
         user.hashed_password = hash_password(password)
     if is_admin:
         role_objects = []
         if roles:
             role_objects = db.query(Role).filter(Role.name.in_(roles)).all()
         user.roles = role_objects
+    # Seuls les droits (rôles) et le mot de passe invalident les sessions ouvertes;
+    # nom et email du jeton sont rafraîchis à la prochaine connexion.
+    if password_changed or {role.name for role in user.roles} != previous_role_names:
+        revoke_user_sessions(user)
 
     db.commit()
+    mark_sessions_revoked(user_id, user.session_version)
 
     return RedirectResponse(f"/admin/users/{user_id}", status_code=302)
 
@@ -208,5 +219,6 @@ def admin_user_delete(user_id: int, request: Request, db: Session = Depends(get_
     user.roles = []
     db.delete(user)
     db.commit()
+    mark_sessions_revoked(user_id)
 
     return RedirectResponse("/admin/users", status_code=302)
@@ -1,14 +1,17 @@
 from fastapi import APIRouter, Request, HTTPException
 from fastapi.responses import JSONResponse
-from sqlalchemy import func
-from sqlalchemy.orm import aliased
+from sqlalchemy import func, select
 
-from app.authz import DASHBOARD_ROLES, has_any_role
-from app.database import SessionLocal
+from app.authz import DASHBOARD_ROLES, USER_ADMIN_ROLES, has_any_role
+from app.database import AsyncSessionLocal, engine
+from app.db_pool import get_pool_metrics
 from app.models.filleule import Filleule
 from app.models.etablissement import Etablissement
 from app.models.parrainage import Parrainage
-from app.models.scolarite import Scolarite
+from app.services.stats_service import get_niveau_stats
+from app.services.connection_log_service import get_connection_log_stats
+from app.services.reference_data_service import get_reference_cache_stats
+from app.services.user_cache_service import get_user_cache_stats
 
 router = APIRouter(prefix="/admin/api", tags=["Admin API"])
 
@@ -19,22 +22,27 @@ def require_admin(request: Request):
         raise HTTPException(403, "Acces interdit")
 
 
+def require_system_admin(request: Request):
+    if not request.state.user:
+        raise HTTPException(401, "Non authentifié")
+    if not has_any_role(request, USER_ADMIN_ROLES):
+        raise HTTPException(403, "Acces interdit")
+
+
 @router.get("/filleuls-par-etab")
 async def api_filleuls_par_etab(request: Request, etablissement_id: list[int] = None):
     require_admin(request)
 
-    db = SessionLocal()
-
     query = (
-        db.query(Etablissement.nom, func.count(Filleule.id_filleule))
+        select(Etablissement.nom, func.count(Filleule.id_filleule))
         .join(Filleule, Filleule.etablissement_id == Etablissement.id_etablissement)
     )
 
     if etablissement_id:
-       query = query.filter(Etablissement.id_etablissement.in_(etablissement_id))
+        query = query.where(Etablissement.id_etablissement.in_(etablissement_id))
 
-    rows = query.group_by(Etablissement.nom).all()
-    db.close()
+    async with AsyncSessionLocal() as db:
+        rows = (await db.execute(query.group_by(Etablissement.nom))).all()
 
     labels = [r[0] for r in rows]
     data = [r[1] for r in rows]
@@ -45,20 +53,15 @@ async def api_filleuls_par_etab(request: Request, etablissement_id: list[int] =
 @router.get("/parrainages-par-annee")
 async def api_parrainages_par_annee(request: Request, annee: int = None):
     require_admin(request)
-    db = SessionLocal()
 
-    query = (
-        db.query(
-            func.extract('year', Parrainage.date_debut).label("annee"),
-            func.count(Parrainage.id_parrainage)
-        )
-    )
+    annee_expr = func.extract("year", Parrainage.date_debut).label("annee")
+    query = select(annee_expr, func.count(Parrainage.id_parrainage))
 
     if annee:
-        query = query.filter(func.extract('year', Parrainage.date_debut) == annee)
+        query = query.where(func.extract("year", Parrainage.date_debut) == annee)
 
-    rows = query.group_by("annee").order_by("annee").all()
-    db.close()
+    async with AsyncSessionLocal() as db:
+        rows = (await db.execute(query.group_by(annee_expr).order_by(annee_expr))).all()
 
     labels = [int(r[0]) for r in rows]
     data = [r[1] for r in rows]
@@ -68,21 +71,33 @@ async def api_parrainages_par_annee(request: Request, annee: int = None):
 @router.get("/niveau-scolaire")
 async def api_niveau_scolaire(request: Request):
     require_admin(request)
-    db = SessionLocal()
-    latest_scolarite = (
-        db.query(Scolarite.id_filleule, func.max(Scolarite.id_scolarite).label("max_id"))
-        .group_by(Scolarite.id_filleule)
-        .subquery()
-    )
-    ScolariteLatest = aliased(Scolarite)
-    rows = (
-        db.query(ScolariteLatest.niveau, func.count(ScolariteLatest.id_scolarite))
-        .join(latest_scolarite, ScolariteLatest.id_scolarite == latest_scolarite.c.max_id)
-        .group_by(ScolariteLatest.niveau)
-        .all()
-    )
-    db.close()
+    async with AsyncSessionLocal() as db:
+        rows = await get_niveau_stats(db)
     return JSONResponse({
         "labels": [r[0] for r in rows],
         "data": [r[1] for r in rows]
     })
+
+
+@router.get("/user-cache")
+async def api_user_cache(request: Request):
+    require_system_admin(request)
+    return JSONResponse(get_user_cache_stats())
+
+
+@router.get("/reference-cache")
+async def api_reference_cache(request: Request):
+    require_system_admin(request)
+    return JSONResponse(get_reference_cache_stats())
+
+
+@router.get("/connection-log")
+async def api_connection_log(request: Request):
+    require_system_admin(request)
+    return JSONResponse(get_connection_log_stats())
+
+
+@router.get("/db-pool")
+async def api_db_pool(request: Request):
+    require_system_admin(request)
+    return JSONResponse(get_pool_metrics(engine))
@@ -3,7 +3,12 @@ from fastapi.responses import RedirectResponse
 from fastapi.templating import Jinja2Templates
 
 from app.authz import DASHBOARD_ROLES, has_any_role
-from app.services.stats_service import get_dashboard_stats, get_chart_data
+from app.services.stats_service import (
+    format_server_timing,
+    get_chart_data,
+    get_dashboard_stats,
+    run_sections,
+)
 
 router = APIRouter(prefix="/admin", tags=["Admin Dashboard"])
 templates = Jinja2Templates(directory="app/templates")
@@ -24,14 +29,18 @@ async def admin_dashboard(request: Request):
     if not has_any_role(request, DASHBOARD_ROLES):
         raise HTTPException(403, "Acces interdit")
 
-    stats = await get_dashboard_stats()
-    charts = await get_chart_data()
+    sections, section_timings = await run_sections(
+        {"stats": get_dashboard_stats, "charts": get_chart_data}
+    )
 
-    return templates.TemplateResponse(
+    response = templates.TemplateResponse(
         "admin/dashboard.html",
         {
             "request": request,
-            "stats": stats,
-            "charts": charts
+            "stats": sections.get("stats", {}),
+            "charts": sections.get("charts", {}),
+            "section_timings": section_timings,
         }
     )
+    response.headers["Server-Timing"] = format_server_timing(section_timings)
+    return response
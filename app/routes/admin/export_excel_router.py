@@ -1,14 +1,12 @@
 from fastapi import APIRouter, Query, Request, HTTPException
-from fastapi.responses import FileResponse
-from sqlalchemy import func
-from sqlalchemy.orm import aliased
-from openpyxl import Workbook
+from fastapi.responses import FileResponse, JSONResponse
 
-from app.database import SessionLocal
-from app.models.filleule import Filleule
-from app.models.etablissement import Etablissement
-from app.models.parrainage import Parrainage
-from app.models.scolarite import Scolarite
+from app.services.export_jobs_service import (
+    STATUS_FAILED,
+    ExportJob,
+    get_export_job,
+    submit_export_job,
+)
 
 router = APIRouter(prefix="/admin/export", tags=["Export Excel"])
 
@@ -18,65 +16,62 @@ def require_admin(request: Request):
         raise HTTPException(401, "Non authentifié")
 
 
+def job_payload(job: ExportJob) -> dict:
+    return {
+        **job.to_dict(),
+        "ready": job.is_ready(),
+        "status_url": f"/admin/export/jobs/{job.id}",
+        "download_url": f"/admin/export/jobs/{job.id}/download",
+    }
+
+
 @router.get("/excel")
-def export_excel(
+def export_excel(request: Request):
+    """
+    Ancien lien de téléchargement direct : l'export est désormais une tâche de fond
+    créée par POST /admin/export/jobs (un GET ne doit pas lancer de traitement).
+    """
+    require_admin(request)
+
+    raise HTTPException(405, "Export Excel : utiliser POST /admin/export/jobs puis suivre status_url")
+
+
+@router.post("/jobs")
+def create_export_job(
     request: Request,
     etablissement_id: list[int] = Query(None),
     annee: int = None
 ):
+    """
+    Lance (ou reprend, pour les mêmes filtres) l'export en tâche de fond.
+    Suivi : status_url; fichier : download_url une fois la tâche terminée.
+    """
     require_admin(request)
 
-    db = SessionLocal()
-
-    # Base query
-    latest_scolarite = (
-        db.query(Scolarite.id_filleule, func.max(Scolarite.id_scolarite).label("max_id"))
-        .group_by(Scolarite.id_filleule)
-        .subquery()
-    )
-    ScolariteLatest = aliased(Scolarite)
-
-    query = db.query(
-        Filleule.nom,
-        Filleule.prenom,
-        Etablissement.nom.label("etablissement"),
-        ScolariteLatest.niveau.label("niveau_scolaire"),
-    ).join(
-        Etablissement,
-        Etablissement.id_etablissement == Filleule.etablissement_id,
-    ).outerjoin(
-        latest_scolarite,
-        latest_scolarite.c.id_filleule == Filleule.id_filleule,
-    ).outerjoin(
-        ScolariteLatest,
-        ScolariteLatest.id_scolarite == latest_scolarite.c.max_id,
-    )
-
-    # Filtre établissements (multi-sélection)
-    if etablissement_id:
-        query = query.filter(Filleule.etablissement_id.in_(etablissement_id))
-
-    # Filtre année
-    if annee:
-        query = query.join(Parrainage, Parrainage.id_filleule == Filleule.id_filleule)
-        query = query.filter(func.extract('year', Parrainage.date_debut) == annee)
-
-    rows = query.all()
-    db.close()
-
-    # Génération Excel
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Données filtrées"
-
-    # En-têtes
-    ws.append(["Nom", "Prénom", "Établissement", "Niveau scolaire"])
-
-    # Lignes du tableau
-    for r in rows:
-        ws.append(list(r))
-
-    file_path = "/tmp/export.xlsx"
-    wb.save(file_path)
-
-    return FileResponse(file_path, filename="export.xlsx")
+    job = submit_export_job(etablissement_id, annee)
+    return JSONResponse(job_payload(job), status_code=202)
+
+
+@router.get("/jobs/{job_id}")
+def export_job_status(job_id: str, request: Request):
+    require_admin(request)
+
+    job = get_export_job(job_id)
+    if not job:
+        raise HTTPException(404, "Export introuvable ou expiré")
+    return job_payload(job)
+
+
+@router.get("/jobs/{job_id}/download")
+def export_job_download(job_id: str, request: Request):
+    require_admin(request)
+
+    job = get_export_job(job_id)
+    if not job:
+        raise HTTPException(404, "Export introuvable ou expiré")
+    if job.status == STATUS_FAILED:
+        raise HTTPException(500, f"Export en échec : {job.error}")
+    if not job.is_ready():
+        raise HTTPException(409, "Export en cours de préparation")
+
+    return FileResponse(job.path, filename="export.xlsx")
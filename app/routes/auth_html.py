@@ -15,6 +15,13 @@ from app.services.password_reset_service import (
     set_user_reset_token,
     verify_user_reset_token,
 )
+from app.services.session_service import (
+    SESSION_COOKIE_MAX_AGE,
+    SESSION_COOKIE_NAME,
+    issue_session_token,
+    mark_sessions_revoked,
+    revoke_user_sessions,
+)
 
 router = APIRouter(prefix="/auth", tags=["Auth HTML"])
 templates = Jinja2Templates(directory="app/templates")
@@ -59,21 +66,27 @@ def login_submit(
     # Login OK → création cookie session
     response = RedirectResponse("/", status_code=302)
     response.set_cookie(
-        key="session",
-        value=str(user.id),
+        key=SESSION_COOKIE_NAME,
+        value=issue_session_token(user),
         httponly=True,
-        max_age=86400,       # 24h
+        max_age=SESSION_COOKIE_MAX_AGE,
     )
     return response
 
 
 @router.get("/logout")
-def logout(request: Request):
+def logout(request: Request, db: Session = Depends(get_db)):
     """
-    Supprime la session actuelle
+    Supprime la session actuelle (et révoque les jetons émis pour cet utilisateur)
     """
+    if request.state.user:
+        user = db.query(User).filter(User.id == request.state.user.id).first()
+        if user:
+            revoke_user_sessions(user)
+            db.commit()
+            mark_sessions_revoked(user.id, user.session_version)
     response = RedirectResponse("/", status_code=302)
-    response.delete_cookie("session")
+    response.delete_cookie(SESSION_COOKIE_NAME)
     return response
 
 
@@ -182,6 +195,8 @@ def reset_password_submit(
 
     user.hashed_password = hash_password(password)
     clear_user_reset_token(user)
+    revoke_user_sessions(user)
     db.commit()
+    mark_sessions_revoked(user.id, user.session_version)
 
     return RedirectResponse("/auth/login?reset=success", status_code=302)
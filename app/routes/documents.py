@@ -6,6 +6,7 @@ from sqlalchemy.orm import Session
 from app.database import get_db
 from app.models.document import Document
 from app.schemas.document import DocumentCreate, DocumentResponse
+from app.services.list_rows_service import DocumentListRow
 
 router = APIRouter(prefix="/documents", tags=["Documents"])
 templates = Jinja2Templates(directory="app/templates")
@@ -20,7 +21,7 @@ def liste_documents_html(request: Request, db: Session = Depends(get_db)):
     if not request.state.user:
         return RedirectResponse("/auth/login")
 
-    data = db.query(Document).all()
+    data = DocumentListRow.fetch(DocumentListRow.query(db))
     return templates.TemplateResponse(
         "documents/list.html",
         {"request": request, "documents": data}
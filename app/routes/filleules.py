@@ -1,23 +1,37 @@
 from datetime import datetime
+from urllib.parse import urlencode
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from fastapi.responses import RedirectResponse
 from fastapi.templating import Jinja2Templates
-from sqlalchemy import func
 from sqlalchemy.orm import Session, joinedload
 
 from app.database import get_db
 from app.models.document import Document
 from app.models.filleule import Filleule
+from app.models.filleule_summary import FilleuleSummary
 from app.models.parrainage import Parrainage
 from app.models.scolarite import Scolarite
-from app.models.correspondant import Correspondant
 from app.schemas.filleule import FilleuleCreate, FilleuleResponse
+from app.services.counters_service import filleule_counters
+from app.services.filleule_list_service import (
+    LIST_CONTEXT_PARAMS,
+    LIST_SORTS,
+    apply_list_filters,
+    filleule_neighbors,
+)
+from app.services.list_rows_service import FilleuleListRow
+from app.services.navigation_service import list_context
+from app.services.pagination_service import decode_cursor, encode_cursor, keyset_condition, ordering
+from app.services.scolarites_service import correspondant_index, scolarite_sort_key
 
 router = APIRouter(prefix="/filleules", tags=["Filleules"])
 
 templates = Jinja2Templates(directory="app/templates")
 
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 200
+
 
 # --------------------------------------------------------
 #                    ROUTES HTML PROTÉGÉES
@@ -31,119 +45,90 @@ def liste_filleules_html(
     village: str | None = Query(default=None),
     sans_parrains: int | None = None,
     couverture_sante: int | None = None,
+    q: str | None = Query(default=None),
+    sort: str = "nom",
+    order: str = "asc",
+    page_size: int = DEFAULT_PAGE_SIZE,
+    after: str | None = None,
+    before: str | None = None,
     db: Session = Depends(get_db),
 ):
     """
-    Affiche la liste des filleules en HTML.
+    Affiche la liste des filleules en HTML, page par page (curseurs sur le tri).
     Page protégée : nécessite une session utilisateur.
     """
     if not request.state.user:
         return RedirectResponse("/auth/login")
 
-    count_without_parrains = (
-        db.query(Filleule)
-        .filter(~Filleule.parrainages.any())
-        .count()
-    )
-    count_couverture_sante = (
-        db.query(Filleule)
-        .filter(Filleule.couverture_sante.isnot(None))
-        .filter(func.trim(Filleule.couverture_sante) != "")
-        .filter(func.lower(func.trim(Filleule.couverture_sante)) != "none")
-        .count()
-    )
+    sort = sort if sort in LIST_SORTS else "nom"
+    descending = order == "desc"
+    page_size = min(max(page_size, 1), MAX_PAGE_SIZE)
+    sort_columns = LIST_SORTS[sort]
 
-    query = db.query(Filleule).options(
-        joinedload(Filleule.scolarites).joinedload(Scolarite.etablissement),
-        joinedload(Filleule.scolarites).joinedload(Scolarite.annee_scolaire_ref),
-        joinedload(Filleule.correspondant),
+    query = FilleuleListRow.query(db).add_columns(*sort_columns)
+    query = apply_list_filters(
+        query, filiere, annee_rentree, village, sans_parrains, couverture_sante, q
     )
-    if filiere:
-        filiere_value = filiere.strip().lower()
-        if filiere_value:
-            ids_subquery = (
-                db.query(Scolarite.id_filleule)
-                .filter(Scolarite.filiere.isnot(None))
-                .filter(func.trim(Scolarite.filiere) != "")
-                .filter(func.lower(Scolarite.filiere) == filiere_value)
-                .distinct()
-                .subquery()
-            )
-            query = query.filter(Filleule.id_filleule.in_(ids_subquery))
-    if annee_rentree:
-        annee_value = annee_rentree.strip().lower()
-        if annee_value:
-            query = (
-                query.filter(Filleule.annee_rentree.isnot(None))
-                .filter(func.trim(Filleule.annee_rentree) != "")
-                .filter(func.lower(func.trim(Filleule.annee_rentree)) == annee_value)
-            )
-    if village:
-        village_value = village.strip().lower()
-        if village_value:
-            query = (
-                query.filter(Filleule.village.isnot(None))
-                .filter(func.trim(Filleule.village) != "")
-                .filter(func.lower(func.trim(Filleule.village)) == village_value)
-            )
-    if sans_parrains:
-        query = query.filter(~Filleule.parrainages.any())
-    if couverture_sante:
-        query = (
-            query.filter(Filleule.couverture_sante.isnot(None))
-            .filter(func.trim(Filleule.couverture_sante) != "")
-            .filter(func.lower(func.trim(Filleule.couverture_sante)) != "none")
-        )
 
-    query = query.order_by(Filleule.nom, Filleule.prenom)
-    data = query.all()
-
-    def periode_from_scolarite(record: Scolarite) -> str | None:
-        if record.annee_scolaire_ref and record.annee_scolaire_ref.periode:
-            return record.annee_scolaire_ref.periode
-        return record.annee_scolaire
-
-    def start_year_key(periode: str | None) -> int:
-        if not periode:
-            return -1
-        cleaned = periode.replace("-", "/")
-        first = cleaned.split("/", 1)[0]
-        digits = "".join(ch for ch in first if ch.isdigit())
-        if len(digits) < 4:
-            return -1
-        try:
-            return int(digits[:4])
-        except ValueError:
-            return -1
-
-    recent_scolarite: dict[int, dict[str, str]] = {}
-    for filleule in data:
-        best_key = (-1, -1)
-        best_item: dict[str, str] | None = None
-        for record in filleule.scolarites:
-            periode = periode_from_scolarite(record)
-            key = (start_year_key(periode), record.id_scolarite or 0)
-            if key > best_key:
-                best_key = key
-                best_item = {
-                    "periode": periode or "-",
-                    "etablissement": record.etablissement.nom if record.etablissement else "-",
-                }
-        if best_item:
-            recent_scolarite[filleule.id_filleule] = best_item
+    after_values = decode_cursor(after, len(sort_columns))
+    before_values = decode_cursor(before, len(sort_columns)) if after_values is None else None
+    if before_values is not None:
+        # Page précédente : on parcourt l'ordre inverse puis on remet les lignes dans l'ordre
+        query = query.filter(keyset_condition(sort_columns, before_values, not descending))
+        query = query.order_by(*ordering(sort_columns, not descending))
+    else:
+        if after_values is not None:
+            query = query.filter(keyset_condition(sort_columns, after_values, descending))
+        query = query.order_by(*ordering(sort_columns, descending))
+
+    rows = query.limit(page_size + 1).all()
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    if before_values is not None:
+        rows.reverse()
+        has_previous, has_next = has_more, True
+    else:
+        has_previous, has_next = after_values is not None, has_more
+
+    data = FilleuleListRow.from_rows(rows)
+
+    base_params = {
+        key: value
+        for key, value in request.query_params.items()
+        if key not in {"after", "before"}
+    }
+
+    def page_url(**params) -> str:
+        return f"/filleules/html?{urlencode({**base_params, **params})}"
+
+    def sort_url(column: str) -> str:
+        params = {key: value for key, value in base_params.items() if key not in {"sort", "order"}}
+        next_order = "desc" if column == sort and not descending else "asc"
+        return f"/filleules/html?{urlencode({**params, 'sort': column, 'order': next_order})}"
 
     return templates.TemplateResponse(
         "filleules/list.html",
         {
             "request": request,
             "filleules": data,
-            "recent_scolarite": recent_scolarite,
+            "counters": filleule_counters.get(db),
             "showing_without_parrains": bool(sans_parrains),
-            "count_without_parrains": count_without_parrains,
             "showing_couverture_sante": bool(couverture_sante),
-            "count_couverture_sante": count_couverture_sante,
-            "debug_couverture_sante_param": couverture_sante,
-            "debug_couverture_sante_filtered": len(data),
+            "search": (q or "").strip(),
+            # Filtres actifs conservés par le formulaire de recherche (qui repart de la première page)
+            "search_params": {
+                key: value
+                for key, value in base_params.items()
+                if key != "q" and value
+            },
+            "sort": sort,
+            "descending": descending,
+            "page_size": page_size,
+            "sort_urls": {column: sort_url(column) for column in LIST_SORTS},
+            "detail_query": urlencode(list_context(request.query_params, LIST_CONTEXT_PARAMS)),
+            "first_url": page_url() if has_previous else None,
+            "previous_url": page_url(before=encode_cursor(rows[0][-len(sort_columns):])) if has_previous and rows else None,
+            "next_url": page_url(after=encode_cursor(rows[-1][-len(sort_columns):])) if has_next and rows else None,
         }
     )
 
@@ -156,6 +141,7 @@ def liste_filleules_pdf(
     village: str | None = Query(default=None),
     sans_parrains: int | None = None,
     couverture_sante: int | None = None,
+    q: str | None = Query(default=None),
     db: Session = Depends(get_db),
 ):
     """
@@ -165,96 +151,29 @@ def liste_filleules_pdf(
     if not request.state.user:
         return RedirectResponse("/auth/login")
 
-    query = db.query(Filleule).options(
-        joinedload(Filleule.scolarites).joinedload(Scolarite.etablissement),
-        joinedload(Filleule.scolarites).joinedload(Scolarite.annee_scolaire_ref),
-        joinedload(Filleule.correspondant),
-        joinedload(Filleule.parrainages).joinedload(Parrainage.parrain),
+    query = (
+        db.query(Filleule, FilleuleSummary)
+        .options(joinedload(Filleule.correspondant))
+        .outerjoin(FilleuleSummary, FilleuleSummary.id_filleule == Filleule.id_filleule)
+    )
+    query = apply_list_filters(
+        query, filiere, annee_rentree, village, sans_parrains, couverture_sante, q
     )
-    if filiere:
-        filiere_value = filiere.strip().lower()
-        if filiere_value:
-            ids_subquery = (
-                db.query(Scolarite.id_filleule)
-                .filter(Scolarite.filiere.isnot(None))
-                .filter(func.trim(Scolarite.filiere) != "")
-                .filter(func.lower(Scolarite.filiere) == filiere_value)
-                .distinct()
-                .subquery()
-            )
-            query = query.filter(Filleule.id_filleule.in_(ids_subquery))
-    if annee_rentree:
-        annee_value = annee_rentree.strip().lower()
-        if annee_value:
-            query = (
-                query.filter(Filleule.annee_rentree.isnot(None))
-                .filter(func.trim(Filleule.annee_rentree) != "")
-                .filter(func.lower(func.trim(Filleule.annee_rentree)) == annee_value)
-            )
-    if village:
-        village_value = village.strip().lower()
-        if village_value:
-            query = (
-                query.filter(Filleule.village.isnot(None))
-                .filter(func.trim(Filleule.village) != "")
-                .filter(func.lower(func.trim(Filleule.village)) == village_value)
-            )
-    if sans_parrains:
-        query = query.filter(~Filleule.parrainages.any())
-    if couverture_sante:
-        query = (
-            query.filter(Filleule.couverture_sante.isnot(None))
-            .filter(func.trim(Filleule.couverture_sante) != "")
-            .filter(func.lower(func.trim(Filleule.couverture_sante)) != "none")
-        )
 
-    data = query.all()
-
-    def periode_from_scolarite(record: Scolarite) -> str | None:
-        if record.annee_scolaire_ref and record.annee_scolaire_ref.periode:
-            return record.annee_scolaire_ref.periode
-        return record.annee_scolaire
-
-    def start_year_key(periode: str | None) -> int:
-        if not periode:
-            return -1
-        cleaned = periode.replace("-", "/")
-        first = cleaned.split("/", 1)[0]
-        digits = "".join(ch for ch in first if ch.isdigit())
-        if len(digits) < 4:
-            return -1
-        try:
-            return int(digits[:4])
-        except ValueError:
-            return -1
-
-    recent_scolarite: dict[int, dict[str, str]] = {}
-    for filleule in data:
-        best_key = (-1, -1)
-        best_item: dict[str, str] | None = None
-        for record in filleule.scolarites:
-            periode = periode_from_scolarite(record)
-            key = (start_year_key(periode), record.id_scolarite or 0)
-            if key > best_key:
-                best_key = key
-                best_item = {
-                    "periode": periode or "-",
-                    "etablissement": record.etablissement.nom if record.etablissement else "-",
-                }
-        if best_item:
-            recent_scolarite[filleule.id_filleule] = best_item
-
-    parrain_labels: dict[int, str] = {}
-    for filleule in data:
-        seen_parrains = set()
-        names = []
-        for parrainage in filleule.parrainages:
-            parrain = parrainage.parrain
-            if not parrain or parrain.id_parrain in seen_parrains:
-                continue
-            seen_parrains.add(parrain.id_parrain)
-            names.append(f"{parrain.prenom} {parrain.nom}".strip())
-        parrain_labels[filleule.id_filleule] = ", ".join(names) if names else "-"
+    rows = query.all()
+    data = [filleule for filleule, _ in rows]
+    recent_scolarite = {
+        filleule.id_filleule: {
+            "periode": summary.periode or "-",
+            "etablissement": summary.etablissement or "-",
+        }
+        for filleule, summary in rows
+        if summary and (summary.periode or summary.etablissement)
+    }
+    parrain_labels = {
+        filleule.id_filleule: (summary.parrains if summary and summary.parrains else "-")
+        for filleule, summary in rows
+    }
 
     return templates.TemplateResponse(
         "filleules/pdf.html",
@@ -294,29 +213,7 @@ def detail_filleule_html(filleule_id: int, request: Request, db: Session = Depen
     if not f:
         raise HTTPException(status_code=404, detail="Filleule non trouvée")
 
-    def periode_from_scolarite(record: Scolarite) -> str | None:
-        if record.annee_scolaire_ref and record.annee_scolaire_ref.periode:
-            return record.annee_scolaire_ref.periode
-        return record.annee_scolaire
-
-    def start_year_key(periode: str | None) -> int:
-        if not periode:
-            return -1
-        cleaned = periode.replace("-", "/")
-        first = cleaned.split("/", 1)[0]
-        digits = "".join(ch for ch in first if ch.isdigit())
-        if len(digits) < 4:
-            return -1
-        try:
-            return int(digits[:4])
-        except ValueError:
-            return -1
-
-    scolarites = sorted(
-        f.scolarites,
-        key=lambda record: (start_year_key(periode_from_scolarite(record)), record.id_scolarite or 0),
-        reverse=True,
-    )
+    scolarites = sorted(f.scolarites, key=scolarite_sort_key, reverse=True)
 
     parrains = []
     seen_parrains = set()
@@ -326,14 +223,13 @@ def detail_filleule_html(filleule_id: int, request: Request, db: Session = Depen
             seen_parrains.add(parrain.id_parrain)
             parrains.append(parrain)
 
-    correspondants = (
-        db.query(Correspondant)
-        .order_by(Correspondant.prenom, Correspondant.nom)
-        .all()
-    )
-    correspondants_map = {
-        str(c.id_correspondant): f"{c.prenom} {c.nom}".strip()
-        for c in correspondants
+    referents = correspondant_index()
+    referent_labels = {
+        s.id_scolarite: (
+            referents.label(s.referent_a, s.id_referent_a),
+            referents.label(s.referent_b, s.id_referent_b),
+        )
+        for s in scolarites
     }
 
     documents = sorted(
@@ -355,7 +251,8 @@ def detail_filleule_html(filleule_id: int, request: Request, db: Session = Depen
             "scolarites": scolarites,
             "parrains": parrains,
             "correspondant": f.correspondant,
-            "correspondants_map": correspondants_map,
+            "referent_labels": referent_labels,
+            "neighbors": filleule_neighbors(db, request.query_params, filleule_id),
             "documents": documents,
             "suivis": suivis,
         }
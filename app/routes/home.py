@@ -1,3 +1,4 @@
+import asyncio
 import json
 
 from fastapi import APIRouter, Request
@@ -5,6 +6,7 @@ from fastapi.responses import RedirectResponse
 from fastapi.templating import Jinja2Templates
 
 from app.services.stats_service import (
+    format_server_timing,
     get_chart_data,
     get_city_origin_stats,
     get_dashboard_stats,
@@ -12,6 +14,7 @@ from app.services.stats_service import (
     get_filleules_rentree_stats,
     get_essaouira_map,
     get_annees_scolaires,
+    run_sections,
 )
 
 templates = Jinja2Templates(directory="app/templates")
@@ -44,17 +47,29 @@ async def dashboard(request: Request):
     historique_rentree = []
     historique_max = 0
     map_data = None
+    section_timings = {}
     if request.state.user:
-        stats = await get_dashboard_stats()
-        charts = await get_chart_data()
-        city_stats = await get_city_origin_stats()
-        filiere_stats = await get_filiere_stats()
-        annees_scolaires = await get_annees_scolaires()
-        historique = await get_filleules_rentree_stats()
-        historique_rentree = historique["data"]
-        historique_max = historique["max_count"]
-        map_data = get_essaouira_map()
-    return templates.TemplateResponse(
+        sections, section_timings = await run_sections(
+            {
+                "stats": get_dashboard_stats,
+                "charts": get_chart_data,
+                "city": get_city_origin_stats,
+                "filiere": get_filiere_stats,
+                "annees": get_annees_scolaires,
+                "rentree": get_filleules_rentree_stats,
+                "map": lambda: asyncio.to_thread(get_essaouira_map),
+            }
+        )
+        stats = sections.get("stats", stats)
+        charts = sections.get("charts", charts)
+        city_stats = sections.get("city", city_stats)
+        filiere_stats = sections.get("filiere", filiere_stats)
+        annees_scolaires = sections.get("annees", annees_scolaires)
+        if "rentree" in sections:
+            historique_rentree = sections["rentree"]["data"]
+            historique_max = sections["rentree"]["max_count"]
+        map_data = sections.get("map")
+    response = templates.TemplateResponse(
         "dashboard.html",
         {
             "request": request,
@@ -67,5 +82,9 @@ async def dashboard(request: Request):
             "historique_max": historique_max,
             "map_json": json.dumps(map_data) if map_data else "null",
             "city_json": json.dumps(city_stats["cities"]),
+            "section_timings": section_timings,
         },
     )
+    if section_timings:
+        response.headers["Server-Timing"] = format_server_timing(section_timings)
+    return response
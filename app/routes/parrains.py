@@ -13,6 +13,8 @@ from app.database import BASE_DIR, get_db
 from app.models.parrain import Parrain
 from app.models.parrainage import Parrainage
 from app.schemas.parrain import ParrainCreate, ParrainResponse
+from app.services.counters_service import parrain_counters, parrain_sans_filleule
+from app.services.list_rows_service import ParrainListRow
 
 router = APIRouter(prefix="/parrains", tags=["Parrains"])
 
@@ -49,20 +51,17 @@ def liste_parrains_html(
     if not request.state.user:
         return RedirectResponse("/auth/login")
 
-    without_filleules_query = db.query(Parrain).filter(~Parrain.parrainages.any())
-    count_without_filleules = without_filleules_query.count()
-
-    query = db.query(Parrain)
+    query = ParrainListRow.query(db)
     if sans_filleules:
-        query = without_filleules_query
-    data = query.all()
+        query = query.filter(parrain_sans_filleule())
+    data = ParrainListRow.fetch(query)
     return templates.TemplateResponse(
         "parrains/list.html",
         {
             "request": request,
             "parrains": data,
+            "counters": parrain_counters.get(db),
             "showing_without_filleules": bool(sans_filleules),
-            "count_without_filleules": count_without_filleules,
         }
     )
 
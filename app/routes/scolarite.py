@@ -1,19 +1,18 @@
-import io
-from typing import Optional
-
 from fastapi import APIRouter, Depends, HTTPException, Request
-from fastapi.responses import RedirectResponse, StreamingResponse
+from fastapi.responses import RedirectResponse
 from sqlalchemy import or_
 from sqlalchemy.orm import Session
 from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import joinedload
-from openpyxl import Workbook
 
 from app.database import get_db
 from app.models.scolarite import Scolarite
 from app.models.annee_scolaire import AnneeScolaire
-from app.models.correspondant import Correspondant
 from app.schemas.scolarite import ScolariteCreate, ScolariteResponse
+from app.services.excel_export_service import EXPORT_YIELD_PER, xlsx_response
+from app.services.list_rows_service import ScolariteListRow
+from app.services.reference_data_service import annees_scolaires_ref
+from app.services.scolarites_service import correspondant_index
 
 router = APIRouter(prefix="/scolarite", tags=["Scolarité"])
 
@@ -27,21 +26,6 @@ def check_session(request: Request) -> bool:
     return True
 
 
-def resolve_correspondant_label(
-    value: Optional[str],
-    correspondants: list[Correspondant],
-) -> Optional[str]:
-    if not value:
-        return None
-    value_str = str(value).strip()
-    if value_str.isdigit():
-        for correspondant in correspondants:
-            if correspondant.id_correspondant == int(value_str):
-                return f"{correspondant.prenom} {correspondant.nom}".strip()
-        return value_str
-    return value_str
-
-
 @router.get("/", response_model=list[ScolariteResponse])
 def get_all_scolarite(db: Session = Depends(get_db)):
     return db.query(Scolarite).all()
@@ -70,13 +54,9 @@ def scolarite_html(
         if annee_value.isdigit():
             annee_id = int(annee_value)
             query = query.filter(Scolarite.id_annee_scolaire == annee_id)
-            row = (
-                db.query(AnneeScolaire.periode)
-                .filter(AnneeScolaire.id_annee_scolaire == annee_id)
-                .first()
-            )
-            if row:
-                annee_filter = row[0]
+            annee_ref = annees_scolaires_ref.by_id().get(annee_id)
+            if annee_ref:
+                annee_filter = annee_ref.periode
         else:
             query = query.outerjoin(Scolarite.annee_scolaire_ref).filter(
                 or_(
@@ -87,13 +67,9 @@ def scolarite_html(
             annee_filter = annee_value
 
     liste = query.all()
-    correspondants = (
-        db.query(Correspondant)
-        .order_by(Correspondant.prenom, Correspondant.nom)
-        .all()
-    )
+    referents = correspondant_index()
     referent_labels = {
-        s.id_scolarite: resolve_correspondant_label(s.referent_a, correspondants)
+        s.id_scolarite: referents.label(s.referent_a, s.id_referent_a)
         for s in liste
     }
     return templates.TemplateResponse(
@@ -113,50 +89,25 @@ def scolarite_export_excel(request: Request, db: Session = Depends(get_db)):
     if not check_session(request):
         return RedirectResponse("/auth/login")
 
-    scolarites = (
-        db.query(Scolarite)
-        .options(
-            joinedload(Scolarite.filleule),
-            joinedload(Scolarite.etablissement),
-            joinedload(Scolarite.annee_scolaire_ref),
-        )
-        .order_by(Scolarite.id_scolarite.asc())
-        .all()
+    scolarites = ScolariteListRow.stream(
+        ScolariteListRow.query(db).order_by(Scolarite.id_scolarite.asc()),
+        EXPORT_YIELD_PER,
     )
-    correspondants = (
-        db.query(Correspondant)
-        .order_by(Correspondant.prenom, Correspondant.nom)
-        .all()
-    )
-
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Scolarite"
-    ws.append(["Filleule", "Référent A", "Établissement", "Année scolaire", "Niveau"])
-    for s in scolarites:
-        filleule = ""
-        if s.filleule:
-            filleule = f"{s.filleule.prenom} {s.filleule.nom}".strip()
-        referent = resolve_correspondant_label(s.referent_a, correspondants) or ""
-        etablissement = s.etablissement.nom if s.etablissement else ""
-        annee = s.annee_scolaire_ref.periode if s.annee_scolaire_ref else s.annee_scolaire
-        ws.append([
-            filleule,
-            referent,
-            etablissement,
-            annee or "",
-            s.niveau or "",
-        ])
-
-    output = io.BytesIO()
-    wb.save(output)
-    output.seek(0)
-
-    headers = {"Content-Disposition": "attachment; filename=scolarite.xlsx"}
-    return StreamingResponse(
-        output,
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        headers=headers,
+    referents = correspondant_index()
+    return xlsx_response(
+        "scolarite.xlsx",
+        "Scolarite",
+        ["Filleule", "Référent A", "Établissement", "Année scolaire", "Niveau"],
+        (
+            [
+                f"{s.filleule_prenom or ''} {s.filleule_nom or ''}".strip(),
+                referents.label(s.referent_a, s.id_referent_a) or "",
+                s.etablissement_nom or "",
+                s.periode or "",
+                s.niveau or "",
+            ]
+            for s in scolarites
+        ),
     )
 
 
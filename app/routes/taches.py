@@ -3,13 +3,12 @@ from datetime import date, datetime
 from fastapi import APIRouter, Depends, Form, HTTPException, Request
 from fastapi.responses import RedirectResponse
 from fastapi.templating import Jinja2Templates
-from sqlalchemy import case
 from sqlalchemy.orm import Session, selectinload
 
 from app.authz import has_any_role
 from app.database import get_db
-from app.models.correspondant import Correspondant
 from app.models.filleule import Filleule
+from app.models.filleule_summary import FilleuleSummary
 from app.models.parrain import Parrain
 from app.models.tache import (
     TASK_STATUSES,
@@ -20,6 +19,7 @@ from app.models.tache import (
 )
 from app.models.user import User
 from app.schemas.tache import TacheCommentCreate, TacheCreate, TacheResponse, TacheUpdate
+from app.services.reference_data_service import correspondants_ref, tache_objets_ref
 
 router = APIRouter(prefix="/taches", tags=["Tâches"])
 templates = Jinja2Templates(directory="app/templates")
@@ -110,14 +110,6 @@ def parse_int(value: str | None) -> int | None:
         raise HTTPException(400, "Valeur invalide") from exc
 
 
-def fetch_task_objects(db: Session) -> list[TacheObjet]:
-    return (
-        db.query(TacheObjet)
-        .order_by(case((TacheObjet.code == "autre", 1), else_=0), TacheObjet.code)
-        .all()
-    )
-
-
 def get_task_object(db: Session, objet_id: int) -> TacheObjet:
     task_objet = db.query(TacheObjet).filter(TacheObjet.id_objet == objet_id).first()
     if not task_objet:
@@ -156,7 +148,11 @@ def build_target_labels(tasks: list[Tache], db: Session) -> dict[int, str]:
 
     filleules = {}
     if filleule_ids:
-        rows = db.query(Filleule).filter(Filleule.id_filleule.in_(filleule_ids)).all()
+        rows = (
+            db.query(FilleuleSummary.id_filleule, FilleuleSummary.prenom, FilleuleSummary.nom)
+            .filter(FilleuleSummary.id_filleule.in_(filleule_ids))
+            .all()
+        )
         filleules = {row.id_filleule: f"{row.prenom} {row.nom}".strip() for row in rows}
 
     parrains = {}
@@ -166,7 +162,7 @@ def build_target_labels(tasks: list[Tache], db: Session) -> dict[int, str]:
 
     correspondants = {}
     if correspondant_ids:
-        rows = db.query(Correspondant).filter(Correspondant.id_correspondant.in_(correspondant_ids)).all()
+        rows = [row for row in map(correspondants_ref.by_id().get, correspondant_ids) if row]
         correspondants = {row.id_correspondant: f"{row.prenom} {row.nom}".strip() for row in rows}
 
     labels: dict[int, str] = {}
@@ -315,8 +311,8 @@ def tache_new_form(request: Request, db: Session = Depends(get_db)):
     users = db.query(User).order_by(User.fullname.is_(None), User.fullname).all()
     filleules = db.query(Filleule).order_by(Filleule.nom, Filleule.prenom).all()
     parrains = db.query(Parrain).order_by(Parrain.nom, Parrain.prenom).all()
-    correspondants = db.query(Correspondant).order_by(Correspondant.nom, Correspondant.prenom).all()
-    objects = fetch_task_objects(db)
+    correspondants = correspondants_ref.rows()
+    objects = tache_objets_ref.rows()
     return templates.TemplateResponse(
         "taches/form.html",
         {
@@ -480,8 +476,8 @@ def tache_edit_form(tache_id: int, request: Request, db: Session = Depends(get_d
     users = db.query(User).order_by(User.fullname.is_(None), User.fullname).all()
     filleules = db.query(Filleule).order_by(Filleule.nom, Filleule.prenom).all()
     parrains = db.query(Parrain).order_by(Parrain.nom, Parrain.prenom).all()
-    correspondants = db.query(Correspondant).order_by(Correspondant.nom, Correspondant.prenom).all()
-    objects = fetch_task_objects(db)
+    correspondants = correspondants_ref.rows()
+    objects = tache_objets_ref.rows()
 
     return templates.TemplateResponse(
         "taches/form.html",
@@ -1,10 +1,33 @@
+import os
 from datetime import datetime, timedelta
-from jose import jwt
+
+from dotenv import load_dotenv
+from jose import JWTError, jwt
 from passlib.context import CryptContext
 
-SECRET_KEY = "CHANGE_ME_!!"
+from app.database import DOTENV_PATH
+
+# .env chargé ici aussi : la clé doit être lue quel que soit l'ordre des imports
+load_dotenv(DOTENV_PATH)
+
+# Le jeton de session porte les rôles : une clé connue permet de forger une session admin.
+# Clé publique de développement seulement si ALLOW_INSECURE_SECRET_KEY=true.
+INSECURE_SECRET_KEYS = {"", "CHANGE_ME_!!", "change_me_long_random_string"}
+ALLOW_INSECURE_SECRET_KEY = os.getenv("ALLOW_INSECURE_SECRET_KEY", "false").lower() in {"1", "true", "yes"}
+SECRET_KEY = os.getenv("SECRET_KEY", "")
+if SECRET_KEY in INSECURE_SECRET_KEYS:
+    if not ALLOW_INSECURE_SECRET_KEY:
+        raise RuntimeError(
+            "SECRET_KEY absente ou valeur d'exemple : définir une clé aléatoire dans .env "
+            "(ex. python -c \"import secrets; print(secrets.token_urlsafe(48))\"), "
+            "ou ALLOW_INSECURE_SECRET_KEY=true en développement uniquement."
+        )
+    print("[security] SECRET_KEY de développement (ALLOW_INSECURE_SECRET_KEY=true) : ne pas utiliser en production")
+    SECRET_KEY = SECRET_KEY or "CHANGE_ME_!!"
+
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60
+SESSION_TOKEN_EXPIRE_MINUTES = int(os.getenv("SESSION_TOKEN_EXPIRE_MINUTES", "1440"))
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
@@ -19,3 +42,23 @@ def create_access_token(data: dict):
     expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     to_encode.update({"exp": expire})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+
+
+def create_session_token(user_id: int, email: str, fullname: str | None, roles: set[str], version: int) -> str:
+    expire = datetime.utcnow() + timedelta(minutes=SESSION_TOKEN_EXPIRE_MINUTES)
+    payload = {
+        "sub": str(user_id),
+        "email": email,
+        "name": fullname,
+        "roles": sorted(roles),
+        "ver": version,
+        "exp": expire,
+    }
+    return jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
+
+
+def decode_session_token(token: str) -> dict | None:
+    try:
+        return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        return None
@@ -0,0 +1,93 @@
+import os
+import threading
+import time
+from typing import Any, Iterable
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+# Filet de sécurité : les écritures hors ORM (scripts, SQL brut, autres workers)
+# ne déclenchent pas d'invalidation, une entrée n'est donc jamais servie au-delà de ce délai.
+SNAPSHOT_CACHE_TTL_SECONDS = float(os.getenv("SNAPSHOT_CACHE_TTL_SECONDS", "60"))
+
+_lock = threading.Lock()
+_table_versions: dict[str, int] = {}
+
+
+def get_tables_version(tables: Iterable[str]) -> tuple[int, ...]:
+    with _lock:
+        return tuple(_table_versions.get(table, 0) for table in tables)
+
+
+def bump_tables(tables: Iterable[str]) -> None:
+    with _lock:
+        for table in tables:
+            _table_versions[table] = _table_versions.get(table, 0) + 1
+
+
+class SnapshotCache:
+    """Valeur mise en cache tant qu'aucune des tables surveillées n'a changé."""
+
+    def __init__(self, tables: Iterable[str], ttl: float | None = None):
+        self.tables = tuple(tables)
+        self.ttl = SNAPSHOT_CACHE_TTL_SECONDS if ttl is None else ttl
+        self._lock = threading.Lock()
+        self._entries: dict[Any, tuple[tuple[int, ...], float, Any]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def version(self) -> tuple[int, ...]:
+        return get_tables_version(self.tables)
+
+    def get(self, key: Any = None) -> Any | None:
+        current = self.version()
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] == current and entry[1] > now:
+                self.hits += 1
+                return entry[2]
+            self.misses += 1
+        return None
+
+    def set(self, value: Any, version: tuple[int, ...], key: Any = None) -> None:
+        """Enregistre une valeur calculée à partir de la version lue *avant* le calcul."""
+        with self._lock:
+            self._entries[key] = (version, time.monotonic() + self.ttl, value)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+def _changed_tables(session: Session) -> set[str]:
+    return session.info.setdefault("changed_tables", set())
+
+
+@event.listens_for(Session, "after_flush")
+def _track_flushed_tables(session, flush_context):
+    changed = _changed_tables(session)
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        table = getattr(type(obj), "__table__", None)
+        if table is not None:
+            changed.add(table.name)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_bulk_statements(orm_execute_state):
+    if orm_execute_state.is_update or orm_execute_state.is_delete or orm_execute_state.is_insert:
+        table = getattr(orm_execute_state.statement, "table", None)
+        if table is not None and getattr(table, "name", None):
+            _changed_tables(orm_execute_state.session).add(table.name)
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_committed_tables(session):
+    changed = session.info.pop("changed_tables", None)
+    if changed:
+        bump_tables(changed)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back_tables(session):
+    session.info.pop("changed_tables", None)
@@ -0,0 +1,214 @@
+import asyncio
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, distinct, func, insert, select, text
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+
+from app.database import engine
+from app.models.user_connection_log import UserConnectionDaily, UserConnectionLog
+
+CONNECTION_LOG_BATCH_SIZE = int(os.getenv("CONNECTION_LOG_BATCH_SIZE", "50"))
+CONNECTION_LOG_FLUSH_MS = int(os.getenv("CONNECTION_LOG_FLUSH_MS", "2000"))
+CONNECTION_LOG_MAX_BUFFER = int(os.getenv("CONNECTION_LOG_MAX_BUFFER", "5000"))
+# Conservation des lignes brutes (0 = illimitée); les agrégats journaliers sont conservés
+CONNECTION_LOG_RETENTION_DAYS = int(os.getenv("CONNECTION_LOG_RETENTION_DAYS", "90"))
+CONNECTION_LOG_PURGE_INTERVAL_SECONDS = int(os.getenv("CONNECTION_LOG_PURGE_INTERVAL_SECONDS", "3600"))
+PURGE_CHUNK_SIZE = 5000
+
+PATH_MAX_LENGTH = UserConnectionLog.__table__.c.path.type.length
+
+_lock = threading.Lock()
+_buffer: list[dict] = []
+_stats = {"enqueued": 0, "flushed": 0, "dropped": 0, "failed": 0, "batches": 0, "purged": 0}
+_wakeup: asyncio.Event | None = None
+_task: asyncio.Task | None = None
+
+
+def enqueue_connection_log(user_id: int, ip_address: str | None, path: str) -> bool:
+    """Ajoute une entrée au tampon; retourne False si elle a été abandonnée (tampon plein)."""
+    row = {
+        "user_id": user_id,
+        "ip_address": ip_address,
+        "path": path[:PATH_MAX_LENGTH],
+        "created_at": datetime.now(),
+    }
+    with _lock:
+        if len(_buffer) >= CONNECTION_LOG_MAX_BUFFER:
+            _stats["dropped"] += 1
+            return False
+        _buffer.append(row)
+        _stats["enqueued"] += 1
+        pending = len(_buffer)
+
+    if _task is None:
+        # Pas d'écrivain en arrière-plan (scripts, tests) : écriture immédiate
+        flush_connection_logs()
+    elif pending >= CONNECTION_LOG_BATCH_SIZE and _wakeup is not None:
+        _wakeup.set()
+    return True
+
+
+def flush_connection_logs() -> int:
+    """Écrit le contenu du tampon en un seul INSERT multi-lignes."""
+    with _lock:
+        if not _buffer:
+            return 0
+        rows = _buffer[:]
+        _buffer.clear()
+
+    try:
+        with engine.begin() as conn:
+            conn.execute(insert(UserConnectionLog).values(rows))
+            _refresh_daily_rollups(conn, rows)
+    except Exception as exc:
+        with _lock:
+            _stats["failed"] += len(rows)
+        print(f"[connection-log] écriture de {len(rows)} entrées impossible: {exc}")
+        return 0
+
+    with _lock:
+        _stats["flushed"] += len(rows)
+        _stats["batches"] += 1
+    return len(rows)
+
+
+def _refresh_daily_rollups(conn, rows: list[dict]) -> None:
+    """Recalcule les agrégats des seuls couples (utilisateur, jour) touchés par le lot."""
+    pairs = {(row["user_id"], row["created_at"].date()) for row in rows}
+    days = [day for _, day in pairs]
+    start = datetime.combine(min(days), datetime.min.time())
+    end = datetime.combine(max(days) + timedelta(days=1), datetime.min.time())
+
+    day_expr = func.date(UserConnectionLog.created_at)
+    stats = conn.execute(
+        select(
+            UserConnectionLog.user_id,
+            day_expr.label("day"),
+            func.count().label("hits"),
+            func.count(distinct(UserConnectionLog.path)).label("distinct_paths"),
+            func.min(UserConnectionLog.created_at).label("first_seen"),
+            func.max(UserConnectionLog.created_at).label("last_seen"),
+        )
+        .where(
+            UserConnectionLog.user_id.in_({user_id for user_id, _ in pairs}),
+            UserConnectionLog.created_at >= start,
+            UserConnectionLog.created_at < end,
+        )
+        .group_by(UserConnectionLog.user_id, day_expr)
+    ).all()
+
+    values = [dict(row._mapping) for row in stats if (row.user_id, row.day) in pairs]
+    if not values:
+        return
+    stmt = mysql_insert(UserConnectionDaily).values(values)
+    conn.execute(
+        stmt.on_duplicate_key_update(
+            hits=stmt.inserted.hits,
+            distinct_paths=stmt.inserted.distinct_paths,
+            first_seen=stmt.inserted.first_seen,
+            last_seen=stmt.inserted.last_seen,
+        )
+    )
+
+
+def rebuild_connection_rollups() -> None:
+    """Reconstruit tous les agrégats journaliers depuis les lignes brutes."""
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                """
+                INSERT INTO user_connection_daily (user_id, day, hits, distinct_paths, first_seen, last_seen)
+                SELECT user_id, DATE(created_at), COUNT(*), COUNT(DISTINCT path), MIN(created_at), MAX(created_at)
+                FROM user_connection_logs
+                GROUP BY user_id, DATE(created_at)
+                ON DUPLICATE KEY UPDATE
+                    hits = VALUES(hits),
+                    distinct_paths = VALUES(distinct_paths),
+                    first_seen = VALUES(first_seen),
+                    last_seen = VALUES(last_seen)
+                """
+            )
+        )
+
+
+def ensure_connection_rollups() -> None:
+    """Initialise les agrégats depuis l'historique existant (une seule fois)."""
+    with engine.connect() as conn:
+        has_rollups = conn.execute(select(UserConnectionDaily.user_id).limit(1)).first()
+        has_logs = conn.execute(select(UserConnectionLog.id).limit(1)).first()
+    if has_logs and not has_rollups:
+        rebuild_connection_rollups()
+
+
+def purge_connection_logs() -> int:
+    """Supprime par lots les lignes brutes plus anciennes que la durée de conservation."""
+    if CONNECTION_LOG_RETENTION_DAYS <= 0:
+        return 0
+    cutoff = datetime.now() - timedelta(days=CONNECTION_LOG_RETENTION_DAYS)
+    purged = 0
+    while True:
+        with engine.begin() as conn:
+            ids = conn.execute(
+                select(UserConnectionLog.id)
+                .where(UserConnectionLog.created_at < cutoff)
+                .order_by(UserConnectionLog.id)
+                .limit(PURGE_CHUNK_SIZE)
+            ).scalars().all()
+            if not ids:
+                break
+            conn.execute(delete(UserConnectionLog).where(UserConnectionLog.id.in_(ids)))
+        purged += len(ids)
+        if len(ids) < PURGE_CHUNK_SIZE:
+            break
+    with _lock:
+        _stats["purged"] += purged
+    return purged
+
+
+async def _flush_loop() -> None:
+    interval = CONNECTION_LOG_FLUSH_MS / 1000
+    last_purge = 0.0
+    while True:
+        try:
+            await asyncio.wait_for(_wakeup.wait(), timeout=interval)
+        except asyncio.TimeoutError:
+            pass
+        _wakeup.clear()
+        await asyncio.to_thread(flush_connection_logs)
+        if time.monotonic() - last_purge >= CONNECTION_LOG_PURGE_INTERVAL_SECONDS:
+            last_purge = time.monotonic()
+            try:
+                await asyncio.to_thread(purge_connection_logs)
+            except Exception as exc:
+                print(f"[connection-log] purge impossible: {exc}")
+
+
+async def start_connection_log_writer() -> None:
+    global _task, _wakeup
+    if _task is not None:
+        return
+    _wakeup = asyncio.Event()
+    _task = asyncio.create_task(_flush_loop())
+
+
+async def stop_connection_log_writer() -> None:
+    """Arrête l'écrivain et vide le tampon (appelé à l'arrêt de l'application)."""
+    global _task, _wakeup
+    task = _task
+    _task = None
+    _wakeup = None
+    if task is not None:
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+    await asyncio.to_thread(flush_connection_logs)
+
+
+def get_connection_log_stats() -> dict:
+    with _lock:
+        return {**_stats, "pending": len(_buffer), "max_buffer": CONNECTION_LOG_MAX_BUFFER}
@@ -0,0 +1,86 @@
+"""Compteurs des pastilles de listes (filleules sans parrain, couverture santé...).
+
+Tous les compteurs d'une entité sont calculés en un seul parcours de sa table
+(SUM(CASE ...)), puis mis en cache jusqu'à la prochaine écriture ORM sur l'une
+des tables dont ils dépendent (cache_service.SnapshotCache).
+
+Ce cache est propre à chaque processus : une écriture n'invalide que le worker
+qui l'a faite. Les autres workers (et toute écriture hors ORM) peuvent servir
+des compteurs périmés jusqu'à SNAPSHOT_CACHE_TTL_SECONDS (60 s par défaut).
+"""
+from typing import Callable, Iterable
+
+from sqlalchemy import and_, case, func, select
+from sqlalchemy.orm import Session
+
+from app.models.filleule import Filleule
+from app.models.parrain import Parrain
+from app.models.parrainage import Parrainage
+from app.services.cache_service import SnapshotCache
+
+
+def has_couverture_sante():
+    # La colonne normalisée vaut NULL pour une valeur vide : "> ''" équivaut à IS NOT NULL
+    # mais reste une condition de plage exploitable par l'index.
+    return and_(
+        Filleule.couverture_sante_norm > "",
+        Filleule.couverture_sante_norm != "none",
+    )
+
+
+def filleule_sans_parrain():
+    return ~Filleule.parrainages.any()
+
+
+def parrain_sans_filleule():
+    return ~Parrain.parrainages.any()
+
+
+class ListCounters:
+    """Compteurs nommés d'une table : total + une condition par pastille.
+
+    Les conditions sont des fonctions (construites à l'appel, une fois les
+    mappers configurés), partagées avec les filtres des routes. Les valeurs
+    renvoyées peuvent retarder jusqu'à SNAPSHOT_CACHE_TTL_SECONDS sur les
+    écritures faites par un autre worker.
+    """
+
+    def __init__(self, model, counters: dict[str, Callable], tables: Iterable[str] = ()):
+        self.model = model
+        self.counters = counters
+        self.cache = SnapshotCache({model.__table__.name, *tables})
+
+    def query(self):
+        return select(
+            func.count().label("total"),
+            *(
+                func.coalesce(func.sum(case((condition(), 1), else_=0)), 0).label(name)
+                for name, condition in self.counters.items()
+            ),
+        ).select_from(self.model)
+
+    def get(self, db: Session) -> dict[str, int]:
+        cached = self.cache.get()
+        if cached is not None:
+            return dict(cached)
+
+        version = self.cache.version()
+        row = db.execute(self.query()).one()
+        counts = {name: int(value) for name, value in row._mapping.items()}
+        self.cache.set(counts, version)
+        return dict(counts)
+
+
+filleule_counters = ListCounters(
+    Filleule,
+    {
+        "sans_parrains": filleule_sans_parrain,
+        "couverture_sante": has_couverture_sante,
+    },
+    tables={Parrainage.__table__.name},
+)
+parrain_counters = ListCounters(
+    Parrain,
+    {"sans_filleules": parrain_sans_filleule},
+    tables={Parrainage.__table__.name},
+)
@@ -0,0 +1,68 @@
+"""Exports Excel en mode write_only, mémoire constante quelle que soit la table.
+
+Les lignes arrivent d'un itérateur (requête en yield_per : curseur côté serveur
+avec pymysql) et sont écrites une à une par openpyxl, qui les range dans un
+fichier temporaire au lieu de garder les cellules en mémoire. openpyxl ne
+produit l'archive .xlsx qu'à l'enregistrement : elle est écrite dans un fichier
+temporaire (en mémoire jusqu'à EXPORT_SPOOL_MAX_BYTES) puis envoyée au client
+par blocs.
+"""
+import os
+from tempfile import SpooledTemporaryFile
+from typing import IO, Iterable, Iterator, Sequence
+
+from fastapi.responses import StreamingResponse
+from openpyxl import Workbook
+
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+EXPORT_YIELD_PER = int(os.getenv("EXPORT_YIELD_PER", "1000"))
+EXPORT_SPOOL_MAX_BYTES = int(os.getenv("EXPORT_SPOOL_MAX_BYTES", str(8 * 1024 * 1024)))
+EXPORT_CHUNK_BYTES = 64 * 1024
+
+
+def write_xlsx(
+    file_obj: IO[bytes],
+    sheet_title: str,
+    header: Sequence,
+    rows: Iterable[Sequence],
+) -> int:
+    """Écrit une feuille (en-têtes + lignes) dans file_obj; renvoie le nombre de lignes."""
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(sheet_title)
+    ws.append(list(header))
+    count = 0
+    for row in rows:
+        ws.append(list(row))
+        count += 1
+    wb.save(file_obj)
+    return count
+
+
+def iter_file(file_obj: IO[bytes]) -> Iterator[bytes]:
+    """Lit file_obj depuis le début par blocs, puis le ferme."""
+    try:
+        file_obj.seek(0)
+        while chunk := file_obj.read(EXPORT_CHUNK_BYTES):
+            yield chunk
+    finally:
+        file_obj.close()
+
+
+def xlsx_response(
+    filename: str,
+    sheet_title: str,
+    header: Sequence,
+    rows: Iterable[Sequence],
+) -> StreamingResponse:
+    """Réponse de téléchargement d'un export (les lignes sont lues pendant l'appel)."""
+    output = SpooledTemporaryFile(max_size=EXPORT_SPOOL_MAX_BYTES)
+    try:
+        write_xlsx(output, sheet_title, header, rows)
+    except Exception:
+        output.close()
+        raise
+    return StreamingResponse(
+        iter_file(output),
+        media_type=XLSX_MEDIA_TYPE,
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
+    )
@@ -0,0 +1,386 @@
+"""Exports Excel filtrés (/admin/export) exécutés en tâche de fond.
+
+Une demande crée une tâche (ou reprend celle en cours / terminée pour les mêmes
+filtres) exécutée par un pool de threads. Chaque fichier a son propre chemin
+(EXPORT_JOBS_DIR/export_<id>.xlsx, écrit en .part puis renommé). L'état de la
+tâche est recopié dans export_<id>.json pour que n'importe quel worker puisse
+répondre au suivi et au téléchargement. Fichiers et tâches sont supprimés
+EXPORT_JOB_TTL_SECONDS après leur création.
+
+Le worker propriétaire (owner_pid) rafraîchit heartbeat_at toutes les
+EXPORT_JOB_HEARTBEAT_SECONDS tant que la tâche n'est pas finie : une tâche en
+attente ou en cours sans battement depuis EXPORT_JOB_STALE_SECONDS appartient à
+un worker arrêté, elle n'est plus reprise et apparaît en erreur. La recherche
+d'une tâche réutilisable et la création se font sous un fichier verrou
+(O_EXCL, un par jeu de filtres) pour dédoublonner entre workers.
+"""
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Iterable
+
+from sqlalchemy import func
+
+from app.database import SessionLocal
+from app.models.etablissement import Etablissement
+from app.models.filleule import Filleule
+from app.models.filleule_summary import FilleuleSummary
+from app.models.parrainage import Parrainage
+from app.services.excel_export_service import EXPORT_YIELD_PER, write_xlsx
+
+EXPORT_JOBS_DIR = Path(os.getenv("EXPORT_JOBS_DIR", Path(tempfile.gettempdir()) / "fae-exports"))
+EXPORT_JOB_WORKERS = int(os.getenv("EXPORT_JOB_WORKERS", "2"))
+EXPORT_JOB_TTL_SECONDS = float(os.getenv("EXPORT_JOB_TTL_SECONDS", "3600"))
+EXPORT_JOB_HEARTBEAT_SECONDS = float(os.getenv("EXPORT_JOB_HEARTBEAT_SECONDS", "5"))
+# Au-delà, une tâche non terminée est considérée comme abandonnée
+EXPORT_JOB_STALE_SECONDS = 3 * EXPORT_JOB_HEARTBEAT_SECONDS
+# Verrou de soumission plus vieux que ce délai : laissé par un worker arrêté
+SUBMIT_LOCK_STALE_SECONDS = 30
+SUBMIT_LOCK_WAIT_SECONDS = 5
+# Fréquence de recopie de l'avancement dans le fichier d'état
+PROGRESS_EVERY_ROWS = 1000
+
+STATUS_PENDING = "en_attente"
+STATUS_RUNNING = "en_cours"
+STATUS_DONE = "termine"
+STATUS_FAILED = "erreur"
+
+JOB_ID_PATTERN = re.compile(r"[0-9a-f]{32}")
+EXPORT_HEADER = ["Nom", "Prénom", "Établissement", "Niveau scolaire"]
+
+
+@dataclass
+class ExportJob:
+    id: str
+    etablissement_ids: list[int]
+    annee: int | None
+    status: str = STATUS_PENDING
+    rows_done: int = 0
+    rows_total: int | None = None
+    error: str | None = None
+    created_at: float = field(default_factory=time.time)
+    finished_at: float | None = None
+    owner_pid: int = field(default_factory=os.getpid)
+    heartbeat_at: float = field(default_factory=time.time)
+
+    @property
+    def key(self) -> tuple:
+        return (tuple(self.etablissement_ids), self.annee)
+
+    @property
+    def path(self) -> Path:
+        return EXPORT_JOBS_DIR / f"export_{self.id}.xlsx"
+
+    @property
+    def state_path(self) -> Path:
+        return EXPORT_JOBS_DIR / f"export_{self.id}.json"
+
+    @property
+    def expires_at(self) -> float:
+        return self.created_at + EXPORT_JOB_TTL_SECONDS
+
+    def is_expired(self, now: float | None = None) -> bool:
+        return (now or time.time()) >= self.expires_at
+
+    def is_ready(self) -> bool:
+        return self.status == STATUS_DONE and self.path.exists()
+
+    def is_finished(self) -> bool:
+        return self.status in (STATUS_DONE, STATUS_FAILED)
+
+    def is_stale(self, now: float | None = None) -> bool:
+        """Tâche non terminée dont le worker ne donne plus signe de vie."""
+        return not self.is_finished() and (now or time.time()) - self.heartbeat_at > EXPORT_JOB_STALE_SECONDS
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        data["expires_at"] = self.expires_at
+        return data
+
+
+_lock = threading.Lock()
+# Réentrant : _finish_job enregistre l'état final sous ce même verrou
+_state_lock = threading.RLock()
+_submit_lock = threading.Lock()
+_jobs: dict[str, ExportJob] = {}
+_executor: ThreadPoolExecutor | None = None
+_heartbeat_stop: threading.Event | None = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor, _heartbeat_stop
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=EXPORT_JOB_WORKERS, thread_name_prefix="export-job")
+            _heartbeat_stop = threading.Event()
+            threading.Thread(
+                target=_heartbeat_loop,
+                args=(_heartbeat_stop,),
+                name="export-job-heartbeat",
+                daemon=True,
+            ).start()
+        return _executor
+
+
+def _heartbeat_loop(stop: threading.Event) -> None:
+    """Rafraîchit l'état des tâches non terminées de ce worker (en attente comprises)."""
+    while not stop.wait(EXPORT_JOB_HEARTBEAT_SECONDS):
+        with _lock:
+            jobs = [job for job in _jobs.values() if not job.is_finished()]
+        for job in jobs:
+            try:
+                _save_state(job)
+            except OSError as exc:
+                print(f"[export-job] battement {job.id} impossible: {exc}")
+
+
+def shutdown_export_jobs() -> None:
+    """Arrête le pool; les tâches non terminées de ce worker passent en erreur."""
+    global _executor, _heartbeat_stop
+    with _lock:
+        executor, _executor = _executor, None
+        heartbeat_stop, _heartbeat_stop = _heartbeat_stop, None
+    if heartbeat_stop is not None:
+        heartbeat_stop.set()
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+    with _lock:
+        unfinished = [job for job in _jobs.values() if not job.is_finished()]
+    for job in unfinished:
+        try:
+            _finish_job(job, STATUS_FAILED, "Export interrompu par l'arrêt du serveur")
+        except OSError as exc:
+            print(f"[export-job] état {job.id} non enregistré: {exc}")
+
+
+def export_query(db, etablissement_ids: Iterable[int], annee: int | None):
+    query = db.query(
+        Filleule.nom,
+        Filleule.prenom,
+        Etablissement.nom.label("etablissement"),
+        FilleuleSummary.niveau.label("niveau_scolaire"),
+    ).join(
+        Etablissement,
+        Etablissement.id_etablissement == Filleule.etablissement_id,
+    ).outerjoin(
+        FilleuleSummary,
+        FilleuleSummary.id_filleule == Filleule.id_filleule,
+    )
+
+    # Filtre établissements (multi-sélection)
+    etablissement_ids = list(etablissement_ids)
+    if etablissement_ids:
+        query = query.filter(Filleule.etablissement_id.in_(etablissement_ids))
+
+    # Filtre année
+    if annee:
+        query = query.join(Parrainage, Parrainage.id_filleule == Filleule.id_filleule)
+        query = query.filter(func.extract('year', Parrainage.date_debut) == annee)
+
+    return query
+
+
+# --------------------------------------------------------
+#                   ÉTAT DES TÂCHES
+# --------------------------------------------------------
+
+def _save_state(job: ExportJob) -> None:
+    # Sérialisé : le battement et la tâche écrivent le même fichier, le dernier
+    # écrit doit refléter l'état courant (jamais un "en_cours" après "termine").
+    with _state_lock:
+        job.heartbeat_at = time.time()
+        EXPORT_JOBS_DIR.mkdir(parents=True, exist_ok=True)
+        tmp_path = job.state_path.with_suffix(".json.part")
+        tmp_path.write_text(json.dumps(asdict(job)), encoding="utf-8")
+        os.replace(tmp_path, job.state_path)
+
+
+def _finish_job(job: ExportJob, status: str, error: str | None = None) -> bool:
+    """Fixe l'état final une seule fois : la tâche ou l'arrêt du serveur, le premier l'emporte."""
+    with _state_lock:
+        if job.is_finished():
+            return False
+        job.status = status
+        job.error = error
+        job.finished_at = time.time()
+        _save_state(job)
+    return True
+
+
+def _load_state(path: Path) -> ExportJob | None:
+    try:
+        return ExportJob(**json.loads(path.read_text(encoding="utf-8")))
+    except (OSError, ValueError, TypeError):
+        return None
+
+
+def _remove_job_files(job: ExportJob) -> None:
+    for path in (job.path, job.path.with_suffix(".xlsx.part"), job.state_path):
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def purge_expired_export_jobs() -> int:
+    """Supprime tâches et fichiers expirés, y compris ceux laissés par d'autres workers."""
+    now = time.time()
+    with _lock:
+        expired = {job.id: job for job in _jobs.values() if job.is_expired(now)}
+        for job_id in expired:
+            del _jobs[job_id]
+    if EXPORT_JOBS_DIR.exists():
+        for state_path in EXPORT_JOBS_DIR.glob("export_*.json"):
+            job = _load_state(state_path)
+            if job is not None and job.is_expired(now):
+                expired[job.id] = job
+        for job in expired.values():
+            _remove_job_files(job)
+        # Fichiers orphelins (état illisible, worker arrêté en cours d'écriture)
+        for path in EXPORT_JOBS_DIR.glob("export_*"):
+            try:
+                if now - path.stat().st_mtime > EXPORT_JOB_TTL_SECONDS:
+                    path.unlink()
+            except FileNotFoundError:
+                pass
+    return len(expired)
+
+
+def get_export_job(job_id: str) -> ExportJob | None:
+    if not JOB_ID_PATTERN.fullmatch(job_id):
+        return None
+    with _lock:
+        job = _jobs.get(job_id)
+    if job is None:
+        # Tâche lancée par un autre worker
+        job = _load_state(EXPORT_JOBS_DIR / f"export_{job_id}.json")
+    if job is None or job.is_expired():
+        return None
+    if job.is_stale():
+        job.status = STATUS_FAILED
+        job.error = "Export interrompu (worker arrêté)"
+    return job
+
+
+def _find_reusable_job(key: tuple) -> ExportJob | None:
+    now = time.time()
+    with _lock:
+        candidates = list(_jobs.values())
+    if EXPORT_JOBS_DIR.exists():
+        known = {job.id for job in candidates}
+        for state_path in EXPORT_JOBS_DIR.glob("export_*.json"):
+            job = _load_state(state_path)
+            if job is not None and job.id not in known:
+                candidates.append(job)
+    reusable = [
+        job
+        for job in candidates
+        if job.key == key
+        and not job.is_expired()
+        and not job.is_stale(now)
+        and (job.status in (STATUS_PENDING, STATUS_RUNNING) or job.is_ready())
+    ]
+    return max(reusable, key=lambda job: job.created_at, default=None)
+
+
+@contextmanager
+def _submit_file_lock(key: tuple):
+    """Verrou inter-workers (fichier créé en O_EXCL) pour un jeu de filtres."""
+    EXPORT_JOBS_DIR.mkdir(parents=True, exist_ok=True)
+    digest = hashlib.sha256(json.dumps(key).encode("utf-8")).hexdigest()[:32]
+    lock_path = EXPORT_JOBS_DIR / f"export_submit_{digest}.lock"
+    deadline = time.monotonic() + SUBMIT_LOCK_WAIT_SECONDS
+    acquired = False
+    while not acquired:
+        try:
+            os.close(os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            acquired = True
+        except FileExistsError:
+            try:
+                if time.time() - lock_path.stat().st_mtime > SUBMIT_LOCK_STALE_SECONDS:
+                    lock_path.unlink()
+                    continue
+            except FileNotFoundError:
+                continue
+            if time.monotonic() >= deadline:
+                print(f"[export-job] verrou {lock_path.name} toujours pris, soumission sans verrou")
+                break
+            time.sleep(0.05)
+    try:
+        yield
+    finally:
+        if acquired:
+            lock_path.unlink(missing_ok=True)
+
+
+# --------------------------------------------------------
+#                 SOUMISSION / EXÉCUTION
+# --------------------------------------------------------
+
+def submit_export_job(etablissement_ids: Iterable[int] | None, annee: int | None) -> ExportJob:
+    """Tâche d'export pour ces filtres : celle en cours ou prête si elle existe, sinon une nouvelle."""
+    purge_expired_export_jobs()
+    job = ExportJob(
+        id=uuid.uuid4().hex,
+        etablissement_ids=sorted(set(etablissement_ids or [])),
+        annee=annee or None,
+    )
+    # Vérification et enregistrement sous un même verrou : deux demandes
+    # simultanées, du même worker ou non, ne lancent qu'une tâche.
+    with _submit_lock, _submit_file_lock(job.key):
+        existing = _find_reusable_job(job.key)
+        if existing is not None:
+            return existing
+        with _lock:
+            _jobs[job.id] = job
+        _save_state(job)
+    _get_executor().submit(_run_export_job, job)
+    return job
+
+
+def _run_export_job(job: ExportJob) -> None:
+    with _state_lock:
+        if job.is_finished():
+            return
+        job.status = STATUS_RUNNING
+        _save_state(job)
+    part_path = job.path.with_suffix(".xlsx.part")
+    db = SessionLocal()
+    try:
+        query = export_query(db, job.etablissement_ids, job.annee)
+        job.rows_total = query.order_by(None).count()
+        _save_state(job)
+
+        def rows():
+            for row in query.yield_per(EXPORT_YIELD_PER):
+                job.rows_done += 1
+                if job.rows_done % PROGRESS_EVERY_ROWS == 0:
+                    if job.is_finished():
+                        raise RuntimeError("export interrompu")
+                    _save_state(job)
+                yield list(row)
+
+        with part_path.open("wb") as output:
+            write_xlsx(output, "Données filtrées", EXPORT_HEADER, rows())
+        with _state_lock:
+            # Marquée en erreur par l'arrêt du serveur pendant l'écriture : on ne publie pas le fichier
+            if job.is_finished():
+                part_path.unlink(missing_ok=True)
+                return
+            os.replace(part_path, job.path)
+            _finish_job(job, STATUS_DONE)
+    except Exception as exc:
+        print(f"[export-job] {job.id} en échec: {exc}")
+        part_path.unlink(missing_ok=True)
+        _finish_job(job, STATUS_FAILED, str(exc))
+    finally:
+        db.close()
@@ -0,0 +1,117 @@
+"""Liste des filleules (/filleules/html, PDF) : filtres, tris et navigation entre fiches.
+
+Partagé par la liste publique et les fiches admin, qui reprennent les filtres
+et le tri de la liste d'origine pour les liens précédente/suivante.
+"""
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.orm import Session
+
+from app.models.filleule import Filleule
+from app.models.scolarite import Scolarite
+from app.services.counters_service import filleule_sans_parrain, has_couverture_sante
+from app.services.navigation_service import Neighbors, list_context, neighbors
+
+
+# Tris disponibles; la dernière colonne (id) rend l'ordre total pour les curseurs
+LIST_SORTS = {
+    "nom": (Filleule.nom, Filleule.prenom, Filleule.id_filleule),
+    "prenom": (Filleule.prenom, Filleule.nom, Filleule.id_filleule),
+    "annee_rentree": (func.coalesce(Filleule.annee_rentree_norm, ""), Filleule.nom, Filleule.id_filleule),
+}
+
+
+def _prefix_pattern(term: str) -> str:
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"{escaped}%"
+
+
+def search_condition(q: str | None):
+    """Recherche sur toute la liste : chaque mot doit commencer le nom ou le prénom.
+
+    Préfixes seulement (LIKE 'mot%') : la recherche reste une plage sur les index
+    ix_filleules_nom_prenom / ix_filleules_prenom_nom. None si q est vide.
+    """
+    terms = (q or "").split()
+    if not terms:
+        return None
+    return and_(
+        *(
+            or_(
+                Filleule.nom.like(_prefix_pattern(term), escape="\\"),
+                Filleule.prenom.like(_prefix_pattern(term), escape="\\"),
+            )
+            for term in terms
+        )
+    )
+
+
+def apply_list_filters(
+    query,
+    filiere: str | None,
+    annee_rentree: str | None,
+    village: str | None,
+    sans_parrains: int | None,
+    couverture_sante: int | None,
+    q: str | None = None,
+):
+    """Filtres communs aux listes HTML/PDF, sur les colonnes normalisées indexées."""
+    search = search_condition(q)
+    if search is not None:
+        query = query.filter(search)
+    filiere_value = (filiere or "").strip().lower()
+    if filiere_value:
+        query = query.filter(
+            Filleule.id_filleule.in_(
+                select(Scolarite.id_filleule).where(Scolarite.filiere_norm == filiere_value)
+            )
+        )
+    annee_value = (annee_rentree or "").strip().lower()
+    if annee_value:
+        query = query.filter(Filleule.annee_rentree_norm == annee_value)
+    village_value = (village or "").strip().lower()
+    if village_value:
+        query = query.filter(Filleule.village_norm == village_value)
+    if sans_parrains:
+        query = query.filter(filleule_sans_parrain())
+    if couverture_sante:
+        query = query.filter(has_couverture_sante())
+    return query
+
+
+# Paramètres de /filleules/html transmis aux fiches pour la navigation précédente/suivante
+LIST_CONTEXT_PARAMS = (
+    "q", "filiere", "annee_rentree", "village", "sans_parrains", "couverture_sante", "sort", "order",
+)
+
+
+def _int_param(value: str | None) -> int | None:
+    try:
+        return int(value) if value else None
+    except ValueError:
+        return None
+
+
+def filleule_neighbors(
+    db: Session,
+    params,
+    filleule_id: int,
+    default_sort: str | None = "nom",
+) -> Neighbors:
+    """Filleules voisines dans la liste filtrée et triée décrite par params.
+
+    Sans tri explicite ni default_sort, l'ordre est celui des ids.
+    """
+    context = list_context(params, LIST_CONTEXT_PARAMS)
+    sort_columns = LIST_SORTS.get(context.get("sort") or default_sort, (Filleule.id_filleule,))
+    query = apply_list_filters(
+        db.query(Filleule.id_filleule),
+        context.get("filiere"),
+        context.get("annee_rentree"),
+        context.get("village"),
+        _int_param(context.get("sans_parrains")),
+        _int_param(context.get("couverture_sante")),
+        context.get("q"),
+    )
+    return neighbors(
+        query, sort_columns, filleule_id, context.get("order") == "desc", context
+    )
@@ -0,0 +1,226 @@
+import os
+
+from sqlalchemy import delete, event, insert, select
+from sqlalchemy.orm import Session, attributes
+
+from app.database import engine
+from app.models.annee_scolaire import AnneeScolaire
+from app.models.correspondant import Correspondant
+from app.models.etablissement import Etablissement
+from app.models.filleule import Filleule
+from app.models.filleule_summary import FilleuleSummary
+from app.models.parrain import Parrain
+from app.models.parrainage import Parrainage
+from app.models.scolarite import Scolarite
+from app.services.scolarites_service import SCOLARITE_PERIODE, latest_scolarite_view
+
+FILLEULE_SUMMARY_BATCH_SIZE = int(os.getenv("FILLEULE_SUMMARY_BATCH_SIZE", "500"))
+
+# Référentiel -> (colonne id_filleule, colonne de liaison) des lignes dont le résumé l'affiche
+_PARENT_LINKS = {
+    Parrain: (Parrainage.id_filleule, Parrainage.id_parrain),
+    Correspondant: (Filleule.id_filleule, Filleule.id_correspondant),
+    Etablissement: (Scolarite.id_filleule, Scolarite.id_etablissement),
+    AnneeScolaire: (Scolarite.id_filleule, Scolarite.id_annee_scolaire),
+}
+# Tables dont les UPDATE/DELETE en masse (query.delete(), update()) touchent des résumés
+_BULK_TRACKED_TABLES = {
+    Filleule.__table__.name: Filleule.__table__.c.id_filleule,
+    Scolarite.__table__.name: Scolarite.__table__.c.id_filleule,
+    Parrainage.__table__.name: Parrainage.__table__.c.id_filleule,
+}
+
+
+def _person_label(prenom: str | None, nom: str | None) -> str:
+    return f"{prenom or ''} {nom or ''}".strip()
+
+
+def build_summary_rows(connection, filleule_ids: list[int]) -> list[dict]:
+    """Résumés des filleules données : 3 requêtes quel que soit le nombre d'ids."""
+    filleules = connection.execute(
+        select(
+            Filleule.id_filleule,
+            Filleule.nom,
+            Filleule.prenom,
+            Correspondant.id_correspondant,
+            Correspondant.prenom,
+            Correspondant.nom,
+        )
+        .outerjoin(Correspondant, Correspondant.id_correspondant == Filleule.id_correspondant)
+        .where(Filleule.id_filleule.in_(filleule_ids))
+    ).all()
+    if not filleules:
+        return []
+
+    latest = latest_scolarite_view(filleule_ids)
+    scolarites = {
+        row[0]: row[1:]
+        for row in connection.execute(
+            select(Scolarite.id_filleule, Etablissement.nom, SCOLARITE_PERIODE, Scolarite.niveau)
+            .select_from(Scolarite)
+            .join(latest, latest.c.id_scolarite == Scolarite.id_scolarite)
+            .outerjoin(AnneeScolaire, AnneeScolaire.id_annee_scolaire == Scolarite.id_annee_scolaire)
+            .outerjoin(Etablissement, Etablissement.id_etablissement == Scolarite.id_etablissement)
+        )
+    }
+
+    parrains: dict[int, list[str]] = {}
+    seen: set[tuple[int, int]] = set()
+    for filleule_id, parrain_id, prenom, nom in connection.execute(
+        select(Parrainage.id_filleule, Parrain.id_parrain, Parrain.prenom, Parrain.nom)
+        .join(Parrain, Parrain.id_parrain == Parrainage.id_parrain)
+        .where(Parrainage.id_filleule.in_(filleule_ids))
+        .order_by(Parrainage.id_filleule, Parrainage.id_parrainage)
+    ):
+        if (filleule_id, parrain_id) in seen:
+            continue
+        seen.add((filleule_id, parrain_id))
+        parrains.setdefault(filleule_id, []).append(_person_label(prenom, nom))
+
+    rows = []
+    for filleule_id, nom, prenom, correspondant_id, correspondant_prenom, correspondant_nom in filleules:
+        etablissement, periode, niveau = scolarites.get(filleule_id, (None, None, None))
+        rows.append(
+            {
+                "id_filleule": filleule_id,
+                "nom": nom,
+                "prenom": prenom,
+                "correspondant": (
+                    _person_label(correspondant_prenom, correspondant_nom)
+                    if correspondant_id is not None
+                    else None
+                ),
+                "etablissement": etablissement,
+                "periode": periode,
+                "niveau": niveau,
+                "parrains": ", ".join(parrains[filleule_id]) if filleule_id in parrains else None,
+            }
+        )
+    return rows
+
+
+def refresh_filleule_summaries(connection, filleule_ids) -> int:
+    """Recalcule les résumés des filleules données (ligne supprimée si la filleule n'existe plus)."""
+    ids = sorted({filleule_id for filleule_id in filleule_ids if filleule_id is not None})
+    table = FilleuleSummary.__table__
+    written = 0
+    for start in range(0, len(ids), FILLEULE_SUMMARY_BATCH_SIZE):
+        chunk = ids[start:start + FILLEULE_SUMMARY_BATCH_SIZE]
+        rows = build_summary_rows(connection, chunk)
+        connection.execute(delete(table).where(table.c.id_filleule.in_(chunk)))
+        if rows:
+            connection.execute(insert(table), rows)
+        written += len(rows)
+    return written
+
+
+def rebuild_filleule_summaries(batch_size: int | None = None) -> int:
+    """Reconstruit toute la table par lots d'ids (une transaction par lot), puis retire les orphelins."""
+    batch_size = batch_size or FILLEULE_SUMMARY_BATCH_SIZE
+    table = FilleuleSummary.__table__
+    after_id = 0
+    total = 0
+    while True:
+        with engine.begin() as conn:
+            ids = conn.execute(
+                select(Filleule.id_filleule)
+                .where(Filleule.id_filleule > after_id)
+                .order_by(Filleule.id_filleule)
+                .limit(batch_size)
+            ).scalars().all()
+            if not ids:
+                break
+            total += refresh_filleule_summaries(conn, ids)
+        after_id = ids[-1]
+        print(f"[filleule-summary] lot jusqu'à id={after_id} : {len(ids)} résumé(s)")
+    with engine.begin() as conn:
+        removed = conn.execute(
+            delete(table).where(table.c.id_filleule.not_in(select(Filleule.id_filleule)))
+        ).rowcount
+    print(f"[filleule-summary] {total} résumé(s) reconstruit(s), {removed} orphelin(s) supprimé(s)")
+    return total
+
+
+# --------------------------------------------------------
+#            MAINTENANCE À L'ÉCRITURE (ÉVÉNEMENTS ORM)
+# --------------------------------------------------------
+
+def _pending_ids(session: Session) -> set[int]:
+    return session.info.setdefault("filleule_summary_ids", set())
+
+
+def _column_values(obj, key: str) -> set:
+    """Valeur actuelle et ancienne valeur (si modifiée) d'une colonne."""
+    history = attributes.get_history(obj, key)
+    values = {getattr(obj, key)}
+    values.update(history.deleted or ())
+    return values
+
+
+def _dependent_filleule_ids(session: Session, model, ids: set) -> set[int]:
+    filleule_column, link_column = _PARENT_LINKS[model]
+    return set(
+        session.connection().execute(
+            select(filleule_column).where(link_column.in_(ids)).distinct()
+        ).scalars()
+    )
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_parent_changes(session, flush_context, instances):
+    """Référentiels modifiés ou supprimés : filleules liées lues avant le flush
+    (une suppression peut délier les lignes dépendantes via ON DELETE SET NULL)."""
+    parents: dict[type, set] = {}
+    for obj in (*session.dirty, *session.deleted):
+        model = type(obj)
+        if model not in _PARENT_LINKS:
+            continue
+        if obj in session.deleted or session.is_modified(obj, include_collections=False):
+            parents.setdefault(model, set()).add(obj.__mapper__.primary_key_from_instance(obj)[0])
+    pending = _pending_ids(session)
+    for model, ids in parents.items():
+        pending.update(_dependent_filleule_ids(session, model, ids))
+
+
+@event.listens_for(Session, "after_flush")
+def _refresh_flushed_filleules(session, flush_context):
+    pending = _pending_ids(session)
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, Filleule):
+            pending.add(obj.id_filleule)
+        elif isinstance(obj, (Scolarite, Parrainage)):
+            pending.update(_column_values(obj, "id_filleule"))
+    _refresh_pending(session)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_bulk_filleules(orm_execute_state):
+    """UPDATE/DELETE en masse : lit les filleules visées avant l'exécution."""
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    table = getattr(orm_execute_state.statement, "table", None)
+    column = _BULK_TRACKED_TABLES.get(getattr(table, "name", None))
+    if column is None:
+        return
+    query = select(column).distinct()
+    if orm_execute_state.statement.whereclause is not None:
+        query = query.where(orm_execute_state.statement.whereclause)
+    session = orm_execute_state.session
+    _pending_ids(session).update(session.connection().execute(query).scalars())
+
+
+@event.listens_for(Session, "before_commit")
+def _refresh_before_commit(session):
+    # Écritures en masse non suivies d'un flush
+    _refresh_pending(session)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session):
+    session.info.pop("filleule_summary_ids", None)
+
+
+def _refresh_pending(session: Session) -> None:
+    pending = session.info.pop("filleule_summary_ids", None)
+    if pending:
+        refresh_filleule_summaries(session.connection(), pending)
@@ -0,0 +1,157 @@
+"""Lecture des pages liste : seulement les colonnes affichées, sans entités ORM.
+
+Chaque classe de ligne déclare ses colonnes (COLUMNS, dans l'ordre de __slots__)
+et ses jointures (query). Les lignes sont de simples objets à __slots__ : pas
+d'identity map, pas de suivi des modifications, pas de lazy-load possible depuis
+un gabarit. Les colonnes supplémentaires d'une ligne (clés de tri ajoutées pour
+les curseurs, par exemple) sont ignorées par from_rows.
+"""
+from typing import Iterator
+
+from sqlalchemy.orm import Session
+
+from app.models.annee_scolaire import AnneeScolaire
+from app.models.document import Document
+from app.models.etablissement import Etablissement
+from app.models.filleule import Filleule
+from app.models.filleule_summary import FilleuleSummary
+from app.models.parrain import Parrain
+from app.models.parrainage import Parrainage
+from app.models.scolarite import Scolarite
+from app.services.scolarites_service import SCOLARITE_PERIODE
+
+
+class ListRow:
+    __slots__ = ()
+    COLUMNS: tuple = ()
+
+    def __init__(self, *values):
+        for name, value in zip(self.__slots__, values):
+            setattr(self, name, value)
+
+    @classmethod
+    def query(cls, db: Session):
+        return db.query(*cls.COLUMNS)
+
+    @classmethod
+    def from_rows(cls, rows) -> list:
+        return [cls(*row) for row in rows]
+
+    @classmethod
+    def fetch(cls, query) -> list:
+        return cls.from_rows(query.all())
+
+    @classmethod
+    def stream(cls, query, yield_per: int) -> Iterator:
+        """Lignes lues par lots de yield_per (curseur côté serveur), pour les exports."""
+        return (cls(*row) for row in query.yield_per(yield_per))
+
+
+class FilleuleListRow(ListRow):
+    """Colonnes de la filleule et de son résumé (filleule_summary, lu par clé primaire)."""
+
+    __slots__ = (
+        "id_filleule",
+        "nom",
+        "prenom",
+        "whatsapp",
+        "annee_rentree",
+        "id_correspondant",
+        "referent",
+        "etablissement",
+        "periode",
+        "parrains",
+    )
+    COLUMNS = (
+        Filleule.id_filleule,
+        Filleule.nom,
+        Filleule.prenom,
+        Filleule.whatsapp,
+        Filleule.annee_rentree,
+        Filleule.id_correspondant,
+        FilleuleSummary.correspondant,
+        FilleuleSummary.etablissement,
+        FilleuleSummary.periode,
+        FilleuleSummary.parrains,
+    )
+
+    @classmethod
+    def query(cls, db: Session):
+        return db.query(*cls.COLUMNS).outerjoin(
+            FilleuleSummary, FilleuleSummary.id_filleule == Filleule.id_filleule
+        )
+
+
+class ScolariteListRow(ListRow):
+    __slots__ = (
+        "id_scolarite",
+        "filleule_prenom",
+        "filleule_nom",
+        "referent_a",
+        "id_referent_a",
+        "etablissement_nom",
+        "periode",
+        "niveau",
+    )
+    COLUMNS = (
+        Scolarite.id_scolarite,
+        Filleule.prenom,
+        Filleule.nom,
+        Scolarite.referent_a,
+        Scolarite.id_referent_a,
+        Etablissement.nom,
+        SCOLARITE_PERIODE,
+        Scolarite.niveau,
+    )
+
+    @classmethod
+    def query(cls, db: Session):
+        return (
+            db.query(*cls.COLUMNS)
+            .select_from(Scolarite)
+            .outerjoin(Filleule, Filleule.id_filleule == Scolarite.id_filleule)
+            .outerjoin(AnneeScolaire, AnneeScolaire.id_annee_scolaire == Scolarite.id_annee_scolaire)
+            .outerjoin(Etablissement, Etablissement.id_etablissement == Scolarite.id_etablissement)
+        )
+
+
+class ParrainListRow(ListRow):
+    __slots__ = ("id_parrain", "nom", "prenom", "telephone", "email")
+    COLUMNS = (Parrain.id_parrain, Parrain.nom, Parrain.prenom, Parrain.telephone, Parrain.email)
+
+
+class ParrainageListRow(ListRow):
+    __slots__ = (
+        "id_parrainage",
+        "parrain_nom",
+        "parrain_prenom",
+        "filleule_nom",
+        "filleule_prenom",
+        "date_debut",
+        "date_fin",
+        "statut",
+    )
+    COLUMNS = (
+        Parrainage.id_parrainage,
+        Parrain.nom,
+        Parrain.prenom,
+        Filleule.nom,
+        Filleule.prenom,
+        Parrainage.date_debut,
+        Parrainage.date_fin,
+        Parrainage.statut,
+    )
+
+    @classmethod
+    def query(cls, db: Session):
+        return (
+            db.query(*cls.COLUMNS)
+            .select_from(Parrainage)
+            .outerjoin(Parrain, Parrain.id_parrain == Parrainage.id_parrain)
+            .outerjoin(Filleule, Filleule.id_filleule == Parrainage.id_filleule)
+        )
+
+
+class DocumentListRow(ListRow):
+    __slots__ = ("id_document", "titre")
+    COLUMNS = (Document.id_document, Document.titre)
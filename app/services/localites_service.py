@@ -1,10 +1,17 @@
+import os
 import re
 
-from sqlalchemy.orm import Session
+from sqlalchemy import bindparam, event, select, update
+from sqlalchemy.orm import Session, attributes
 
-from app.database import SessionLocal
+from app.database import SessionLocal, engine
 from app.models.filleule import Filleule
 from app.models.localite import Localite
+from app.services.cache_service import SnapshotCache
+
+VILLE_BACKFILL_BATCH_SIZE = int(os.getenv("VILLE_BACKFILL_BATCH_SIZE", "1000"))
+
+localites_map_cache = SnapshotCache({Localite.__table__.name})
 
 
 LOCALITES_SEED = [
@@ -186,20 +193,61 @@ def resolve_localite_name(value: str | None, mapping: dict[str, str]) -> str | N
     return mapping.get(key)
 
 
-def ensure_filleule_ville_mapping() -> None:
-    db: Session = SessionLocal()
-    try:
-        localites = db.query(Localite).all()
-        if not localites:
-            return
-        mapping = build_localites_map(localites)
-        updated = 0
-        for filleule in db.query(Filleule).filter(Filleule.ville.isnot(None)).all():
-            resolved = resolve_localite_name(filleule.ville, mapping)
-            if resolved and filleule.ville != resolved:
-                filleule.ville = resolved
-                updated += 1
-        if updated:
-            db.commit()
-    finally:
-        db.close()
+def get_localites_map(connection) -> dict[str, str]:
+    """Table nom/alias normalisé -> nom canonique, en cache tant que Localites ne change pas."""
+    cached = localites_map_cache.get()
+    if cached is not None:
+        return cached
+    version = localites_map_cache.version()
+    mapping = build_localites_map(connection.execute(select(Localite.nom, Localite.aliases)).all())
+    localites_map_cache.set(mapping, version)
+    return mapping
+
+
+@event.listens_for(Filleule, "before_insert")
+@event.listens_for(Filleule, "before_update")
+def normalize_filleule_ville(mapper, connection, target: Filleule) -> None:
+    """Remplace la ville saisie par le nom canonique de la localité (création, édition, API, scripts)."""
+    if not target.ville or not attributes.get_history(target, "ville").has_changes():
+        return
+    resolved = resolve_localite_name(target.ville, get_localites_map(connection))
+    if resolved:
+        target.ville = resolved
+
+
+def backfill_filleule_ville(after_id: int = 0, batch_size: int | None = None) -> tuple[int, int]:
+    """Normalise les villes existantes par lots ordonnés par id (reprise possible via after_id).
+
+    Chaque lot est validé séparément et son dernier id affiché : en cas d'interruption,
+    relancer avec after_id égal au dernier id affiché. Retourne (lignes lues, lignes modifiées).
+    """
+    batch_size = batch_size or VILLE_BACKFILL_BATCH_SIZE
+    scanned = 0
+    updated = 0
+    with engine.connect() as read_conn:
+        mapping = get_localites_map(read_conn)
+        if not mapping:
+            return 0, 0
+        result = read_conn.execution_options(yield_per=batch_size).execute(
+            select(Filleule.id_filleule, Filleule.ville)
+            .where(Filleule.ville.isnot(None), Filleule.id_filleule > after_id)
+            .order_by(Filleule.id_filleule)
+        )
+        for rows in result.partitions():
+            changes = []
+            for filleule_id, ville in rows:
+                resolved = resolve_localite_name(ville, mapping)
+                if resolved and resolved != ville:
+                    changes.append({"b_id": filleule_id, "b_ville": resolved})
+            if changes:
+                with engine.begin() as write_conn:
+                    write_conn.execute(
+                        update(Filleule.__table__)
+                        .where(Filleule.__table__.c.id_filleule == bindparam("b_id"))
+                        .values(ville=bindparam("b_ville")),
+                        changes,
+                    )
+            scanned += len(rows)
+            updated += len(changes)
+            print(f"[ville-backfill] lot jusqu'à id={rows[-1][0]} : {len(changes)} modifiée(s)")
+    return scanned, updated
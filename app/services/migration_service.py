@@ -0,0 +1,288 @@
+import hashlib
+import inspect
+import os
+import time
+from datetime import date
+from types import CodeType
+from typing import Callable
+
+from sqlalchemy import select, text
+from sqlalchemy.dialects import mysql
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+from app.database import Base, engine
+from app.models import (  # noqa: F401  (toutes les tables pour create_all et l'empreinte)
+    annee_scolaire,
+    correspondant,
+    document,
+    etablissement,
+    filleule,
+    filleule_summary,
+    localite,
+    parrain,
+    parrainage,
+    reference_version,
+    role,
+    scolarite,
+    suivisocial,
+    tache,
+    typedocument,
+    user,
+    user_connection_log,
+)
+from app.models.filleule_summary import FilleuleSummary
+from app.models.schema_migration import SchemaMigration
+from app.services.annees_scolaires_service import ensure_annees_scolaires_seed
+from app.services.connection_log_service import ensure_connection_rollups
+from app.services.filleule_summary_service import (
+    _person_label,
+    build_summary_rows,
+    rebuild_filleule_summaries,
+)
+from app.services.localites_service import ensure_localites_seed
+from app.services.reference_data_service import ensure_reference_versions
+from app.services.roles_service import ensure_default_roles
+from app.services.scolarites_service import (
+    CorrespondantIndex,
+    backfill_correspondant_name_keys,
+    backfill_scolarite_referents,
+    correspondant_label,
+    backfill_start_years,
+    latest_scolarite_view,
+    referent_key,
+)
+from app.services.schema_service import (
+    ensure_correspondant_name_key_column,
+    ensure_document_annee_scolaire_column,
+    ensure_etablissement_type_enum,
+    ensure_filleule_correspondant_column,
+    ensure_filleule_etablissement_column,
+    ensure_filleule_parent_sante_columns,
+    ensure_filleule_photo_column,
+    ensure_filter_indexes,
+    ensure_normalized_filter_columns,
+    ensure_parrain_photo_column,
+    ensure_scolarite_annee_scolaire_column,
+    ensure_scolarite_referent_columns,
+    ensure_start_year_columns,
+    ensure_user_connection_log_indexes,
+    ensure_user_password_reset_columns,
+    ensure_user_session_version_column,
+)
+
+MIGRATION_LOCK_NAME = "fae_schema_migrations"
+MIGRATION_LOCK_TIMEOUT_SECONDS = int(os.getenv("MIGRATION_LOCK_TIMEOUT_SECONDS", "300"))
+# wait | skip | off (voir startup_migrations)
+APP_INIT_MODE = os.getenv("APP_INIT_MODE", "wait").lower()
+
+
+def create_all_tables() -> None:
+    Base.metadata.create_all(bind=engine)
+
+
+def table_fingerprint(table) -> str:
+    """DDL MySQL d'une table et de ses index."""
+    dialect = mysql.dialect()
+    parts = [str(CreateTable(table).compile(dialect=dialect))]
+    for index in sorted(table.indexes, key=lambda item: item.name or ""):
+        parts.append(str(CreateIndex(index).compile(dialect=dialect)))
+    return "\n".join(parts)
+
+
+def metadata_fingerprint() -> str:
+    """DDL MySQL de toutes les tables déclarées : change dès qu'un modèle évolue."""
+    return "\n".join(table_fingerprint(table) for table in Base.metadata.sorted_tables)
+
+
+def _referenced_names(code: CodeType) -> list[str]:
+    names = list(code.co_names)
+    for const in code.co_consts:
+        if isinstance(const, CodeType):
+            names.extend(_referenced_names(const))
+    return names
+
+
+def function_fingerprint(func: Callable) -> str:
+    """Source de la fonction et constantes de module qu'elle utilise (colonnes, seeds...)."""
+    parts = [inspect.getsource(func)]
+    for name in sorted(set(_referenced_names(func.__code__))):
+        value = func.__globals__.get(name)
+        if isinstance(value, (dict, list, tuple, str, int, float)):
+            parts.append(f"{name}={value!r}")
+    return "\n".join(parts)
+
+
+def _filleule_summary_fingerprint() -> str:
+    # Contenu de la table (calcul des lignes + DDL), pas la taille des lots (réglage d'exploitation)
+    sources = [inspect.getsource(func) for func in (build_summary_rows, _person_label, latest_scolarite_view)]
+    return "\n".join([*sources, table_fingerprint(FilleuleSummary.__table__)])
+
+
+def _scolarite_referent_backfill_fingerprint() -> str:
+    # Règles de résolution, pas la taille des lots
+    return "\n".join(
+        inspect.getsource(func)
+        for func in (backfill_scolarite_referents, CorrespondantIndex, correspondant_label, referent_key)
+    )
+
+
+def _correspondant_name_keys_fingerprint() -> str:
+    # Rejouée si la règle de normalisation change
+    return "\n".join(
+        inspect.getsource(func)
+        for func in (backfill_correspondant_name_keys, correspondant_label, referent_key)
+    )
+
+
+def _annees_scolaires_fingerprint() -> str:
+    # La liste des années dépend de l'année en cours : l'étape est rejouée une fois par an
+    return f"{function_fingerprint(ensure_annees_scolaires_seed)}\nyear={date.today().year}"
+
+
+# Ordre d'exécution; (identifiant, fonction, empreinte personnalisée ou None)
+MIGRATION_STEPS: list[tuple[str, Callable[[], None], Callable[[], str] | None]] = [
+    ("create_all", create_all_tables, metadata_fingerprint),
+    # Avant les seeds : leurs écritures ORM incrémentent ces versions
+    ("reference_versions", ensure_reference_versions, None),
+    ("user_session_version_column", ensure_user_session_version_column, None),
+    ("default_roles", ensure_default_roles, None),
+    ("filleule_photo_column", ensure_filleule_photo_column, None),
+    ("filleule_parent_sante_columns", ensure_filleule_parent_sante_columns, None),
+    ("filleule_etablissement_column", ensure_filleule_etablissement_column, None),
+    ("parrain_photo_column", ensure_parrain_photo_column, None),
+    ("etablissement_type_enum", ensure_etablissement_type_enum, None),
+    # Avant le seed : les insertions ORM renseignent start_year
+    ("start_year_columns", ensure_start_year_columns, None),
+    ("annees_scolaires_seed", ensure_annees_scolaires_seed, _annees_scolaires_fingerprint),
+    ("localites_seed", ensure_localites_seed, None),
+    ("scolarite_annee_scolaire_column", ensure_scolarite_annee_scolaire_column, None),
+    ("start_year_backfill", backfill_start_years, None),
+    ("document_annee_scolaire_column", ensure_document_annee_scolaire_column, None),
+    ("filleule_correspondant_column", ensure_filleule_correspondant_column, None),
+    ("scolarite_referent_columns", ensure_scolarite_referent_columns, None),
+    ("scolarite_referent_backfill", backfill_scolarite_referents, _scolarite_referent_backfill_fingerprint),
+    ("normalized_filter_columns", ensure_normalized_filter_columns, None),
+    ("correspondant_name_key_column", ensure_correspondant_name_key_column, None),
+    ("correspondant_name_key_backfill", backfill_correspondant_name_keys, _correspondant_name_keys_fingerprint),
+    ("filter_indexes", ensure_filter_indexes, None),
+    ("user_password_reset_columns", ensure_user_password_reset_columns, None),
+    ("user_connection_log_indexes", ensure_user_connection_log_indexes, None),
+    ("connection_rollups", ensure_connection_rollups, None),
+    # En dernier : dépend des années de début et des colonnes ajoutées ci-dessus
+    ("filleule_summary_rebuild", rebuild_filleule_summaries, _filleule_summary_fingerprint),
+]
+
+
+def step_checksums() -> dict[str, str]:
+    checksums = {}
+    for step_id, func, fingerprint in MIGRATION_STEPS:
+        source = fingerprint() if fingerprint else function_fingerprint(func)
+        checksums[step_id] = hashlib.sha256(source.encode("utf-8")).hexdigest()
+    return checksums
+
+
+def _elapsed_ms(start: float) -> float:
+    return round((time.perf_counter() - start) * 1000, 1)
+
+
+def _read_ledger(conn) -> dict[str, str]:
+    rows = conn.execute(select(SchemaMigration.step_id, SchemaMigration.checksum)).all()
+    return {step_id: checksum for step_id, checksum in rows}
+
+
+def pending_migrations(ledger: dict[str, str], checksums: dict[str, str]) -> list[str]:
+    return [step_id for step_id, checksum in checksums.items() if ledger.get(step_id) != checksum]
+
+
+def get_pending_migrations() -> list[str]:
+    try:
+        with engine.connect() as conn:
+            ledger = _read_ledger(conn)
+    except SQLAlchemyError:
+        ledger = {}
+    return pending_migrations(ledger, step_checksums())
+
+
+def _record_step(conn, step_id: str, checksum: str) -> None:
+    conn.execute(
+        text(
+            """
+            INSERT INTO schema_migrations (step_id, checksum, applied_at)
+            VALUES (:step_id, :checksum, NOW())
+            ON DUPLICATE KEY UPDATE checksum = VALUES(checksum), applied_at = VALUES(applied_at)
+            """
+        ),
+        {"step_id": step_id, "checksum": checksum},
+    )
+    conn.commit()
+
+
+def run_migrations(wait: bool = True) -> list[str] | None:
+    """Applique les étapes absentes du registre ou dont l'empreinte a changé.
+
+    Cas courant : un seul SELECT sur schema_migrations. Sinon les étapes sont
+    exécutées sous le verrou MySQL GET_LOCK, un seul processus à la fois; les
+    autres relisent le registre après avoir obtenu le verrou et n'ont en général
+    plus rien à faire. Avec wait=False, un processus qui trouve le verrou pris
+    n'attend pas et retourne None. Sinon retourne les étapes exécutées.
+    """
+    start = time.perf_counter()
+    checksums = step_checksums()
+    try:
+        with engine.connect() as conn:
+            ledger = _read_ledger(conn)
+    except SQLAlchemyError:
+        ledger = {}
+    if not pending_migrations(ledger, checksums):
+        print(f"[init] schéma à jour ({_elapsed_ms(start)} ms)")
+        return []
+
+    applied = []
+    with engine.connect() as lock_conn:
+        acquired = lock_conn.execute(
+            text("SELECT GET_LOCK(:name, :timeout)"),
+            {"name": MIGRATION_LOCK_NAME, "timeout": MIGRATION_LOCK_TIMEOUT_SECONDS if wait else 0},
+        ).scalar()
+        if acquired != 1:
+            if not wait:
+                print("[init] initialisation en cours dans un autre processus, étape ignorée")
+                return None
+            raise RuntimeError(
+                f"Verrou de migration {MIGRATION_LOCK_NAME} non obtenu après {MIGRATION_LOCK_TIMEOUT_SECONDS}s"
+            )
+        print(f"[init] verrou obtenu après {_elapsed_ms(start)} ms")
+        try:
+            SchemaMigration.__table__.create(bind=lock_conn, checkfirst=True)
+            lock_conn.commit()
+            ledger = _read_ledger(lock_conn)
+            lock_conn.commit()
+            steps = {step_id: func for step_id, func, _ in MIGRATION_STEPS}
+            for step_id in pending_migrations(ledger, checksums):
+                step_start = time.perf_counter()
+                steps[step_id]()
+                _record_step(lock_conn, step_id, checksums[step_id])
+                applied.append(step_id)
+                print(f"[init] {step_id} : {_elapsed_ms(step_start)} ms")
+        finally:
+            lock_conn.execute(text("SELECT RELEASE_LOCK(:name)"), {"name": MIGRATION_LOCK_NAME})
+            lock_conn.commit()
+    print(f"[init] {len(applied)} étape(s) appliquée(s) en {_elapsed_ms(start)} ms")
+    return applied
+
+
+def startup_migrations() -> None:
+    """Initialisation au démarrage d'un worker selon APP_INIT_MODE.
+
+    - wait (défaut) : un worker initialise, les autres attendent le verrou puis
+      constatent que tout est appliqué;
+    - skip : les workers qui trouvent le verrou pris démarrent sans attendre;
+    - off : aucune initialisation au démarrage (python -m scripts.init_db lancé
+      avant le déploiement); les étapes en attente sont seulement signalées.
+    """
+    if APP_INIT_MODE == "off":
+        pending = get_pending_migrations()
+        if pending:
+            print(f"[init] {len(pending)} migration(s) en attente : {', '.join(pending)}")
+        return
+    run_migrations(wait=APP_INIT_MODE != "skip")
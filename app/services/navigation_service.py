@@ -0,0 +1,67 @@
+from dataclasses import dataclass
+from typing import Mapping, Sequence
+from urllib.parse import urlencode
+
+from sqlalchemy import literal, select, true, union_all
+
+from app.services.pagination_service import keyset_condition, ordering
+
+
+@dataclass(frozen=True)
+class Neighbors:
+    """Fiches précédente/suivante et contexte de liste (filtres, tri) à conserver dans les liens."""
+
+    previous_id: int | None = None
+    next_id: int | None = None
+    query_string: str = ""
+
+    def url(self, path: str) -> str:
+        return f"{path}?{self.query_string}" if self.query_string else path
+
+
+def list_context(params: Mapping[str, str], keys: Sequence[str]) -> dict[str, str]:
+    """Paramètres de liste (filtres, tri) présents et non vides, hors pagination."""
+    return {key: params[key] for key in keys if params.get(key)}
+
+
+def neighbor_ids(query, sort_columns: Sequence, record_id: int, descending: bool = False):
+    """(id précédent, id suivant) de record_id dans la liste `query` triée par sort_columns.
+
+    `query` sélectionne l'id (dernière colonne de sort_columns, qui rend l'ordre total)
+    avec les filtres de la liste, sans tri ni pagination. Une seule instruction : les
+    valeurs de tri de la fiche sont lues par clé primaire dans une table dérivée, puis
+    deux lectures LIMIT 1 de part et d'autre (même condition que les curseurs de
+    pagination_service, donc mêmes index) sont réunies par UNION ALL. La liste
+    elle-même n'est pas relue.
+    """
+    id_column = sort_columns[-1]
+    current = (
+        select(*(column.label(f"cle_{position}") for position, column in enumerate(sort_columns)))
+        .where(id_column == record_id)
+        .subquery("fiche_courante")
+    )
+    current_values = list(current.c)
+    parts = []
+    for direction, reverse in ((-1, True), (1, False)):
+        step_descending = descending != reverse
+        neighbor = (
+            query.join(current, true())
+            .filter(keyset_condition(sort_columns, current_values, step_descending))
+            .order_by(*ordering(sort_columns, step_descending))
+            .limit(1)
+            .subquery()
+        )
+        parts.append(select(literal(direction).label("sens"), list(neighbor.c)[0]))
+    found = dict(query.session.execute(union_all(*parts)).all())
+    return found.get(-1), found.get(1)
+
+
+def neighbors(
+    query,
+    sort_columns: Sequence,
+    record_id: int,
+    descending: bool = False,
+    context: Mapping[str, str] | None = None,
+) -> Neighbors:
+    previous_id, next_id = neighbor_ids(query, sort_columns, record_id, descending)
+    return Neighbors(previous_id, next_id, urlencode(context or {}))
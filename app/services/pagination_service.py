@@ -0,0 +1,48 @@
+import base64
+import json
+from datetime import date, datetime
+from typing import Any, Sequence
+
+from sqlalchemy import and_, or_
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Curseur opaque (JSON en base64 URL) à partir des valeurs de tri d'une ligne."""
+    payload = json.dumps(
+        [value.isoformat() if isinstance(value, (date, datetime)) else value for value in values],
+        separators=(",", ":"),
+        ensure_ascii=False,
+    )
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str | None, size: int) -> list[Any] | None:
+    """Valeurs du curseur, ou None s'il est absent ou invalide."""
+    if not token:
+        return None
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8"))
+    except (ValueError, UnicodeDecodeError):
+        return None
+    if not isinstance(values, list) or len(values) != size:
+        return None
+    return values
+
+
+def keyset_condition(columns: Sequence, values: Sequence[Any], descending: bool = False):
+    """Lignes strictement après `values` dans l'ordre (columns...), sans OFFSET.
+
+    Forme développée (a > x) OR (a = x AND b > y) OR ... plutôt qu'une comparaison
+    de tuples, pour que l'index composite soit utilisé quelle que soit la base.
+    """
+    clauses = []
+    for position, column in enumerate(columns):
+        equal_prefix = [columns[i] == values[i] for i in range(position)]
+        step = column < values[position] if descending else column > values[position]
+        clauses.append(and_(*equal_prefix, step))
+    return or_(*clauses)
+
+
+def ordering(columns: Sequence, descending: bool = False) -> list:
+    return [column.desc() if descending else column.asc() for column in columns]
@@ -0,0 +1,217 @@
+"""Cache en mémoire des petites tables de référence (formulaires, libellés).
+
+Chaque table a une version dans reference_versions, incrémentée dans la
+transaction même de toute écriture ORM (flush ou UPDATE/DELETE en masse) : les
+routes CRUD n'ont rien à appeler. Chaque worker relit ces versions (une requête
+sur quelques lignes) au plus toutes les REFERENCE_CACHE_CHECK_SECONDS et
+recharge une table dès que sa version a changé; un commit local force la
+relecture immédiate. Les écritures en SQL brut doivent incrémenter la version
+(bump_reference_versions), sinon elles sont visibles après
+REFERENCE_CACHE_TTL_SECONDS.
+
+Les lignes servies sont des namedtuple détachés (une par ligne, toutes les
+colonnes de la table) : pas de lazy-load ni de session associée.
+"""
+import os
+import threading
+import time
+from collections import namedtuple
+from typing import Iterable
+
+from sqlalchemy import case, event, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.database import engine
+from app.models.annee_scolaire import AnneeScolaire
+from app.models.correspondant import Correspondant
+from app.models.etablissement import Etablissement
+from app.models.localite import Localite
+from app.models.reference_version import ReferenceVersion
+from app.models.tache import TacheObjet
+from app.models.typedocument import TypeDocument
+
+REFERENCE_CACHE_CHECK_SECONDS = float(os.getenv("REFERENCE_CACHE_CHECK_SECONDS", "2"))
+# Filet de sécurité pour les écritures qui n'incrémentent pas la version
+REFERENCE_CACHE_TTL_SECONDS = float(os.getenv("REFERENCE_CACHE_TTL_SECONDS", "300"))
+
+_lock = threading.Lock()
+_versions: dict[str, int] = {}
+_last_check = 0.0
+_stats = {"hits": 0, "misses": 0, "version_checks": 0}
+
+
+def refresh_reference_versions() -> None:
+    """Relit toutes les versions (une requête)."""
+    global _last_check
+    try:
+        with engine.connect() as conn:
+            rows = conn.execute(select(ReferenceVersion.table_name, ReferenceVersion.version)).all()
+    except Exception as exc:
+        print(f"[reference-cache] lecture des versions impossible: {exc}")
+        with _lock:
+            _last_check = time.monotonic()
+        return
+    with _lock:
+        _versions.clear()
+        _versions.update({table_name: version for table_name, version in rows})
+        _last_check = time.monotonic()
+        _stats["version_checks"] += 1
+
+
+def reference_version(table_name: str) -> int:
+    with _lock:
+        stale = time.monotonic() - _last_check > REFERENCE_CACHE_CHECK_SECONDS
+    if stale:
+        refresh_reference_versions()
+    with _lock:
+        return _versions.get(table_name, 0)
+
+
+class ReferenceData:
+    """Contenu d'une table, dans un ordre donné, tant que sa version n'a pas changé."""
+
+    def __init__(self, model, order_by: tuple = ()):
+        self.table = model.__table__
+        self.table_name = self.table.name
+        self.order_by = order_by
+        self.row_type = namedtuple(f"{model.__name__}Ref", [column.key for column in self.table.columns])
+        self._id_key = next(iter(self.table.primary_key.columns)).key
+        self._lock = threading.Lock()
+        # (version, expiration, lignes, lignes par id)
+        self._entry: tuple[int, float, tuple, dict] | None = None
+
+    def _current(self) -> tuple[tuple, dict]:
+        # Version lue *avant* le chargement : une écriture concurrente provoque un rechargement
+        version = reference_version(self.table_name)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entry
+        if entry and entry[0] == version and entry[1] > now:
+            with _lock:
+                _stats["hits"] += 1
+            return entry[2], entry[3]
+        # Connexion dédiée : jamais les écritures non validées de la session de la requête
+        with engine.connect() as conn:
+            rows = tuple(
+                self.row_type(*row)
+                for row in conn.execute(select(self.table).order_by(*self.order_by))
+            )
+        by_id = {getattr(row, self._id_key): row for row in rows}
+        with self._lock:
+            self._entry = (version, now + REFERENCE_CACHE_TTL_SECONDS, rows, by_id)
+        with _lock:
+            _stats["misses"] += 1
+        return rows, by_id
+
+    def rows(self) -> tuple:
+        return self._current()[0]
+
+    def by_id(self) -> dict:
+        return self._current()[1]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entry = None
+
+
+correspondants_ref = ReferenceData(Correspondant, (Correspondant.nom, Correspondant.prenom))
+# Ordre des listes de référents côté scolarité
+correspondants_by_prenom_ref = ReferenceData(Correspondant, (Correspondant.prenom, Correspondant.nom))
+etablissements_ref = ReferenceData(Etablissement, (Etablissement.nom,))
+localites_ref = ReferenceData(Localite, (Localite.nom,))
+annees_scolaires_ref = ReferenceData(AnneeScolaire, (AnneeScolaire.periode,))
+types_documents_ref = ReferenceData(TypeDocument, (TypeDocument.id_type,))
+# « autre » en dernier
+tache_objets_ref = ReferenceData(
+    TacheObjet, (case((TacheObjet.code == "autre", 1), else_=0), TacheObjet.code)
+)
+
+_REFERENCES = (
+    correspondants_ref,
+    correspondants_by_prenom_ref,
+    etablissements_ref,
+    localites_ref,
+    annees_scolaires_ref,
+    types_documents_ref,
+    tache_objets_ref,
+)
+REFERENCE_TABLES = tuple(sorted({ref.table_name for ref in _REFERENCES}))
+
+
+def ensure_reference_versions() -> None:
+    """Crée la ligne de version manquante de chaque table de référence."""
+    with engine.begin() as conn:
+        existing = set(conn.execute(select(ReferenceVersion.table_name)).scalars())
+        missing = [{"table_name": name, "version": 0} for name in REFERENCE_TABLES if name not in existing]
+        if missing:
+            conn.execute(insert(ReferenceVersion), missing)
+
+
+def bump_reference_versions(connection, tables: Iterable[str]) -> None:
+    """Incrémente la version des tables données, dans la transaction de l'écriture."""
+    names = sorted(set(tables) & set(REFERENCE_TABLES))
+    if names:
+        connection.execute(
+            update(ReferenceVersion)
+            .where(ReferenceVersion.table_name.in_(names))
+            .values(version=ReferenceVersion.version + 1)
+        )
+
+
+def get_reference_cache_stats() -> dict:
+    with _lock:
+        hits = _stats["hits"]
+        misses = _stats["misses"]
+        total = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "version_checks": _stats["version_checks"],
+            "hit_rate": round(hits / total, 4) if total else None,
+            "versions": dict(_versions),
+            "check_seconds": REFERENCE_CACHE_CHECK_SECONDS,
+            "ttl_seconds": REFERENCE_CACHE_TTL_SECONDS,
+        }
+
+
+# --------------------------------------------------------
+#            INCRÉMENT DES VERSIONS (ÉVÉNEMENTS ORM)
+# --------------------------------------------------------
+
+def _mark_changed(session: Session, tables: set[str]) -> None:
+    bump_reference_versions(session.connection(), tables)
+    session.info["reference_data_changed"] = True
+
+
+@event.listens_for(Session, "after_flush")
+def _bump_flushed_references(session, flush_context):
+    tables = {
+        obj.__table__.name
+        for obj in (*session.new, *session.dirty, *session.deleted)
+        if hasattr(obj, "__table__") and obj.__table__.name in REFERENCE_TABLES
+    }
+    if tables:
+        _mark_changed(session, tables)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _bump_bulk_references(orm_execute_state):
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete or orm_execute_state.is_insert):
+        return
+    table = getattr(orm_execute_state.statement, "table", None)
+    if getattr(table, "name", None) in REFERENCE_TABLES:
+        _mark_changed(orm_execute_state.session, {table.name})
+
+
+@event.listens_for(Session, "after_commit")
+def _recheck_after_commit(session):
+    global _last_check
+    if session.info.pop("reference_data_changed", None):
+        # Ce worker voit ses propres écritures dès la requête suivante
+        with _lock:
+            _last_check = 0.0
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session):
+    session.info.pop("reference_data_changed", None)
@@ -386,3 +386,243 @@ def ensure_user_password_reset_columns():
         expires_count = conn.execute(expires_query, {"db": DB_NAME}).scalar()
         if expires_count == 0:
             conn.execute(text("ALTER TABLE users ADD COLUMN reset_token_expires DATETIME NULL"))
+
+
+def ensure_user_session_version_column():
+    query = text(
+        """
+        SELECT COUNT(*)
+        FROM INFORMATION_SCHEMA.COLUMNS
+        WHERE TABLE_SCHEMA = :db
+          AND TABLE_NAME = 'users'
+          AND COLUMN_NAME = 'session_version'
+        """
+    )
+
+    with engine.begin() as conn:
+        count = conn.execute(query, {"db": DB_NAME}).scalar()
+        if count == 0:
+            conn.execute(text("ALTER TABLE users ADD COLUMN session_version INT NOT NULL DEFAULT 0"))
+
+
+def ensure_user_connection_log_indexes():
+    index_query = text(
+        """
+        SELECT COUNT(*)
+        FROM INFORMATION_SCHEMA.STATISTICS
+        WHERE TABLE_SCHEMA = :db
+          AND TABLE_NAME = 'user_connection_logs'
+          AND INDEX_NAME = :index
+        """
+    )
+
+    indexes = {
+        "ix_user_connection_logs_user_created": "(user_id, created_at)",
+        "ix_user_connection_logs_created_at": "(created_at)",
+    }
+
+    with engine.begin() as conn:
+        for index_name, columns in indexes.items():
+            count = conn.execute(index_query, {"db": DB_NAME, "index": index_name}).scalar()
+            if count == 0:
+                conn.execute(text(f"CREATE INDEX {index_name} ON user_connection_logs {columns}"))
+
+
+NORMALIZED_FILTER_COLUMNS = {
+    "Filleules": {
+        "ville_norm": ("ville", "VARCHAR(255)"),
+        "village_norm": ("village", "VARCHAR(255)"),
+        "annee_rentree_norm": ("annee_rentree", "VARCHAR(20)"),
+        "couverture_sante_norm": ("couverture_sante", "VARCHAR(255)"),
+    },
+    "Scolarite": {
+        "filiere_norm": ("filiere", "VARCHAR(255)"),
+    },
+}
+
+FILTER_INDEXES = {
+    "Filleules": {
+        "ix_filleules_ville_norm": ("ville_norm",),
+        "ix_filleules_village_norm": ("village_norm",),
+        "ix_filleules_annee_rentree_norm": ("annee_rentree_norm",),
+        "ix_filleules_couverture_sante_norm": ("couverture_sante_norm",),
+        "ix_filleules_nom_prenom": ("nom", "prenom", "id_filleule"),
+        "ix_filleules_prenom_nom": ("prenom", "nom", "id_filleule"),
+    },
+    "Scolarite": {
+        "ix_scolarite_id_filleule": ("id_filleule",),
+        "ix_scolarite_filiere_norm": ("filiere_norm", "id_filleule"),
+    },
+    "Correspondants": {
+        "ix_correspondants_nom_complet_norm": ("nom_complet_norm",),
+    },
+    "Parrains": {
+        "ix_parrains_nom_prenom": ("nom", "prenom", "id_parrain"),
+    },
+    "Parrainages": {
+        "ix_parrainages_id_filleule": ("id_filleule",),
+        "ix_parrainages_id_parrain": ("id_parrain",),
+    },
+    "Documents": {
+        "ix_documents_id_filleule": ("id_filleule",),
+    },
+    "SuiviSocial": {
+        "ix_suivisocial_id_filleule": ("id_filleule",),
+    },
+    "Taches": {
+        "ix_taches_statut_date_debut": ("statut", "date_debut", "id_tache"),
+        "ix_taches_date_debut": ("date_debut", "id_tache"),
+    },
+}
+
+
+START_YEAR_TABLES = ("Annee_scolaire", "Scolarite")
+
+
+def ensure_start_year_columns():
+    """Colonne start_year (INT) tenue à jour à l'écriture; remplie ensuite par backfill_start_years."""
+    column_query = text(
+        """
+        SELECT COUNT(*)
+        FROM INFORMATION_SCHEMA.COLUMNS
+        WHERE TABLE_SCHEMA = :db
+          AND TABLE_NAME = :table
+          AND COLUMN_NAME = 'start_year'
+        """
+    )
+
+    with engine.begin() as conn:
+        for table in START_YEAR_TABLES:
+            count = conn.execute(column_query, {"db": DB_NAME, "table": table}).scalar()
+            if count == 0:
+                conn.execute(text(f"ALTER TABLE {table} ADD COLUMN start_year INT NULL"))
+
+
+# Colonne FK -> contrainte; remplies ensuite par backfill_scolarite_referents
+SCOLARITE_REFERENT_COLUMNS = {
+    "id_referent_a": "fk_scolarite_referent_a",
+    "id_referent_b": "fk_scolarite_referent_b",
+}
+
+
+def ensure_scolarite_referent_columns():
+    column_query = text(
+        """
+        SELECT COUNT(*)
+        FROM INFORMATION_SCHEMA.COLUMNS
+        WHERE TABLE_SCHEMA = :db
+          AND TABLE_NAME = 'Scolarite'
+          AND COLUMN_NAME = :column
+        """
+    )
+    fk_query = text(
+        """
+        SELECT COUNT(*)
+        FROM INFORMATION_SCHEMA.KEY_COLUMN_USAGE
+        WHERE TABLE_SCHEMA = :db
+          AND TABLE_NAME = 'Scolarite'
+          AND COLUMN_NAME = :column
+          AND REFERENCED_TABLE_NAME IS NOT NULL
+        """
+    )
+
+    with engine.begin() as conn:
+        for column, constraint in SCOLARITE_REFERENT_COLUMNS.items():
+            count = conn.execute(column_query, {"db": DB_NAME, "column": column}).scalar()
+            if count == 0:
+                conn.execute(text(f"ALTER TABLE Scolarite ADD COLUMN {column} INT NULL"))
+            fk_count = conn.execute(fk_query, {"db": DB_NAME, "column": column}).scalar()
+            if fk_count == 0:
+                conn.execute(
+                    text(
+                        f"""
+                        ALTER TABLE Scolarite
+                        ADD CONSTRAINT {constraint}
+                        FOREIGN KEY ({column})
+                        REFERENCES Correspondants(id_correspondant)
+                        ON DELETE SET NULL
+                        """
+                    )
+                )
+
+
+def ensure_normalized_filter_columns():
+    """Colonnes générées (LOWER(TRIM(x)), NULL si vide) des filtres de liste.
+
+    Les colonnes sont STORED : MySQL les recalcule à chaque INSERT/UPDATE et les
+    remplit pour les lignes existantes lors de l'ALTER TABLE.
+    """
+    column_query = text(
+        """
+        SELECT COUNT(*)
+        FROM INFORMATION_SCHEMA.COLUMNS
+        WHERE TABLE_SCHEMA = :db
+          AND TABLE_NAME = :table
+          AND COLUMN_NAME = :column
+        """
+    )
+
+    with engine.begin() as conn:
+        for table, columns in NORMALIZED_FILTER_COLUMNS.items():
+            for column, (source, sql_type) in columns.items():
+                count = conn.execute(
+                    column_query, {"db": DB_NAME, "table": table, "column": column}
+                ).scalar()
+                if count == 0:
+                    conn.execute(
+                        text(
+                            f"ALTER TABLE {table} ADD COLUMN {column} {sql_type} "
+                            f"GENERATED ALWAYS AS (NULLIF(LOWER(TRIM({source})), '')) STORED"
+                        )
+                    )
+
+
+def ensure_correspondant_name_key_column():
+    """Clé de nom des correspondants, calculée en Python à l'écriture (scolarites_service.referent_key).
+
+    Une première version la déclarait GENERATED (CONCAT côté SQL) : MySQL convertit
+    une colonne STORED en colonne ordinaire en gardant ses valeurs, recalculées
+    ensuite par backfill_correspondant_name_keys.
+    """
+    column_query = text(
+        """
+        SELECT EXTRA
+        FROM INFORMATION_SCHEMA.COLUMNS
+        WHERE TABLE_SCHEMA = :db
+          AND TABLE_NAME = 'Correspondants'
+          AND COLUMN_NAME = 'nom_complet_norm'
+        """
+    )
+
+    with engine.begin() as conn:
+        row = conn.execute(column_query, {"db": DB_NAME}).first()
+        if row is None:
+            conn.execute(text("ALTER TABLE Correspondants ADD COLUMN nom_complet_norm VARCHAR(511) NULL"))
+        elif "GENERATED" in (row[0] or "").upper():
+            conn.execute(text("ALTER TABLE Correspondants MODIFY COLUMN nom_complet_norm VARCHAR(511) NULL"))
+
+
+def ensure_filter_indexes():
+    """Index des filtres et jointures; un index existant couvrant déjà les mêmes colonnes
+    en tête (ex. index créé automatiquement par InnoDB pour une clé étrangère) suffit."""
+    index_query = text(
+        """
+        SELECT INDEX_NAME, COLUMN_NAME
+        FROM INFORMATION_SCHEMA.STATISTICS
+        WHERE TABLE_SCHEMA = :db
+          AND TABLE_NAME = :table
+        ORDER BY INDEX_NAME, SEQ_IN_INDEX
+        """
+    )
+
+    with engine.begin() as conn:
+        for table, indexes in FILTER_INDEXES.items():
+            existing: dict[str, list[str]] = {}
+            for index_name, column_name in conn.execute(index_query, {"db": DB_NAME, "table": table}):
+                existing.setdefault(index_name, []).append(column_name)
+            for index_name, columns in indexes.items():
+                if index_name in existing:
+                    continue
+                if any(tuple(cols[: len(columns)]) == columns for cols in existing.values()):
+                    continue
+                conn.execute(text(f"CREATE INDEX {index_name} ON {table} ({', '.join(columns)})"))
@@ -0,0 +1,295 @@
+import os
+
+from sqlalchemy import bindparam, event, func, or_, select, update
+from sqlalchemy.orm import attributes
+
+from app.database import engine
+from app.models.annee_scolaire import AnneeScolaire
+from app.models.correspondant import Correspondant
+from app.models.scolarite import Scolarite
+from app.services.reference_data_service import bump_reference_versions, correspondants_ref
+
+REFERENT_BACKFILL_BATCH_SIZE = int(os.getenv("REFERENT_BACKFILL_BATCH_SIZE", "1000"))
+
+
+def start_year_from_periode(periode: str | None) -> int | None:
+    """Année de début d'une période « 2023/2024 » ou « 2023-2024 » (None si illisible)."""
+    if not periode:
+        return None
+    first = periode.replace("-", "/").split("/", 1)[0]
+    digits = "".join(ch for ch in first if ch.isdigit())
+    if len(digits) < 4:
+        return None
+    return int(digits[:4])
+
+
+@event.listens_for(AnneeScolaire, "before_insert")
+@event.listens_for(AnneeScolaire, "before_update")
+def set_annee_scolaire_start_year(mapper, connection, target: AnneeScolaire) -> None:
+    target.start_year = start_year_from_periode(target.periode)
+
+
+@event.listens_for(Scolarite, "before_insert")
+@event.listens_for(Scolarite, "before_update")
+def set_scolarite_start_year(mapper, connection, target: Scolarite) -> None:
+    target.start_year = start_year_from_periode(target.annee_scolaire)
+
+
+def backfill_start_years() -> None:
+    """Calcule start_year des lignes existantes (années scolaires et scolarités historiques)."""
+    sources = (
+        (AnneeScolaire.__table__, "id_annee_scolaire", "periode"),
+        (Scolarite.__table__, "id_scolarite", "annee_scolaire"),
+    )
+    with engine.begin() as conn:
+        for table, id_column, source_column in sources:
+            rows = conn.execute(
+                select(table.c[id_column], table.c[source_column], table.c.start_year)
+            ).all()
+            changes = [
+                {"b_id": row_id, "b_start_year": start_year}
+                for row_id, source, current in rows
+                if (start_year := start_year_from_periode(source)) != current
+            ]
+            if changes:
+                conn.execute(
+                    update(table)
+                    .where(table.c[id_column] == bindparam("b_id"))
+                    .values(start_year=bindparam("b_start_year")),
+                    changes,
+                )
+            print(f"[start-year] {table.name} : {len(changes)} ligne(s) mise(s) à jour")
+
+
+# --------------------------------------------------------
+#            RÉFÉRENTS (referent_a / referent_b)
+# --------------------------------------------------------
+
+def correspondant_label(correspondant) -> str:
+    return f"{correspondant.prenom} {correspondant.nom}".strip()
+
+
+def referent_key(value: str | None) -> str | None:
+    """Clé de comparaison d'un nom de référent : blancs réduits à un espace, casse repliée.
+
+    Seule règle de normalisation : nom_complet_norm (écriture), CorrespondantIndex
+    et resolve_referent_id (lecture) passent tous par elle.
+    """
+    key = " ".join(str(value).split()).casefold() if value else ""
+    return key or None
+
+
+@event.listens_for(Correspondant, "before_insert")
+@event.listens_for(Correspondant, "before_update")
+def set_correspondant_name_key(mapper, connection, target: Correspondant) -> None:
+    target.nom_complet_norm = referent_key(correspondant_label(target))
+
+
+def backfill_correspondant_name_keys() -> int:
+    """Recalcule nom_complet_norm des correspondants existants; retourne le nombre de lignes modifiées."""
+    table = Correspondant.__table__
+    with engine.begin() as conn:
+        rows = conn.execute(
+            select(table.c.id_correspondant, table.c.prenom, table.c.nom, table.c.nom_complet_norm)
+        ).all()
+        changes = [
+            {"b_id": row.id_correspondant, "b_key": key}
+            for row in rows
+            if (key := referent_key(correspondant_label(row))) != row.nom_complet_norm
+        ]
+        if changes:
+            conn.execute(
+                update(table)
+                .where(table.c.id_correspondant == bindparam("b_id"))
+                .values(nom_complet_norm=bindparam("b_key")),
+                changes,
+            )
+            bump_reference_versions(conn, [table.name])
+    print(f"[correspondant-keys] {len(changes)} ligne(s) mise(s) à jour")
+    return len(changes)
+
+
+class CorrespondantIndex:
+    """Résolution des référents en O(1) : par id, ou par « Prénom Nom » (texte libre historique)."""
+
+    def __init__(self, correspondants):
+        self.by_id = {c.id_correspondant: c for c in correspondants}
+        self.by_name: dict[str, int] = {}
+        for c in correspondants:
+            key = referent_key(correspondant_label(c))
+            # Plus petit id en cas d'homonymes, quel que soit l'ordre reçu (comme resolve_referent_id)
+            if key is not None:
+                self.by_name[key] = min(self.by_name.get(key, c.id_correspondant), c.id_correspondant)
+
+    def resolve_id(self, value: str | None) -> int | None:
+        """Id du correspondant désigné par un texte de référent (None si inconnu)."""
+        if not value:
+            return None
+        value_str = str(value).strip()
+        if value_str.isdigit():
+            return int(value_str) if int(value_str) in self.by_id else None
+        return self.by_name.get(referent_key(value_str))
+
+    def label(self, value: str | None, referent_id: int | None = None) -> str | None:
+        """Libellé d'un référent : correspondant lié, sinon texte libre tel quel."""
+        correspondant = self.by_id.get(referent_id) if referent_id is not None else None
+        if correspondant is None and value and str(value).strip().isdigit():
+            correspondant = self.by_id.get(int(str(value).strip()))
+        if correspondant is not None:
+            return correspondant_label(correspondant)
+        if not value:
+            return None
+        return str(value).strip()
+
+
+def correspondant_index() -> CorrespondantIndex:
+    return CorrespondantIndex(correspondants_ref.rows())
+
+
+def resolve_referent_id(connection, value: str | None) -> int | None:
+    """Id du correspondant désigné par un texte de référent (None si inconnu).
+
+    Une lecture indexée (clé primaire ou nom_complet_norm) sur la connexion donnée :
+    voit les correspondants créés dans la même transaction.
+    """
+    value_str = str(value).strip() if value else ""
+    if not value_str:
+        return None
+    if value_str.isdigit():
+        return connection.execute(
+            select(Correspondant.id_correspondant).where(Correspondant.id_correspondant == int(value_str))
+        ).scalar()
+    key = referent_key(value_str)
+    rows = connection.execute(
+        select(Correspondant.id_correspondant, Correspondant.nom_complet_norm)
+        .where(Correspondant.nom_complet_norm == key)
+        .order_by(Correspondant.id_correspondant)
+    ).all()
+    # La collation MySQL (insensible aux accents) peut renvoyer des clés voisines :
+    # seule l'égalité exacte de la clé compte, le premier créé en cas d'homonymes.
+    return next((row_id for row_id, row_key in rows if row_key == key), None)
+
+
+@event.listens_for(Scolarite, "before_insert")
+@event.listens_for(Scolarite, "before_update")
+def set_scolarite_referent_ids(mapper, connection, target: Scolarite) -> None:
+    """id_referent_a/b suivent referent_a/b saisis (formulaires, API), sauf s'ils sont fixés explicitement."""
+    for text_key, id_key in (("referent_a", "id_referent_a"), ("referent_b", "id_referent_b")):
+        text_changed = attributes.get_history(target, text_key).has_changes()
+        id_changed = attributes.get_history(target, id_key).has_changes()
+        if not text_changed or id_changed:
+            continue
+        setattr(target, id_key, resolve_referent_id(connection, getattr(target, text_key)))
+
+
+def backfill_scolarite_referents(batch_size: int | None = None) -> tuple[int, int]:
+    """Résout referent_a/b des lignes existantes en id_referent_a/b, par lots ordonnés par id.
+
+    Seules les lignes dont un texte est renseigné sans id sont lues; un texte qui ne
+    désigne aucun correspondant reste tel quel (affiché comme texte libre).
+    Retourne (lignes lues, lignes modifiées).
+    """
+    batch_size = batch_size or REFERENT_BACKFILL_BATCH_SIZE
+    table = Scolarite.__table__
+    with engine.connect() as conn:
+        index = CorrespondantIndex(
+            conn.execute(
+                select(Correspondant.id_correspondant, Correspondant.nom, Correspondant.prenom)
+                .order_by(Correspondant.id_correspondant)
+            ).all()
+        )
+    pending = or_(
+        (table.c.id_referent_a.is_(None)) & (table.c.referent_a.isnot(None)),
+        (table.c.id_referent_b.is_(None)) & (table.c.referent_b.isnot(None)),
+    )
+    after_id = 0
+    scanned = 0
+    updated = 0
+    while True:
+        with engine.begin() as conn:
+            rows = conn.execute(
+                select(
+                    table.c.id_scolarite,
+                    table.c.referent_a,
+                    table.c.referent_b,
+                    table.c.id_referent_a,
+                    table.c.id_referent_b,
+                )
+                .where(pending, table.c.id_scolarite > after_id)
+                .order_by(table.c.id_scolarite)
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                break
+            changes = []
+            for row_id, referent_a, referent_b, id_referent_a, id_referent_b in rows:
+                new_a = id_referent_a if id_referent_a is not None else index.resolve_id(referent_a)
+                new_b = id_referent_b if id_referent_b is not None else index.resolve_id(referent_b)
+                if (new_a, new_b) != (id_referent_a, id_referent_b):
+                    changes.append({"b_id": row_id, "b_referent_a": new_a, "b_referent_b": new_b})
+            if changes:
+                conn.execute(
+                    update(table)
+                    .where(table.c.id_scolarite == bindparam("b_id"))
+                    .values(id_referent_a=bindparam("b_referent_a"), id_referent_b=bindparam("b_referent_b")),
+                    changes,
+                )
+        after_id = rows[-1][0]
+        scanned += len(rows)
+        updated += len(changes)
+        print(f"[referent-backfill] lot jusqu'à id={after_id} : {len(changes)} modifiée(s)")
+    return scanned, updated
+
+
+# Période affichée d'une scolarité : année scolaire référencée, sinon texte libre historique
+SCOLARITE_PERIODE = func.coalesce(func.nullif(AnneeScolaire.periode, ""), Scolarite.annee_scolaire)
+
+
+def scolarite_start_year():
+    """Année de début d'une scolarité : celle de l'année scolaire liée, sinon celle du texte libre.
+
+    Suppose une jointure externe vers AnneeScolaire.
+    """
+    return func.coalesce(AnneeScolaire.start_year, Scolarite.start_year)
+
+
+def scolarite_sort_key(record: Scolarite) -> tuple[int, int]:
+    """Même ordre que latest_scolarite_view, pour une scolarité déjà chargée (annee_scolaire_ref)."""
+    start_year = record.annee_scolaire_ref.start_year if record.annee_scolaire_ref else None
+    if start_year is None:
+        start_year = record.start_year
+    return (start_year if start_year is not None else -1, record.id_scolarite or 0)
+
+
+def latest_scolarite_view(filleule_ids: list[int] | None = None):
+    """Dernière scolarité de chaque filleule (id_filleule, id_scolarite), en une requête.
+
+    Définition unique pour toutes les pages et statistiques : année de début la
+    plus récente, puis id_scolarite le plus grand. Avec filleule_ids, le calcul
+    est restreint à ces filleules avant le classement.
+    """
+    ranked = (
+        select(
+            Scolarite.id_filleule,
+            Scolarite.id_scolarite,
+            func.row_number()
+            .over(
+                partition_by=Scolarite.id_filleule,
+                order_by=(
+                    func.coalesce(scolarite_start_year(), -1).desc(),
+                    Scolarite.id_scolarite.desc(),
+                ),
+            )
+            .label("rang"),
+        )
+        .outerjoin(AnneeScolaire, AnneeScolaire.id_annee_scolaire == Scolarite.id_annee_scolaire)
+        .where(Scolarite.id_filleule.isnot(None))
+    )
+    if filleule_ids is not None:
+        ranked = ranked.where(Scolarite.id_filleule.in_(filleule_ids))
+    ranked = ranked.subquery("scolarites_classees")
+    return (
+        select(ranked.c.id_filleule, ranked.c.id_scolarite)
+        .where(ranked.c.rang == 1)
+        .subquery("derniere_scolarite")
+    )
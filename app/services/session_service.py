@@ -0,0 +1,136 @@
+import asyncio
+import os
+import threading
+import time
+
+from sqlalchemy import text
+
+from app.database import engine
+from app.models.user import User
+from app.security import SESSION_TOKEN_EXPIRE_MINUTES, create_session_token, decode_session_token
+from app.services.user_cache_service import CachedUser, get_user_with_roles, invalidate_user
+
+SESSION_COOKIE_NAME = "session"
+SESSION_COOKIE_MAX_AGE = SESSION_TOKEN_EXPIRE_MINUTES * 60
+SESSION_VERSION_REFRESH_SECONDS = float(os.getenv("SESSION_VERSION_REFRESH_SECONDS", "5"))
+
+# Rafraîchissement forcé minimal quand un utilisateur inconnu présente un jeton
+# valide (utilisateur créé depuis le dernier rafraîchissement).
+_UNKNOWN_USER_REFRESH_SECONDS = 1.0
+
+_lock = threading.Lock()
+_versions: dict[int, int] = {}
+_last_refresh = 0.0
+_task: asyncio.Task | None = None
+_inflight: asyncio.Future | None = None
+
+
+def refresh_session_versions() -> None:
+    """Recharge la table id -> session_version (une requête pour tous les utilisateurs)."""
+    global _last_refresh
+    try:
+        with engine.connect() as conn:
+            rows = conn.execute(text("SELECT id, session_version FROM users")).fetchall()
+    except Exception as exc:
+        print(f"[session] rafraîchissement des versions impossible: {exc}")
+        with _lock:
+            _last_refresh = time.monotonic()
+        return
+    with _lock:
+        _versions.clear()
+        _versions.update({row[0]: row[1] or 0 for row in rows})
+        _last_refresh = time.monotonic()
+
+
+def _version_status(user_id: int, version: int) -> bool | None:
+    """Lecture seule de la table en mémoire; None si l'utilisateur y est absent."""
+    with _lock:
+        current = _versions.get(user_id)
+    return None if current is None else current == version
+
+
+async def _refresh_for_unknown_user() -> None:
+    """Rafraîchissement à la demande (hors boucle d'événements), partagé par les requêtes simultanées."""
+    global _inflight
+    if _inflight is None or _inflight.done():
+        with _lock:
+            due = time.monotonic() - _last_refresh > _UNKNOWN_USER_REFRESH_SECONDS
+        if not due:
+            return
+        _inflight = asyncio.ensure_future(asyncio.to_thread(refresh_session_versions))
+    await asyncio.shield(_inflight)
+
+
+async def _refresh_loop() -> None:
+    while True:
+        await asyncio.to_thread(refresh_session_versions)
+        await asyncio.sleep(SESSION_VERSION_REFRESH_SECONDS)
+
+
+async def start_session_version_refresher() -> None:
+    global _task
+    if _task is not None:
+        return
+    _task = asyncio.create_task(_refresh_loop())
+
+
+async def stop_session_version_refresher() -> None:
+    global _task
+    task = _task
+    _task = None
+    if task is not None:
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+
+def issue_session_token(user: User) -> str:
+    _, roles = get_user_with_roles(user.id)
+    version = user.session_version or 0
+    with _lock:
+        _versions[user.id] = version
+    return create_session_token(user.id, user.email, user.fullname, set(roles), version)
+
+
+async def resolve_session_token(token: str | None) -> tuple[CachedUser | None, set[str]]:
+    """Vérifie le jeton de session contre la table des versions en mémoire, sans SQL.
+
+    La table est rafraîchie en tâche de fond (start_session_version_refresher);
+    un utilisateur absent (créé depuis, sur un autre worker) déclenche au plus un
+    rafraîchissement par seconde, exécuté dans un thread.
+    """
+    if not token:
+        return None, set()
+    payload = decode_session_token(token)
+    if not payload:
+        return None, set()
+    try:
+        user_id = int(payload["sub"])
+        version = int(payload.get("ver", 0))
+    except (KeyError, TypeError, ValueError):
+        return None, set()
+    current = _version_status(user_id, version)
+    if current is None:
+        await _refresh_for_unknown_user()
+        current = _version_status(user_id, version)
+    if not current:
+        return None, set()
+    user = CachedUser(id=user_id, email=payload.get("email") or "", fullname=payload.get("name"))
+    return user, set(payload.get("roles") or [])
+
+
+def revoke_user_sessions(user: User) -> None:
+    """Invalide les jetons existants; à appeler avant le commit de la modification."""
+    user.session_version = (user.session_version or 0) + 1
+
+
+def mark_sessions_revoked(user_id: int, version: int | None = None) -> None:
+    """Applique immédiatement la révocation dans ce processus (après commit)."""
+    with _lock:
+        if version is None:
+            _versions.pop(user_id, None)
+        else:
+            _versions[user_id] = version
+    invalidate_user(user_id)
@@ -1,11 +1,16 @@
+import asyncio
 import json
+import os
 import re
+import time
 from pathlib import Path
+from typing import Awaitable, Callable
 
-from sqlalchemy import and_, func, or_
-from sqlalchemy.orm import Session, aliased
+from sqlalchemy import and_, func, or_, select
 
-from app.database import SessionLocal
+from app.database import AsyncSessionLocal
+from app.services.cache_service import SnapshotCache
+from app.services.scolarites_service import latest_scolarite_view
 from app.models.document import Document
 from app.models.correspondant import Correspondant
 from app.models.etablissement import Etablissement
@@ -20,6 +25,7 @@ DATA_DIR = Path(__file__).resolve().parent.parent / "data"
 CITY_COORDS_PATH = DATA_DIR / "city_coords.json"
 ESSAOUIRA_MAP_PATH = DATA_DIR / "essaouira_map.json"
 YEAR_PATTERN = re.compile(r"\d{4}")
+DASHBOARD_TIME_BUDGET_SECONDS = float(os.getenv("DASHBOARD_TIME_BUDGET_SECONDS", "10"))
 
 
 def normalize_city_name(name: str) -> str:
@@ -49,68 +55,91 @@ def get_essaouira_map() -> dict | None:
         return None
 
 
+DASHBOARD_STATS_MODELS = {
+    "filleules": Filleule,
+    "referents": Correspondant,
+    "ecoles": Etablissement,
+    "localites": Localite,
+    "annees_scolaires": AnneeScolaire,
+    "parrains": Parrain,
+    "parrainages": Parrainage,
+    "documents": Document,
+}
+dashboard_stats_cache = SnapshotCache(
+    {model.__table__.name for model in DASHBOARD_STATS_MODELS.values()}
+)
+
+
+def _count_subquery(model, *criteria):
+    query = select(func.count()).select_from(model)
+    if criteria:
+        query = query.where(*criteria)
+    return query.scalar_subquery()
+
+
+def dashboard_stats_query():
+    """Tous les compteurs du tableau de bord en un seul aller-retour."""
+    columns = [_count_subquery(model).label(name) for name, model in DASHBOARD_STATS_MODELS.items()]
+    columns.append(
+        _count_subquery(
+            Filleule,
+            Filleule.couverture_sante_norm > "",
+            Filleule.couverture_sante_norm != "none",
+        ).label("couverture_sante")
+    )
+    return select(*columns)
+
+
 async def get_dashboard_stats():
-    db: Session = SessionLocal()
-
-    stats = {
-        "filleules": db.query(Filleule).count(),
-        "referents": db.query(Correspondant).count(),
-        "ecoles": db.query(Etablissement).count(),
-        "localites": db.query(Localite).count(),
-        "annees_scolaires": db.query(AnneeScolaire).count(),
-        "parrains": db.query(Parrain).count(),
-        "parrainages": db.query(Parrainage).count(),
-        "documents": db.query(Document).count(),
-        "couverture_sante": (
-            db.query(Filleule)
-            .filter(Filleule.couverture_sante.isnot(None))
-            .filter(func.trim(Filleule.couverture_sante) != "")
-            .filter(func.lower(func.trim(Filleule.couverture_sante)) != "none")
-            .count()
-        ),
-    }
+    cached = dashboard_stats_cache.get()
+    if cached is not None:
+        return dict(cached)
 
-    db.close()
-    return stats
+    version = dashboard_stats_cache.version()
+    async with AsyncSessionLocal() as db:
+        row = (await db.execute(dashboard_stats_query())).one()
+
+    stats = dict(row._mapping)
+    dashboard_stats_cache.set(stats, version)
+    return dict(stats)
 
 
 async def get_annees_scolaires():
-    db: Session = SessionLocal()
-    rows = (
-        db.query(
-            AnneeScolaire.id_annee_scolaire,
-            AnneeScolaire.periode,
-            func.count(Scolarite.id_scolarite),
-        )
-        .outerjoin(
-            Scolarite,
-            or_(
-                Scolarite.id_annee_scolaire == AnneeScolaire.id_annee_scolaire,
-                and_(
-                    Scolarite.id_annee_scolaire.is_(None),
-                    Scolarite.annee_scolaire == AnneeScolaire.periode,
-                ),
-            ),
-        )
-        .group_by(AnneeScolaire.id_annee_scolaire, AnneeScolaire.periode)
-        .order_by(AnneeScolaire.periode.desc())
-        .all()
-    )
-    db.close()
+    async with AsyncSessionLocal() as db:
+        rows = (
+            await db.execute(
+                select(
+                    AnneeScolaire.id_annee_scolaire,
+                    AnneeScolaire.periode,
+                    func.count(Scolarite.id_scolarite),
+                )
+                .outerjoin(
+                    Scolarite,
+                    or_(
+                        Scolarite.id_annee_scolaire == AnneeScolaire.id_annee_scolaire,
+                        and_(
+                            Scolarite.id_annee_scolaire.is_(None),
+                            Scolarite.annee_scolaire == AnneeScolaire.periode,
+                        ),
+                    ),
+                )
+                .group_by(AnneeScolaire.id_annee_scolaire, AnneeScolaire.periode)
+                .order_by(AnneeScolaire.periode.desc())
+            )
+        ).all()
     return [{"id": row[0], "periode": row[1], "count": row[2]} for row in rows]
 
 
 async def get_city_origin_stats():
-    db: Session = SessionLocal()
-    rows = (
-        db.query(Filleule.id_filleule, Filleule.prenom, Filleule.nom, Filleule.ville)
-        .filter(Filleule.ville.isnot(None))
-        .filter(func.trim(Filleule.ville) != "")
-        .all()
-    )
+    async with AsyncSessionLocal() as db:
+        rows = (
+            await db.execute(
+                select(Filleule.id_filleule, Filleule.prenom, Filleule.nom, Filleule.ville)
+                .where(Filleule.ville_norm.isnot(None))
+            )
+        ).all()
 
-    localites = db.query(Localite).all()
-    db.close()
+        localites = (await db.execute(select(Localite))).scalars().all()
 
     coords = {l.nom: {"lat": l.latitude, "lon": l.longitude} for l in localites}
     localite_map = {}
@@ -171,15 +200,15 @@ def _extract_year(value: str) -> int | None:
 
 
 async def get_filleules_rentree_stats():
-    db: Session = SessionLocal()
-    rows = (
-        db.query(Filleule.annee_rentree, func.count(Filleule.id_filleule))
-        .filter(Filleule.annee_rentree.isnot(None))
-        .filter(func.trim(Filleule.annee_rentree) != "")
-        .group_by(Filleule.annee_rentree)
-        .all()
-    )
-    db.close()
+    async with AsyncSessionLocal() as db:
+        rows = (
+            await db.execute(
+                select(Filleule.annee_rentree, func.count(Filleule.id_filleule))
+                .where(Filleule.annee_rentree.isnot(None))
+                .where(func.trim(Filleule.annee_rentree) != "")
+                .group_by(Filleule.annee_rentree)
+            )
+        ).all()
 
     data = []
     for annee, count in rows:
@@ -192,59 +221,61 @@ async def get_filleules_rentree_stats():
     max_count = max((item["count"] for item in data), default=0)
     return {"data": data, "max_count": max_count}
 
-async def get_chart_data():
-    db = SessionLocal()
-
-    # 1. Nombre de filleuls par établissement
-    filleuls_par_etab = (
-        db.query(Etablissement.nom, func.count(Filleule.id_filleule))
-        .join(Filleule, Filleule.etablissement_id == Etablissement.id_etablissement)
-        .group_by(Etablissement.nom)
-        .all()
-    )
-
-    # 2. Nombre de parrainages par année
-    parrainages_par_annee = (
-        db.query(func.extract('year', Parrainage.date_debut).label("annee"),
-                 func.count(Parrainage.id_parrainage))
-        .filter(Parrainage.date_debut.isnot(None))
-        .group_by("annee")
-        .order_by("annee")
-        .all()
-    )
 
-    # Liste des établissements
-    etablissements = db.query(Etablissement.nom, Etablissement.id_etablissement).all()
+async def get_niveau_stats(db) -> list:
+    latest_scolarite = latest_scolarite_view()
+    return (
+        await db.execute(
+            select(Scolarite.niveau, func.count(Scolarite.id_scolarite))
+            .join(latest_scolarite, Scolarite.id_scolarite == latest_scolarite.c.id_scolarite)
+            .group_by(Scolarite.niveau)
+        )
+    ).all()
 
-    # Liste des années présentes dans les parrainages
-    annees = (
-        db.query(func.extract('year', Parrainage.date_debut))
-        .filter(Parrainage.date_debut.isnot(None))
-        .distinct()
-        .all()
-    )
-    annees = [int(a[0]) for a in annees if a[0] is not None]
 
-    # 3. Répartition des filleuls par niveau scolaire
-    latest_scolarite = (
-        db.query(Scolarite.id_filleule, func.max(Scolarite.id_scolarite).label("max_id"))
-        .group_by(Scolarite.id_filleule)
-        .subquery()
-    )
-    ScolariteLatest = aliased(Scolarite)
-    niveaux = (
-        db.query(ScolariteLatest.niveau, func.count(ScolariteLatest.id_scolarite))
-        .join(latest_scolarite, ScolariteLatest.id_scolarite == latest_scolarite.c.max_id)
-        .group_by(ScolariteLatest.niveau)
-        .all()
-    )
+async def get_chart_data():
+    async with AsyncSessionLocal() as db:
+        # 1. Nombre de filleuls par établissement
+        filleuls_par_etab = (
+            await db.execute(
+                select(Etablissement.nom, func.count(Filleule.id_filleule))
+                .join(Filleule, Filleule.etablissement_id == Etablissement.id_etablissement)
+                .group_by(Etablissement.nom)
+            )
+        ).all()
+
+        # 2. Nombre de parrainages par année
+        annee_expr = func.extract("year", Parrainage.date_debut).label("annee")
+        parrainages_par_annee = (
+            await db.execute(
+                select(annee_expr, func.count(Parrainage.id_parrainage))
+                .where(Parrainage.date_debut.isnot(None))
+                .group_by(annee_expr)
+                .order_by(annee_expr)
+            )
+        ).all()
+
+        # Liste des établissements
+        etablissements = (
+            await db.execute(select(Etablissement.nom, Etablissement.id_etablissement))
+        ).all()
+
+        # Liste des années présentes dans les parrainages
+        annees = (
+            await db.execute(
+                select(func.extract("year", Parrainage.date_debut))
+                .where(Parrainage.date_debut.isnot(None))
+                .distinct()
+            )
+        ).all()
+        annees = [int(a[0]) for a in annees if a[0] is not None]
+
+        # 3. Répartition des filleuls par niveau scolaire
+        niveaux = await get_niveau_stats(db)
 
     niveaux_labels = [n[0] for n in niveaux]
     niveaux_data = [n[1] for n in niveaux]
 
-
-    db.close()
-
     return {
         "filleuls_par_etab": filleuls_par_etab,
         "parrainages_par_annee": parrainages_par_annee,
@@ -256,23 +287,59 @@ async def get_chart_data():
 
 
 async def get_filiere_stats():
-    db: Session = SessionLocal()
+    async with AsyncSessionLocal() as db:
+        latest_scolarite = latest_scolarite_view()
+        rows = (
+            await db.execute(
+                select(Scolarite.filiere, func.count(Scolarite.id_scolarite))
+                .join(latest_scolarite, Scolarite.id_scolarite == latest_scolarite.c.id_scolarite)
+                .where(Scolarite.filiere.isnot(None))
+                .where(func.trim(Scolarite.filiere) != "")
+                .group_by(Scolarite.filiere)
+                .order_by(func.count(Scolarite.id_scolarite).desc(), Scolarite.filiere)
+            )
+        ).all()
 
-    latest_scolarite = (
-        db.query(Scolarite.id_filleule, func.max(Scolarite.id_scolarite).label("max_id"))
-        .group_by(Scolarite.id_filleule)
-        .subquery()
-    )
-    ScolariteLatest = aliased(Scolarite)
-    rows = (
-        db.query(ScolariteLatest.filiere, func.count(ScolariteLatest.id_scolarite))
-        .join(latest_scolarite, ScolariteLatest.id_scolarite == latest_scolarite.c.max_id)
-        .filter(ScolariteLatest.filiere.isnot(None))
-        .filter(func.trim(ScolariteLatest.filiere) != "")
-        .group_by(ScolariteLatest.filiere)
-        .order_by(func.count(ScolariteLatest.id_scolarite).desc(), ScolariteLatest.filiere)
-        .all()
+    return [{"name": filiere, "count": count} for filiere, count in rows]
+
+
+async def run_sections(
+    sections: dict[str, Callable[[], Awaitable]],
+    budget: float | None = None,
+) -> tuple[dict, dict[str, float]]:
+    """Exécute les sections en parallèle avec un budget de temps commun.
+
+    Retourne (résultats, durées en ms). Une section en échec ou hors budget est
+    absente des résultats; l'appelant garde alors sa valeur par défaut.
+    """
+    timings: dict[str, float] = {}
+
+    async def timed(name: str, factory: Callable[[], Awaitable]):
+        start = time.perf_counter()
+        try:
+            return await factory()
+        finally:
+            timings[name] = round((time.perf_counter() - start) * 1000, 1)
+
+    tasks = {asyncio.create_task(timed(name, factory)): name for name, factory in sections.items()}
+    done, pending = await asyncio.wait(
+        tasks,
+        timeout=DASHBOARD_TIME_BUDGET_SECONDS if budget is None else budget,
     )
+    for task in pending:
+        task.cancel()
+    if pending:
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    results = {}
+    for task in done:
+        name = tasks[task]
+        if task.exception() is not None:
+            print(f"[dashboard] section {name} en échec: {task.exception()}")
+            continue
+        results[name] = task.result()
+    return results, timings
 
-    db.close()
-    return [{"name": filiere, "count": count} for filiere, count in rows]
+
+def format_server_timing(timings: dict[str, float]) -> str:
+    return ", ".join(f"{name};dur={duration}" for name, duration in timings.items())
@@ -0,0 +1,133 @@
+import os
+import threading
+import time
+from dataclasses import dataclass
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session, selectinload
+
+from app.database import DB_NAME, SessionLocal, engine
+from app.models.user import User
+
+USER_CACHE_TTL_SECONDS = float(os.getenv("USER_CACHE_TTL_SECONDS", "60"))
+USER_CACHE_MAX_ENTRIES = int(os.getenv("USER_CACHE_MAX_ENTRIES", "1000"))
+
+
+@dataclass(frozen=True)
+class CachedUser:
+    """Instantané détaché de l'utilisateur connecté (pas de lazy-load possible)."""
+
+    id: int
+    email: str
+    fullname: str | None
+
+
+_lock = threading.Lock()
+_entries: dict[int, tuple[float, CachedUser | None, frozenset[str]]] = {}
+_stats = {"hits": 0, "misses": 0, "invalidations": 0}
+_legacy_role_column: bool | None = None
+
+
+def detect_legacy_role_column() -> bool:
+    """Résout une seule fois (au démarrage) la présence de la colonne users.user_role."""
+    global _legacy_role_column
+    query = text(
+        """
+        SELECT COUNT(*)
+        FROM INFORMATION_SCHEMA.COLUMNS
+        WHERE TABLE_SCHEMA = :db
+          AND TABLE_NAME = 'users'
+          AND COLUMN_NAME = 'user_role'
+        """
+    )
+    try:
+        with engine.connect() as conn:
+            _legacy_role_column = bool(conn.execute(query, {"db": DB_NAME}).scalar())
+    except Exception:
+        _legacy_role_column = False
+    return _legacy_role_column
+
+
+def _load_legacy_role_name(db: Session, user_id: int) -> str | None:
+    if _legacy_role_column is None:
+        detect_legacy_role_column()
+    if not _legacy_role_column:
+        return None
+
+    return db.execute(
+        text(
+            """
+            SELECT r.name
+            FROM users u
+            JOIN roles r ON r.id = u.user_role
+            WHERE u.id = :id
+            """
+        ),
+        {"id": user_id},
+    ).scalar()
+
+
+def _load_from_db(user_id: int) -> tuple[CachedUser | None, frozenset[str]]:
+    db: Session = SessionLocal()
+    try:
+        user = db.query(User).options(selectinload(User.roles)).filter(User.id == user_id).first()
+        if not user:
+            return None, frozenset()
+        roles = {role.name for role in user.roles}
+        if not roles:
+            try:
+                legacy_name = _load_legacy_role_name(db, user.id)
+            except Exception:
+                legacy_name = None
+            if legacy_name:
+                roles = {legacy_name}
+        return CachedUser(id=user.id, email=user.email, fullname=user.fullname), frozenset(roles)
+    finally:
+        db.close()
+
+
+def get_user_with_roles(user_id: int) -> tuple[CachedUser | None, frozenset[str]]:
+    now = time.monotonic()
+    with _lock:
+        entry = _entries.get(user_id)
+        if entry and entry[0] > now:
+            _stats["hits"] += 1
+            return entry[1], entry[2]
+        _stats["misses"] += 1
+
+    user, roles = _load_from_db(user_id)
+
+    with _lock:
+        if len(_entries) >= USER_CACHE_MAX_ENTRIES and user_id not in _entries:
+            # Purge des entrées expirées, puis de la plus ancienne si nécessaire
+            for key in [key for key, value in _entries.items() if value[0] <= now]:
+                del _entries[key]
+            if len(_entries) >= USER_CACHE_MAX_ENTRIES:
+                del _entries[min(_entries, key=lambda key: _entries[key][0])]
+        _entries[user_id] = (now + USER_CACHE_TTL_SECONDS, user, roles)
+    return user, roles
+
+
+def invalidate_user(user_id: int | None = None) -> None:
+    """Invalide un utilisateur (ou tout le cache si user_id est None)."""
+    with _lock:
+        if user_id is None:
+            _entries.clear()
+        else:
+            _entries.pop(user_id, None)
+        _stats["invalidations"] += 1
+
+
+def get_user_cache_stats() -> dict:
+    with _lock:
+        hits = _stats["hits"]
+        misses = _stats["misses"]
+        total = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "invalidations": _stats["invalidations"],
+            "hit_rate": round(hits / total, 4) if total else None,
+            "entries": len(_entries),
+            "ttl_seconds": USER_CACHE_TTL_SECONDS,
+        }
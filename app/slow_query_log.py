@@ -0,0 +1,160 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+
+from sqlalchemy import event
+
+from app.database import BASE_DIR
+from app.sql_instrumentation import get_current_route
+
+# Désactivé par défaut : sans la variable, aucun écouteur n'est installé
+SLOW_QUERY_LOG = os.getenv("SLOW_QUERY_LOG", "false").lower() in {"1", "true", "yes"}
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", "200"))
+SLOW_QUERY_BUFFER_SIZE = int(os.getenv("SLOW_QUERY_BUFFER_SIZE", "500"))
+SLOW_QUERY_LOG_PATH = Path(os.getenv("SLOW_QUERY_LOG_PATH", str(BASE_DIR / "logs" / "slow_queries.jsonl")))
+SQL_MAX_LENGTH = 4000
+
+_STRING_LITERAL = re.compile(r"'(?:[^'\\]|\\.|'')*'")
+_NUMBER_LITERAL = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*(?:%s|\?|%\(\w+\)s|:\w+)(?:\s*,\s*(?:%s|\?|%\(\w+\)s|:\w+))+\s*\)")
+
+_lock = threading.Lock()
+_entries: deque[dict] = deque(maxlen=SLOW_QUERY_BUFFER_SIZE)
+
+
+def normalize_sql(statement: str) -> str:
+    """Forme canonique : littéraux remplacés par ?, listes IN repliées, espaces compactés."""
+    normalized = _STRING_LITERAL.sub("?", statement)
+    normalized = _NUMBER_LITERAL.sub("?", normalized)
+    normalized = _PLACEHOLDER_LIST.sub("(...)", normalized)
+    return " ".join(normalized.split())
+
+
+def fingerprint_sql(normalized: str) -> str:
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()[:12]
+
+
+def _parameters_shape(parameters, executemany: bool) -> str:
+    if executemany:
+        return f"executemany x{len(parameters)}"
+    if isinstance(parameters, dict):
+        return ", ".join(f"{key}:{type(value).__name__}" for key, value in parameters.items())
+    if isinstance(parameters, (list, tuple)):
+        types = [type(value).__name__ for value in parameters]
+        if len(types) > 10:
+            return f"{len(types)} paramètres ({', '.join(sorted(set(types)))})"
+        return ", ".join(types)
+    return ""
+
+
+def _explain(conn, statement: str, parameters, context) -> list[dict] | None:
+    """Plan d'exécution via un curseur DBAPI séparé (aucun événement SQLAlchemy déclenché)."""
+    if not statement.lstrip().upper().startswith(("SELECT", "WITH")):
+        return None
+    # Un résultat non bufferisé occupe encore la connexion
+    if context.execution_options.get("stream_results") or context.execution_options.get("yield_per"):
+        return None
+    prefix = "EXPLAIN QUERY PLAN " if conn.dialect.name == "sqlite" else "EXPLAIN "
+    try:
+        cursor = conn.connection.cursor()
+        try:
+            cursor.execute(prefix + statement, parameters)
+            columns = [column[0] for column in cursor.description or ()]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+        finally:
+            cursor.close()
+    except Exception as exc:
+        return [{"erreur": str(exc)}]
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._slow_query_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = getattr(context, "_slow_query_start", None)
+    if start is None:
+        return
+    duration_ms = (time.perf_counter() - start) * 1000
+    if duration_ms < SLOW_QUERY_THRESHOLD_MS:
+        return
+    try:
+        normalized = normalize_sql(statement)
+        entry = {
+            "at": datetime.now().isoformat(timespec="seconds"),
+            "fingerprint": fingerprint_sql(normalized),
+            "sql": normalized[:SQL_MAX_LENGTH],
+            "parameters": _parameters_shape(parameters, executemany),
+            "route": get_current_route(),
+            "duration_ms": round(duration_ms, 1),
+            "explain": None if executemany else _explain(conn, statement, parameters, context),
+        }
+        record_slow_query(entry)
+    except Exception as exc:
+        print(f"[slow-query] enregistrement impossible: {exc}")
+
+
+def record_slow_query(entry: dict) -> None:
+    line = json.dumps(entry, ensure_ascii=False, default=str)
+    with _lock:
+        _entries.append(entry)
+        try:
+            SLOW_QUERY_LOG_PATH.parent.mkdir(parents=True, exist_ok=True)
+            with SLOW_QUERY_LOG_PATH.open("a", encoding="utf-8") as file_obj:
+                file_obj.write(line + "\n")
+        except OSError as exc:
+            print(f"[slow-query] écriture de {SLOW_QUERY_LOG_PATH} impossible: {exc}")
+
+
+def install_slow_query_log(*engines) -> None:
+    for engine in engines:
+        sync_engine = getattr(engine, "sync_engine", engine)
+        event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def get_slow_query_groups() -> list[dict]:
+    """Requêtes lentes du tampon regroupées par empreinte, les plus coûteuses d'abord."""
+    with _lock:
+        entries = list(_entries)
+
+    groups: dict[str, dict] = {}
+    for entry in entries:
+        group = groups.setdefault(
+            entry["fingerprint"],
+            {
+                "fingerprint": entry["fingerprint"],
+                "sql": entry["sql"],
+                "count": 0,
+                "total_ms": 0.0,
+                "max_ms": 0.0,
+                "routes": {},
+            },
+        )
+        group["count"] += 1
+        group["total_ms"] += entry["duration_ms"]
+        route = entry["route"] or "(hors requête HTTP)"
+        group["routes"][route] = group["routes"].get(route, 0) + 1
+        if entry["duration_ms"] >= group["max_ms"]:
+            group["max_ms"] = entry["duration_ms"]
+            group["parameters"] = entry["parameters"]
+            group["explain"] = entry["explain"]
+            group["worst_at"] = entry["at"]
+
+    result = sorted(groups.values(), key=lambda item: item["total_ms"], reverse=True)
+    for group in result:
+        group["total_ms"] = round(group["total_ms"], 1)
+        group["avg_ms"] = round(group["total_ms"] / group["count"], 1)
+        group["routes"] = sorted(group["routes"].items(), key=lambda item: item[1], reverse=True)
+    return result
+
+
+def clear_slow_queries() -> None:
+    with _lock:
+        _entries.clear()
@@ -0,0 +1,95 @@
+import os
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+import jinja2
+from sqlalchemy import event
+
+# Désactivé par défaut : sans la variable, aucun écouteur n'est installé (coût nul)
+SQL_INSTRUMENTATION = os.getenv("SQL_INSTRUMENTATION", "false").lower() in {"1", "true", "yes"}
+# Au-delà de ce nombre d'exécutions d'une même requête SQL dans une requête HTTP : N+1 probable
+SQL_N_PLUS_ONE_THRESHOLD = int(os.getenv("SQL_N_PLUS_ONE_THRESHOLD", "10"))
+
+
+class RequestSqlStats:
+    __slots__ = ("queries", "db_ms", "template_ms", "statements")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_ms = 0.0
+        self.template_ms = 0.0
+        self.statements: Counter[str] = Counter()
+
+    def repeated_statements(self, threshold: int | None = None) -> list[tuple[str, int]]:
+        limit = SQL_N_PLUS_ONE_THRESHOLD if threshold is None else threshold
+        return [(statement, count) for statement, count in self.statements.most_common() if count > limit]
+
+
+_current_stats: ContextVar[RequestSqlStats | None] = ContextVar("request_sql_stats", default=None)
+_current_scope: ContextVar[dict | None] = ContextVar("request_scope", default=None)
+
+
+def start_request_stats(scope: dict, collect: bool = True) -> tuple[RequestSqlStats, tuple]:
+    stats = RequestSqlStats()
+    tokens = (_current_stats.set(stats if collect else None), _current_scope.set(scope))
+    return stats, tokens
+
+
+def end_request_stats(tokens: tuple) -> None:
+    stats_token, scope_token = tokens
+    _current_stats.reset(stats_token)
+    _current_scope.reset(scope_token)
+
+
+def get_current_route() -> str | None:
+    """Route de la requête HTTP en cours, sous forme de gabarit (ex. GET /filleules/{filleule_id})."""
+    scope = _current_scope.get()
+    if scope is None:
+        return None
+    # Le routeur complète le scope (clé "route") une fois la route résolue
+    path = getattr(scope.get("route"), "path", None) or scope["path"]
+    return f"{scope['method']} {path}"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_stats.get() is not None:
+        context._sql_timing_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_stats.get()
+    start = getattr(context, "_sql_timing_start", None)
+    if stats is None or start is None:
+        return
+    stats.queries += 1
+    stats.db_ms += (time.perf_counter() - start) * 1000
+    stats.statements[statement] += 1
+
+
+def install_sql_instrumentation(*engines) -> None:
+    """Branche les compteurs sur les moteurs (synchrones ou AsyncEngine) et le rendu Jinja2."""
+    for engine in engines:
+        sync_engine = getattr(engine, "sync_engine", engine)
+        event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    _install_template_timing()
+
+
+def _install_template_timing() -> None:
+    render = jinja2.Template.render
+    if getattr(render, "_sql_instrumented", False):
+        return
+
+    def timed_render(self, *args, **kwargs):
+        stats = _current_stats.get()
+        if stats is None:
+            return render(self, *args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return render(self, *args, **kwargs)
+        finally:
+            stats.template_ms += (time.perf_counter() - start) * 1000
+
+    timed_render._sql_instrumented = True
+    jinja2.Template.render = timed_render
@@ -0,0 +1,26 @@
+"""Normalise la ville des filleules existantes (nom canonique de la localité).
+
+Usage : python -m scripts.backfill_filleule_ville [--after ID] [--batch-size N]
+
+Les nouvelles écritures sont normalisées automatiquement (normalize_filleule_ville);
+ce script sert après un import en SQL brut ou un ajout d'alias de localité.
+Chaque lot est validé séparément : après une interruption, relancer avec
+--after égal au dernier id affiché.
+"""
+import argparse
+
+from app.services.localites_service import backfill_filleule_ville
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--after", type=int, default=0, help="reprendre après cet id de filleule")
+    parser.add_argument("--batch-size", type=int, default=None, help="taille des lots")
+    args = parser.parse_args()
+
+    scanned, updated = backfill_filleule_ville(after_id=args.after, batch_size=args.batch_size)
+    print(f"{scanned} filleule(s) parcourue(s), {updated} ville(s) normalisée(s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,277 @@
+"""Compare le coût mémoire et temps des pages liste : entités ORM contre projections.
+
+Usage : python -m scripts.bench_list_rows [nb_lignes] [répétitions]
+
+Le script crée une base SQLite synthétique (nb_lignes filleules, parrains,
+parrainages, scolarités et documents; 10 000 par défaut) puis, pour chaque
+liste, charge toutes les lignes :
+- « orm » : entités complètes comme le faisaient les routes (relations affichées
+  chargées par joinedload, ou paresseusement quand la route ne les chargeait pas);
+- « tuples » : lignes Row de la requête de projection;
+- « slots » : lignes de app.services.list_rows_service (ce qu'utilisent les routes).
+Chaque mesure inclut la lecture des attributs affichés par le gabarit.
+Le temps est le meilleur de N répétitions; la mémoire est le pic tracemalloc,
+ramené à 10 000 lignes.
+"""
+import gc
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date
+from pathlib import Path
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import joinedload, sessionmaker
+
+from app.database import Base
+from app.models import (  # noqa: F401
+    annee_scolaire,
+    correspondant,
+    document,
+    etablissement,
+    filleule,
+    filleule_summary,
+    localite,
+    parrain,
+    parrainage,
+    reference_version,
+    role,
+    scolarite,
+    suivisocial,
+    tache,
+    typedocument,
+    user,
+    user_connection_log,
+)
+from app.models.annee_scolaire import AnneeScolaire
+from app.models.correspondant import Correspondant
+from app.models.document import Document
+from app.models.etablissement import Etablissement
+from app.models.filleule import Filleule
+from app.models.parrain import Parrain
+from app.models.parrainage import Parrainage
+from app.models.scolarite import Scolarite
+from app.services.filleule_summary_service import refresh_filleule_summaries
+from app.services.list_rows_service import (
+    DocumentListRow,
+    FilleuleListRow,
+    ParrainageListRow,
+    ParrainListRow,
+    ScolariteListRow,
+)
+
+DB_PATH = Path(tempfile.gettempdir()) / "fae_bench_list_rows.db"
+
+engine = create_engine(f"sqlite:///{DB_PATH}")
+SessionLocal = sessionmaker(bind=engine)
+
+
+def seed(count: int) -> None:
+    if DB_PATH.exists():
+        DB_PATH.unlink()
+    Base.metadata.create_all(engine)
+    rng = random.Random(42)
+    with engine.begin() as conn:
+        conn.execute(
+            Correspondant.__table__.insert(),
+            [{"id_correspondant": i, "nom": f"Ref{i}", "prenom": f"Corr{i}"} for i in range(1, 51)],
+        )
+        conn.execute(
+            Etablissement.__table__.insert(),
+            [{"id_etablissement": i, "nom": f"Lycée {i}"} for i in range(1, 201)],
+        )
+        conn.execute(
+            AnneeScolaire.__table__.insert(),
+            [{"id_annee_scolaire": i, "periode": f"{2009 + i}/{2010 + i}"} for i in range(1, 16)],
+        )
+        conn.execute(
+            Filleule.__table__.insert(),
+            [
+                {
+                    "id_filleule": i,
+                    "nom": f"Nom{i % 997}",
+                    "prenom": f"Prenom{i}",
+                    "whatsapp": f"06{i:08d}",
+                    "annee_rentree": str(rng.randint(2005, 2024)),
+                    "village": "Tamanar",
+                    "id_correspondant": rng.choice([None, *range(1, 51)]),
+                }
+                for i in range(1, count + 1)
+            ],
+        )
+        conn.execute(
+            Parrain.__table__.insert(),
+            [
+                {
+                    "id_parrain": i,
+                    "nom": f"Parrain{i}",
+                    "prenom": f"P{i}",
+                    "email": f"p{i}@example.org",
+                    "telephone": "0102030405",
+                    "adresse": "rue " * 10,
+                }
+                for i in range(1, count + 1)
+            ],
+        )
+        conn.execute(
+            Parrainage.__table__.insert(),
+            [
+                {
+                    "id_filleule": rng.randint(1, count),
+                    "id_parrain": rng.randint(1, count),
+                    "date_debut": date(2015, 9, 1),
+                    "statut": "Actif",
+                }
+                for _ in range(count)
+            ],
+        )
+        conn.execute(
+            Scolarite.__table__.insert(),
+            [
+                {
+                    "id_filleule": rng.randint(1, count),
+                    "id_etablissement": rng.randint(1, 200),
+                    "id_annee_scolaire": rng.randint(1, 15),
+                    "niveau": rng.choice(["6e", "5e", "4e", "3e", "2nde"]),
+                    "referent_a": str(rng.randint(1, 50)),
+                    "resultats": "Bien " * 20,
+                }
+                for _ in range(count)
+            ],
+        )
+        conn.execute(
+            Document.__table__.insert(),
+            [
+                {"id_filleule": rng.randint(1, count), "titre": f"Bulletin {i}", "chemin_fichier": "x" * 80}
+                for i in range(count)
+            ],
+        )
+        refresh_filleule_summaries(conn, range(1, count + 1))
+
+
+def read_filleules(items, slots: bool) -> None:
+    for item in items:
+        referent = item.referent if slots else (item.correspondant and item.correspondant.nom)
+        (item.id_filleule, item.nom, item.prenom, item.whatsapp, item.annee_rentree, referent)
+
+
+def read_tuples(items) -> None:
+    for item in items:
+        tuple(item)
+
+
+def read_parrains(items, slots: bool) -> None:
+    for item in items:
+        (item.id_parrain, item.nom, item.prenom, item.telephone, item.email)
+
+
+def read_parrainages(items, slots: bool) -> None:
+    for item in items:
+        if slots:
+            (item.parrain_nom, item.parrain_prenom, item.filleule_nom, item.filleule_prenom)
+        else:
+            (item.parrain.nom, item.parrain.prenom, item.filleule.nom, item.filleule.prenom)
+        (item.id_parrainage, item.date_debut, item.date_fin, item.statut)
+
+
+def read_scolarites(items, slots: bool) -> None:
+    for item in items:
+        if slots:
+            (item.filleule_prenom, item.filleule_nom, item.etablissement_nom, item.periode)
+        else:
+            periode = item.annee_scolaire_ref.periode if item.annee_scolaire_ref else item.annee_scolaire
+            (item.filleule.prenom, item.filleule.nom, item.etablissement.nom, periode)
+        (item.id_scolarite, item.niveau, item.referent_a)
+
+
+def read_documents(items, slots: bool) -> None:
+    for item in items:
+        (item.id_document, item.titre)
+
+
+# (liste, requête ORM d'avant, classe de ligne, lecture des attributs affichés)
+CASES = [
+    (
+        "filleules",
+        lambda db: db.query(Filleule).options(joinedload(Filleule.correspondant)),
+        FilleuleListRow,
+        read_filleules,
+    ),
+    ("parrains", lambda db: db.query(Parrain), ParrainListRow, read_parrains),
+    # Les routes ne chargeaient pas les relations : un SELECT par parrain/filleule distinct
+    ("parrainages", lambda db: db.query(Parrainage), ParrainageListRow, read_parrainages),
+    ("scolarites", lambda db: db.query(Scolarite), ScolariteListRow, read_scolarites),
+    ("documents", lambda db: db.query(Document), DocumentListRow, read_documents),
+]
+
+
+def measure(load) -> tuple[int, int]:
+    """(pic mémoire en octets, nb lignes) pour une session neuve."""
+    db = SessionLocal()
+    try:
+        gc.collect()
+        tracemalloc.start()
+        count = load(db)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    finally:
+        db.close()
+    return peak, count
+
+
+def timed(load, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        db = SessionLocal()
+        try:
+            gc.collect()
+            start = time.perf_counter()
+            load(db)
+            best = min(best, time.perf_counter() - start)
+        finally:
+            db.close()
+    return best * 1000
+
+
+def main(count: int, repeat: int) -> int:
+    seed(count)
+    print(f"{count} lignes par table, meilleur de {repeat}; valeurs ramenées à 10 000 lignes")
+    print(f"{'liste':<12} {'mode':<7} {'lignes':>7} {'ms/10k':>9} {'Mio/10k':>9}")
+    for name, orm_query, row_class, read in CASES:
+
+        def load_orm(db):
+            items = orm_query(db).all()
+            read(items, False)
+            return len(items)
+
+        def load_tuples(db):
+            items = row_class.query(db).all()
+            read_tuples(items)
+            return len(items)
+
+        def load_slots(db):
+            items = row_class.fetch(row_class.query(db))
+            read(items, True)
+            return len(items)
+
+        for mode, load in (("orm", load_orm), ("tuples", load_tuples), ("slots", load_slots)):
+            peak, rows = measure(load)
+            elapsed = timed(load, repeat)
+            scale = 10000 / max(rows, 1)
+            print(
+                f"{name:<12} {mode:<7} {rows:>7} {elapsed * scale:>9.1f} "
+                f"{peak * scale / 1024 / 1024:>9.2f}"
+            )
+    engine.dispose()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(
+        main(
+            int(sys.argv[1]) if len(sys.argv) > 1 else 10000,
+            int(sys.argv[2]) if len(sys.argv) > 2 else 3,
+        )
+    )
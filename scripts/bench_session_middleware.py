@@ -0,0 +1,115 @@
+"""Micro-benchmark : SessionMiddleware ASGI pur vs ancienne version BaseHTTPMiddleware.
+
+Usage : python -m scripts.bench_session_middleware [iterations]
+
+Les requêtes sont envoyées directement à l'application ASGI (sans réseau ni
+cookie de session, donc sans accès base) pour isoler le coût du middleware.
+"""
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+from fastapi import FastAPI, Request
+from fastapi.responses import FileResponse, StreamingResponse
+from fastapi.templating import Jinja2Templates
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.middleware.session import SessionMiddleware
+
+STATIC_DIR = Path(__file__).resolve().parent.parent / "app" / "static"
+EXPORT_CHUNKS = 2000
+EXPORT_CHUNK = b"x" * 8192  # ~16 Mo au total
+
+templates = Jinja2Templates(directory="app/templates")
+
+
+class BaseHTTPSessionMiddleware(BaseHTTPMiddleware):
+    """Reproduction de l'ancienne implémentation, pour comparaison."""
+
+    async def dispatch(self, request, call_next):
+        request.state.user = None
+        request.state.user_roles = set()
+        return await call_next(request)
+
+
+def build_app(middleware_class) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(middleware_class)
+
+    @app.get("/favicon.ico")
+    def favicon():
+        return FileResponse(STATIC_DIR / "favicon.png", media_type="image/png")
+
+    @app.get("/auth/login")
+    def login_page(request: Request):
+        return templates.TemplateResponse("login.html", {"request": request, "error": None, "info": None})
+
+    @app.get("/export")
+    def export():
+        def iter_chunks():
+            for _ in range(EXPORT_CHUNKS):
+                yield EXPORT_CHUNK
+
+        return StreamingResponse(iter_chunks(), media_type="application/octet-stream")
+
+    return app
+
+
+async def call(app, path: str) -> int:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "headers": [(b"host", b"bench"), (b"accept", b"text/html")],
+        "client": ("127.0.0.1", 12345),
+        "server": ("bench", 80),
+    }
+    received = 0
+    request_sent = False
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        # Aucun client ne se déconnecte : on attend l'annulation par la réponse
+        await asyncio.Event().wait()
+
+    async def send(message):
+        nonlocal received
+        if message["type"] == "http.response.body":
+            received += len(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return received
+
+
+async def bench(app, path: str, iterations: int) -> float:
+    await call(app, path)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await call(app, path)
+    return (time.perf_counter() - start) / iterations * 1000
+
+
+async def main(iterations: int) -> None:
+    apps = {
+        "BaseHTTPMiddleware": build_app(BaseHTTPSessionMiddleware),
+        "ASGI pur": build_app(SessionMiddleware),
+    }
+    paths = [("/favicon.ico", iterations), ("/auth/login", iterations), ("/export", max(iterations // 50, 5))]
+    print(f"{'route':<14} {'middleware':<20} {'ms/requête':>12}")
+    for path, count in paths:
+        for name, app in apps.items():
+            elapsed = await bench(app, path, count)
+            print(f"{path:<14} {name:<20} {elapsed:>12.3f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 500))
@@ -0,0 +1,178 @@
+"""Vérifie que les filtres et jointures des listes utilisent bien un index.
+
+Usage : python -m scripts.explain_filters [nb_filleules]
+
+Le script crée une base SQLite synthétique à partir des modèles (colonnes
+normalisées générées et index compris), contrôle que les colonnes normalisées
+sont recalculées à l'écriture, puis lance EXPLAIN QUERY PLAN sur les requêtes
+construites par les routes. Code de sortie 1 si un plan n'utilise pas l'index attendu.
+"""
+import random
+import sys
+import tempfile
+from pathlib import Path
+
+from sqlalchemy import create_engine, func, select, text
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models import (  # noqa: F401
+    annee_scolaire,
+    correspondant,
+    document,
+    etablissement,
+    filleule,
+    filleule_summary,
+    localite,
+    parrain,
+    parrainage,
+    reference_version,
+    role,
+    scolarite,
+    suivisocial,
+    tache,
+    typedocument,
+    user,
+    user_connection_log,
+)
+from app.models.document import Document
+from app.models.filleule import Filleule
+from app.models.parrainage import Parrainage
+from app.models.scolarite import Scolarite
+from app.models.suivisocial import SuiviSocial
+from app.models.tache import Tache
+from app.routes.admin.admin_filleules import get_extra_villes
+from app.services.counters_service import has_couverture_sante
+from app.services.filleule_list_service import apply_list_filters
+
+DB_PATH = Path(tempfile.gettempdir()) / "fae_explain_filters.db"
+
+engine = create_engine(f"sqlite:///{DB_PATH}")
+SessionLocal = sessionmaker(bind=engine)
+
+
+def seed(count: int) -> None:
+    if DB_PATH.exists():
+        DB_PATH.unlink()
+    Base.metadata.create_all(engine)
+    rng = random.Random(42)
+    villages = [" Tamanar", "Smimou ", "TALMEST", "Aglou", "", None]
+    with engine.begin() as conn:
+        conn.execute(
+            Filleule.__table__.insert(),
+            [
+                {
+                    "id_filleule": i,
+                    "nom": f"Nom{i % 997}",
+                    "prenom": f"Prenom{i}",
+                    "village": rng.choice(villages),
+                    "ville": rng.choice(villages),
+                    "annee_rentree": str(rng.randint(2005, 2024)),
+                    "couverture_sante": rng.choice([None, "", "AMO", "None", " ramed "]),
+                }
+                for i in range(1, count + 1)
+            ],
+        )
+        conn.execute(
+            Scolarite.__table__.insert(),
+            [
+                {
+                    "id_filleule": rng.randint(1, count),
+                    "niveau": rng.choice(["6e", "5e", "4e", "3e", "2nde"]),
+                    "filiere": rng.choice(["Sciences", " lettres", "ECO", "", None]),
+                }
+                for _ in range(count * 2)
+            ],
+        )
+        conn.execute(
+            Parrainage.__table__.insert(),
+            [{"id_filleule": rng.randint(1, count), "id_parrain": rng.randint(1, 500)} for _ in range(count)],
+        )
+        conn.execute(text("ANALYZE"))
+
+
+def check_write_maintenance() -> list[str]:
+    errors = []
+    db = SessionLocal()
+    try:
+        record = Filleule(nom="Test", prenom="Ecriture", village="  Tamanar ", couverture_sante="  ")
+        db.add(record)
+        db.commit()
+        if (record.village_norm, record.couverture_sante_norm) != ("tamanar", None):
+            errors.append(f"insertion : {record.village_norm!r}, {record.couverture_sante_norm!r}")
+        record.village = "Aglou "
+        db.commit()
+        if record.village_norm != "aglou":
+            errors.append(f"mise à jour : {record.village_norm!r}")
+        db.delete(record)
+        db.commit()
+    finally:
+        db.close()
+    return errors
+
+
+def explain(db, statement) -> list[str]:
+    sql = statement.compile(engine, compile_kwargs={"literal_binds": True})
+    return [row[-1] for row in db.execute(text(f"EXPLAIN QUERY PLAN {sql}"))]
+
+
+def filter_query(db, **filters):
+    params = {
+        "filiere": None,
+        "annee_rentree": None,
+        "village": None,
+        "sans_parrains": None,
+        "couverture_sante": None,
+        **filters,
+    }
+    return apply_list_filters(db.query(Filleule), **params).statement
+
+
+def main(count: int) -> int:
+    seed(count)
+    errors = check_write_maintenance()
+    for error in errors:
+        print(f"ÉCHEC colonnes normalisées ({error})")
+
+    db = SessionLocal()
+    try:
+        cases = [
+            ("filtre filière", filter_query(db, filiere=" Lettres"), "ix_scolarite_filiere_norm"),
+            ("filtre année de rentrée", filter_query(db, annee_rentree="2019"), "ix_filleules_annee_rentree_norm"),
+            ("filtre village", filter_query(db, village="tamanar "), "ix_filleules_village_norm"),
+            ("filtre sans parrains", filter_query(db, sans_parrains=1), "ix_parrainages_id_filleule"),
+            (
+                "compteur couverture santé",
+                select(func.count(Filleule.id_filleule)).where(has_couverture_sante()),
+                "ix_filleules_couverture_sante_norm",
+            ),
+            ("tri nom/prénom", select(Filleule).order_by(Filleule.nom, Filleule.prenom), "ix_filleules_nom_prenom"),
+            ("scolarités d'une filleule", select(Scolarite).where(Scolarite.id_filleule == 7), "ix_scolarite_id_filleule"),
+            ("parrainages d'un parrain", select(Parrainage).where(Parrainage.id_parrain == 7), "ix_parrainages_id_parrain"),
+            ("documents d'une filleule", select(Document).where(Document.id_filleule == 7), "ix_documents_id_filleule"),
+            ("suivis d'une filleule", select(SuiviSocial).where(SuiviSocial.id_filleule == 7), "ix_suivisocial_id_filleule"),
+            (
+                "tâches ouvertes",
+                select(Tache)
+                .where(Tache.statut.in_(["A faire", "En cours"]))
+                .order_by(Tache.statut, Tache.date_debut, Tache.id_tache),
+                "ix_taches_statut_date_debut",
+            ),
+        ]
+        for label, statement, index_name in cases:
+            plan = explain(db, statement)
+            ok = any(index_name in line for line in plan)
+            print(f"{'OK   ' if ok else 'ÉCHEC'} {label:<28} {' | '.join(plan)}")
+            if not ok:
+                errors.append(label)
+
+        extra = get_extra_villes(db, [])
+        print(f"villes hors référentiel : {extra}")
+    finally:
+        db.close()
+    engine.dispose()
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000))
@@ -0,0 +1,31 @@
+"""Initialisation unique de la base (tables, colonnes, index, données de référence).
+
+Usage :
+    python -m scripts.init_db            # applique les migrations en attente
+    python -m scripts.init_db --status   # liste les migrations en attente
+
+À lancer une fois avant de démarrer les workers (APP_INIT_MODE=off), par exemple
+en étape de pré-déploiement. Les durées de chaque étape sont affichées.
+"""
+import sys
+
+from app.services.migration_service import get_pending_migrations, run_migrations
+
+
+def show_status() -> int:
+    pending = get_pending_migrations()
+    for step_id in pending:
+        print(f"en attente : {step_id}")
+    print(f"{len(pending)} migration(s) en attente")
+    return 1 if pending else 0
+
+
+def main(argv: list[str]) -> int:
+    if "--status" in argv:
+        return show_status()
+    run_migrations(wait=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
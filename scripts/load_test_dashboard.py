@@ -0,0 +1,219 @@
+"""Test de charge : les requêtes courtes ne doivent plus attendre le rendu du tableau de bord.
+
+Usage : python -m scripts.load_test_dashboard [nb_filleules]
+
+Le script crée une base SQLite synthétique (aiosqlite pour le moteur asynchrone),
+lance plusieurs chargements de tableau de bord en parallèle et mesure pendant ce
+temps la latence d'un endpoint trivial (/ping). Deux variantes sont comparées :
+- "sync bloquant" : requêtes SQLAlchemy synchrones dans un endpoint async
+  (ancien comportement de stats_service);
+- "async" : les fonctions actuelles de stats_service sur le moteur asynchrone.
+"""
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+DB_PATH = Path(tempfile.gettempdir()) / "fae_load_test_dashboard.db"
+os.environ["ASYNC_DATABASE_URL"] = f"sqlite+aiosqlite:///{DB_PATH}"
+
+from fastapi import FastAPI  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+from sqlalchemy import create_engine, func, select  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app.database import Base, async_engine  # noqa: E402
+from app.models import (  # noqa: E402,F401
+    annee_scolaire,
+    correspondant,
+    document,
+    etablissement,
+    filleule,
+    localite,
+    parrain,
+    parrainage,
+    role,
+    scolarite,
+    suivisocial,
+    tache,
+    typedocument,
+    user,
+    user_connection_log,
+)
+from app.models.etablissement import Etablissement  # noqa: E402
+from app.models.filleule import Filleule  # noqa: E402
+from app.models.parrainage import Parrainage  # noqa: E402
+from app.models.scolarite import Scolarite  # noqa: E402
+from app.services.stats_service import (  # noqa: E402
+    get_chart_data,
+    get_dashboard_stats,
+    get_filiere_stats,
+)
+
+DASHBOARD_CONCURRENCY = 4
+PING_INTERVAL = 0.01
+
+sync_engine = create_engine(f"sqlite:///{DB_PATH}")
+SyncSession = sessionmaker(bind=sync_engine)
+
+
+def seed(count: int) -> None:
+    if DB_PATH.exists():
+        DB_PATH.unlink()
+    Base.metadata.create_all(sync_engine)
+    rng = random.Random(42)
+    with sync_engine.begin() as conn:
+        conn.execute(
+            Etablissement.__table__.insert(),
+            [{"id_etablissement": i, "nom": f"Etablissement {i}"} for i in range(1, 51)],
+        )
+        conn.execute(
+            Filleule.__table__.insert(),
+            [
+                {
+                    "id_filleule": i,
+                    "nom": f"Nom{i}",
+                    "prenom": f"Prenom{i}",
+                    "etablissement_id": rng.randint(1, 50),
+                    "couverture_sante": rng.choice([None, "", "AMO", "None"]),
+                }
+                for i in range(1, count + 1)
+            ],
+        )
+        conn.execute(
+            Scolarite.__table__.insert(),
+            [
+                {
+                    "id_filleule": rng.randint(1, count),
+                    "niveau": rng.choice(["6e", "5e", "4e", "3e", "2nde"]),
+                    "filiere": rng.choice(["Sciences", "Lettres", "Eco", ""]),
+                }
+                for _ in range(count * 2)
+            ],
+        )
+
+
+def blocking_dashboard() -> dict:
+    """Ancien comportement : requêtes synchrones exécutées sur la boucle d'événements."""
+    db = SyncSession()
+    try:
+        counts = {
+            model.__tablename__: db.execute(select(func.count()).select_from(model)).scalar_one()
+            for model in (Filleule, Etablissement, Parrainage, Scolarite)
+        }
+        latest = (
+            select(Scolarite.id_filleule, func.max(Scolarite.id_scolarite).label("max_id"))
+            .group_by(Scolarite.id_filleule)
+            .subquery()
+        )
+        db.execute(
+            select(Scolarite.filiere, func.count())
+            .join(latest, Scolarite.id_scolarite == latest.c.max_id)
+            .group_by(Scolarite.filiere)
+        ).all()
+        db.execute(
+            select(Etablissement.nom, func.count(Filleule.id_filleule))
+            .join(Filleule, Filleule.etablissement_id == Etablissement.id_etablissement)
+            .group_by(Etablissement.nom)
+        ).all()
+        return counts
+    finally:
+        db.close()
+
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping():
+        return JSONResponse({"ok": True})
+
+    @app.get("/dashboard-sync")
+    async def dashboard_sync():
+        return JSONResponse(blocking_dashboard())
+
+    @app.get("/dashboard-async")
+    async def dashboard_async():
+        stats = await get_dashboard_stats()
+        await get_chart_data()
+        await get_filiere_stats()
+        return JSONResponse(stats)
+
+    return app
+
+
+async def call(app, path: str) -> None:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "headers": [(b"host", b"loadtest")],
+        "client": ("127.0.0.1", 12345),
+        "server": ("loadtest", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        return None
+
+    await app(scope, receive, send)
+
+
+async def run_scenario(app, dashboard_path: str) -> dict:
+    latencies: list[float] = []
+    completed: list[float] = []
+    done = asyncio.Event()
+
+    async def pinger():
+        while not done.is_set():
+            start = time.perf_counter()
+            await call(app, "/ping")
+            completed.append(time.perf_counter())
+            latencies.append((completed[-1] - start) * 1000)
+            await asyncio.sleep(PING_INTERVAL)
+
+    async def dashboards():
+        await asyncio.gather(*[call(app, dashboard_path) for _ in range(DASHBOARD_CONCURRENCY)])
+        done.set()
+
+    start = time.perf_counter()
+    await asyncio.gather(pinger(), dashboards())
+    end = time.perf_counter()
+    # Plus longue période sans réponse à /ping = temps passé bloqué derrière les tableaux de bord
+    marks = [start, *completed, end]
+    return {
+        "total_ms": (end - start) * 1000,
+        "pings": len(latencies),
+        "ping_p50_ms": statistics.median(latencies) if latencies else 0.0,
+        "stall_max_ms": max(b - a for a, b in zip(marks, marks[1:])) * 1000,
+    }
+
+
+async def main(count: int) -> None:
+    seed(count)
+    app = build_app()
+    print(f"{count} filleules, {DASHBOARD_CONCURRENCY} tableaux de bord simultanés")
+    print(f"{'variante':<16} {'durée (ms)':>12} {'pings':>7} {'ping p50':>10} {'blocage max':>12}")
+    for label, path in (("sync bloquant", "/dashboard-sync"), ("async", "/dashboard-async")):
+        await call(app, path)
+        result = await run_scenario(app, path)
+        print(
+            f"{label:<16} {result['total_ms']:>12.1f} {result['pings']:>7} "
+            f"{result['ping_p50_ms']:>10.2f} {result['stall_max_ms']:>12.1f}"
+        )
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 50000))
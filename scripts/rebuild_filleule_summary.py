@@ -0,0 +1,24 @@
+"""Reconstruit la table filleule_summary (résumé d'affichage des filleules).
+
+Usage : python -m scripts.rebuild_filleule_summary [--batch-size N]
+
+Les écritures passant par l'ORM tiennent les résumés à jour (filleule_summary_service);
+ce script sert après un import ou une correction en SQL brut, ou après un
+changement du contenu du résumé. Chaque lot est validé séparément; la table
+reste lisible pendant la reconstruction.
+"""
+import argparse
+
+from app.services.filleule_summary_service import rebuild_filleule_summaries
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=None, help="taille des lots")
+    args = parser.parse_args()
+
+    rebuild_filleule_summaries(batch_size=args.batch_size)
+
+
+if __name__ == "__main__":
+    main()